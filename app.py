@@ -1,21 +1,79 @@
 
-from fastapi import FastAPI, Request
+import asyncio
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, File, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse, RedirectResponse
 from uvicorn import run as app_run
 
+import time
 from typing import Optional
 
 # Importing constants and pipeline modules from the project
-from src.constants import APP_HOST, APP_PORT
+from src.constants import (APP_HOST, APP_PORT, APP_WORKERS, MODEL_VERSION_HEADER, PREDICTION_CSV_ERROR_MARKER,
+                           REQUEST_DEADLINE_HEADER)
+from src.logger import logging
 from src.pipline.prediction_pipeline import VehicleData, VehicleDataClassifier
-from src.pipline.training_pipeline import TrainPipeline
+from src.pipline.binary_protocol import BinaryPredictionProtocol
+from src.pipline.micro_batcher import MicroBatcher
+from src.pipline.inference_executor import InferenceExecutor
+from src.pipline.prediction_cache import PredictionCache
+from src.pipline.model_registry import ModelRegistry, ShadowScorer, score_with_route
+from src.pipline.admission_controller import BATCH, INTERACTIVE, AdmissionController, RequestShedError
+from src.pipline.training_jobs import TrainingJobRunner
+from src.pipline.model_warmup import ModelWarmup
+
+from src.utils.metrics import (http_request_errors_total, http_request_seconds, http_requests_in_flight,
+                               metrics_registry, prediction_stage_seconds)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads the production model once at startup and warms it up so that requests never pay for the
+    S3 download or cold code paths. Both run in the background: /healthz answers at once and /readyz
+    only once warmup has finished. If S3 is unreachable the load is retried until it succeeds.
+    Under the prefork server the model is already resident (inherited from the parent) and is reused.
+    """
+    model_predictor = VehicleDataClassifier()
+    app.state.model_warmup = ModelWarmup()
+    app.state.model_warmup.start()
+
+    # Training runs as a background job in a separate worker process
+    app.state.training_job_runner = TrainingJobRunner()
+
+    # Inference runs on its own pool so the event loop keeps serving pages and health checks
+    app.state.inference_executor = InferenceExecutor()
+    app.state.inference_executor.start()
+
+    # Repeat profiles are answered from memory, namespaced by the resident model version
+    app.state.prediction_cache = PredictionCache()
+
+    # Concurrent form submissions are coalesced into one vectorized model call
+    app.state.micro_batcher = MicroBatcher(predict_fn=model_predictor.predict_batch,
+                                           executor=app.state.inference_executor)
+    await app.state.micro_batcher.start()
+
+    # Other model versions (challenger, pinned S3 versions) are held next to the champion
+    app.state.model_registry = ModelRegistry()
+    app.state.shadow_scorer = ShadowScorer(max_pending=app.state.model_registry.model_registry_config.shadow_max_pending)
+
+    # Prediction requests beyond the slot and queue limits are shed with 503 instead of queuing without bound
+    app.state.admission_controller = AdmissionController()
+    yield
+    app.state.model_warmup.stop()
+    await app.state.micro_batcher.stop()
+    app.state.inference_executor.shutdown()
+    app.state.shadow_scorer.shutdown()
+    app.state.training_job_runner.shutdown()
 
 # Initialize FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Mount the 'static' directory for serving static files (like CSS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -35,6 +93,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    """
+    Tracks in-flight requests, end-to-end latency per route and unhandled errors
+    """
+    http_requests_in_flight.inc()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec()
+        # Label by route template (e.g. /train/{job_id}) so that label values stay bounded
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        http_request_seconds.labels(route_path, request.method).observe(time.perf_counter() - start)
+        if status_code >= 500:
+            http_request_errors_total.labels(route_path).inc()
+
+def admission_control(priority: str):
+    """
+    Route dependency that holds an admission slot of the given priority class while the request is handled
+    """
+    async def hold_slot(request: Request):
+        deadline_seconds = AdmissionController.parse_deadline_ms(request.headers.get(REQUEST_DEADLINE_HEADER))
+        async with request.app.state.admission_controller.admit(priority, deadline_seconds):
+            yield
+    return hold_slot
+
+async def score_on_route(request: Request, route: str, score_fn, *args, with_version: bool = False):
+    """
+    Scores with a non-champion model version on the inference executor and returns (version key, result).
+    Thread workers share the app's ModelRegistry; process workers are sent only the route and
+    resolve it from their own registry, so the model is not pickled with every call.
+    """
+    inference_executor = request.app.state.inference_executor
+    if inference_executor.uses_processes:
+        return await inference_executor.run(score_with_route, route, with_version, score_fn, *args)
+    model_version, model = await asyncio.to_thread(request.app.state.model_registry.get_model, route)
+    extra = (model, model_version) if with_version else (model,)
+    return model_version, await inference_executor.run(score_fn, *args, *extra)
+
+@app.exception_handler(RequestShedError)
+async def requestShedHandler(request: Request, exc: RequestShedError):
+    """
+    Answers requests rejected by admission control at once, telling the client when to retry
+    """
+    return JSONResponse(status_code=503, content={"status": False, "error": f"{exc}"},
+                        headers={"Retry-After": str(math.ceil(exc.retry_after_seconds))})
+
 class DataForm:
     """
     DataForm class to handle and process incoming form data.
@@ -80,32 +190,107 @@ async def index(request: Request):
     Renders the main HTML form page for vehicle data input.
     """
     return templates.TemplateResponse(
-            "vehicledata.html",{"request": request, "context": "Rendering"})
+            request, "vehicledata.html", {"context": "Rendering"})
+
+# Liveness probe: the process is up and its event loop answers
+@app.get("/healthz")
+async def healthzRouteClient():
+    """
+    Returns 200 as long as the app is running, whether or not the model is ready.
+    """
+    return {"status": "alive"}
+
+# Readiness probe: traffic should only be sent once the model is loaded and warmed up
+@app.get("/readyz")
+async def readyzRouteClient(request: Request):
+    """
+    Returns 200 with the model version and warmup timings once warmup has finished, 503 before that.
+    """
+    model_warmup_status = request.app.state.model_warmup.get_status()
+    return JSONResponse(status_code=200 if model_warmup_status["ready"] else 503, content=model_warmup_status)
+
+# Route to report which model version is resident and how long it took to load
+@app.get("/model/info")
+async def modelInfoRouteClient():
+    """
+    Returns the version and load time of the resident production model.
+    """
+    return VehicleDataClassifier.get_model_info()
+
+# Route to report which model versions are resident and how traffic is split between them
+@app.get("/model/registry")
+async def modelRegistryRouteClient(request: Request):
+    """
+    Returns the resident model versions, the champion/challenger traffic split
+    and the agreement rate measured by shadow scoring.
+    """
+    return {
+        "model_registry": request.app.state.model_registry.get_stats(),
+        "shadow_scoring": request.app.state.shadow_scorer.get_stats(),
+    }
+
+# Route to report micro-batching metrics for tuning the batch window
+@app.get("/predict/stats")
+async def predictStatsRouteClient(request: Request):
+    """
+    Returns batch-size and queue-wait metrics of the prediction micro-batcher,
+    utilization of the inference executor, prediction cache counters
+    and slot use and shed counts of admission control.
+    """
+    return {
+        "micro_batcher": request.app.state.micro_batcher.get_stats(),
+        "inference_executor": request.app.state.inference_executor.get_stats(),
+        "prediction_cache": request.app.state.prediction_cache.get_stats(),
+        "admission_control": request.app.state.admission_controller.get_stats(),
+    }
+
+# Route to expose latency histograms and counters to Prometheus
+@app.get("/metrics")
+async def metricsRouteClient():
+    """
+    Returns per-stage prediction latency histograms, request latency, in-flight requests,
+    error counts and model load time in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 # Route to trigger the model training process
 @app.get("/train")
-async def trainRouteClient():
+async def trainRouteClient(request: Request):
     """
-    Endpoint to initiate the model training pipeline.
+    Endpoint to initiate the model training pipeline as a background job.
+    Returns the job id at once; a request made while a job is running joins that job.
     """
     try:
-        train_pipeline = TrainPipeline()
-        train_pipeline.run_pipeline()
-        return Response("Training successful!!!")
+        job, coalesced = request.app.state.training_job_runner.submit()
+        return {"status": True, "job_id": job["job_id"], "job_status": job["status"], "coalesced": coalesced}
 
     except Exception as e:
-        return Response(f"Error Occurred! {e}")
+        http_request_errors_total.labels("/train").inc()
+        return {"status": False, "error": f"{e}"}
+
+# Route to follow a training job stage by stage
+@app.get("/train/{job_id}")
+async def trainStatusRouteClient(request: Request, job_id: str):
+    """
+    Endpoint to report the status and per-stage timings of a training job.
+    """
+    job = request.app.state.training_job_runner.get_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": False, "error": f"Unknown training job {job_id}"})
+    return job
 
 # Route to handle form submission and make predictions
-@app.post("/")
+@app.post("/", dependencies=[Depends(admission_control(INTERACTIVE))])
 async def predictRouteClient(request: Request):
     """
     Endpoint to receive form data, process it, and make a prediction.
     """
     try:
         form = DataForm(request)
-        await form.get_vehicle_data()
-        
+        with prediction_stage_seconds.labels("form_parse").time():
+            await form.get_vehicle_data()
+
+        vehicle_data_started = time.perf_counter()
         vehicle_data = VehicleData(
                                 Gender= form.Gender,
                                 Age = form.Age,
@@ -119,28 +304,197 @@ async def predictRouteClient(request: Request):
                                 Vehicle_Age_gt_2_Years = form.Vehicle_Age_gt_2_Years,
                                 Vehicle_Damage_Yes = form.Vehicle_Damage_Yes
                                 )
+        prediction_stage_seconds.labels("vehicle_data").observe(time.perf_counter() - vehicle_data_started)
 
-        # Convert form data into a DataFrame for the model
-        vehicle_df = vehicle_data.get_vehicle_input_data_frame()
-
-        # Initialize the prediction pipeline
+        model_registry = request.app.state.model_registry
+        route = model_registry.choose_route(request.headers.get(MODEL_VERSION_HEADER))
         model_predictor = VehicleDataClassifier()
 
-        # Make a prediction and retrieve the result
-        value = model_predictor.predict(dataframe=vehicle_df)[0]
+        if model_registry.is_champion(route):
+            # Repeat profiles skip the transform and the forest entirely
+            with prediction_stage_seconds.labels("cache_lookup").time():
+                prediction_cache = request.app.state.prediction_cache
+                model_version = VehicleDataClassifier.model_version
+                cache_key = prediction_cache.make_key(vars(vehicle_data), VehicleData.feature_columns)
+                value = prediction_cache.get(model_version, cache_key)
+
+            if value is None:
+                # Make a prediction; the micro-batcher scores this row together with concurrent requests.
+                # The wait covers queueing for a batch plus the batch's own buffer, transform and predict stages
+                with prediction_stage_seconds.labels("batch_wait").time():
+                    value = await request.app.state.micro_batcher.submit(vehicle_data)
+                prediction_cache.put(model_version, cache_key, value)
+
+            # Compare with the challenger once the champion answer is known, on the shadow thread
+            if model_registry.shadow_enabled:
+                request.app.state.shadow_scorer.submit(
+                    lambda: model_predictor.predict_batch(
+                        [vehicle_data], model_registry.get_model(ModelRegistry.challenger)[1]),
+                    [value])
+        else:
+            # Other versions are scored on their own; the micro-batcher and the cache serve the champion
+            model_version, values = await score_on_route(request, route, model_predictor.predict_batch, [vehicle_data])
+            value = values[0]
 
         # Interpret the prediction result as 'Response-Yes' or 'Response-No'
         status = "Response-Yes" if value == 1 else "Response-No"
 
         # Render the same HTML page with the prediction result
-        return templates.TemplateResponse(
-            "vehicledata.html",
-            {"request": request, "context": status},
-        )
+        with prediction_stage_seconds.labels("render").time():
+            return templates.TemplateResponse(
+                request,
+                "vehicledata.html",
+                {"context": status},
+                headers={MODEL_VERSION_HEADER: str(model_version)},
+            )
         
     except Exception as e:
+        http_request_errors_total.labels("/").inc()
+        return {"status": False, "error": f"{e}"}
+
+# Route to score many rows sent as JSON in a single vectorized model call
+@app.post("/predict/batch", dependencies=[Depends(admission_control(BATCH))])
+async def batchPredictRouteClient(request: Request):
+    """
+    Endpoint to score a batch of records.
+    Accepts {"records": [{...}, ...]} (row-oriented) or {"records": {"Age": [...], ...}} (columnar)
+    and returns the predictions and positive-class probabilities in input order.
+    The X-Model-Version header pins the request to "champion", "challenger" or an S3 version id.
+    """
+    try:
+        payload = await request.json()
+        records = payload.get("records") if isinstance(payload, dict) and "records" in payload else payload
+
+        model_registry = request.app.state.model_registry
+        route = model_registry.choose_route(request.headers.get(MODEL_VERSION_HEADER))
+        # Build one DataFrame for the whole batch and score every row with one call to the model,
+        # on the inference executor so that the event loop is not blocked
+        model_predictor = VehicleDataClassifier()
+        champion = model_registry.is_champion(route)
+        if champion:
+            model_version = VehicleDataClassifier.model_version
+            predictions, probabilities = await request.app.state.inference_executor.run(
+                model_predictor.predict_records, records, None)
+        else:
+            model_version, (predictions, probabilities) = await score_on_route(
+                request, route, model_predictor.predict_records, records)
+
+        if champion and model_registry.shadow_enabled:
+            request.app.state.shadow_scorer.submit(
+                lambda: model_predictor.predict_records(
+                    records, model_registry.get_model(ModelRegistry.challenger)[1])[0],
+                predictions)
+
+        return {
+            "status": True,
+            "model_version": model_version,
+            "predictions": predictions.astype(int).tolist(),
+            "probabilities": probabilities.tolist(),
+        }
+
+    except Exception as e:
+        http_request_errors_total.labels("/predict/batch").inc()
         return {"status": False, "error": f"{e}"}
 
+# Route to score many rows sent as an Arrow IPC stream or msgpack, without JSON parsing or a DataFrame
+@app.post("/predict/binary", dependencies=[Depends(admission_control(BATCH))])
+async def binaryPredictRouteClient(request: Request):
+    """
+    Endpoint to score a batch of rows sent in a binary columnar format (see BinaryPredictionProtocol).
+    The Content-Type header selects Arrow IPC stream or msgpack; the response uses the same format
+    and carries the serving model version in the X-Model-Version header.
+    """
+    try:
+        protocol = BinaryPredictionProtocol(request.headers.get("content-type"))
+        body = await request.body()
+
+        model_registry = request.app.state.model_registry
+        route = model_registry.choose_route(request.headers.get(MODEL_VERSION_HEADER))
+        # Decoding, scoring and encoding all run on the inference executor, off the event loop
+        model_predictor = VehicleDataClassifier()
+        champion = model_registry.is_champion(route)
+        if champion:
+            model_version = VehicleDataClassifier.model_version
+            predictions, content = await request.app.state.inference_executor.run(
+                protocol.predict, body, model_predictor, None, model_version)
+        else:
+            model_version, (predictions, content) = await score_on_route(
+                request, route, protocol.predict, body, model_predictor, with_version=True)
+
+        if champion and model_registry.shadow_enabled:
+            request.app.state.shadow_scorer.submit(
+                lambda: model_predictor.predict_columns(
+                    protocol.decode(body), model_registry.get_model(ModelRegistry.challenger)[1])[0],
+                predictions)
+
+        return Response(content=content, media_type=protocol.media_type,
+                        headers={MODEL_VERSION_HEADER: str(model_version)})
+
+    except Exception as e:
+        http_request_errors_total.labels("/predict/binary").inc()
+        return {"status": False, "error": f"{e}"}
+
+# Route to score an uploaded CSV file chunk by chunk
+@app.post("/predict/csv")
+async def csvPredictRouteClient(request: Request, file: UploadFile = File(...)):
+    """
+    Endpoint to score a multipart CSV upload in the raw schema of config/schema.yaml.
+    The file is read in fixed-size chunks and the predictions are streamed back as CSV,
+    so memory use stays flat whatever the size of the file.
+    The first chunk is scored before the response starts, so a file that cannot be scored gets an
+    error response; a later failure ends the CSV with a PREDICTION_CSV_ERROR_MARKER line.
+    """
+    # A route dependency would give the slot back as soon as the response starts, so the slot
+    # is taken here and released by the stream once the last chunk has been sent
+    admission_controller = request.app.state.admission_controller
+    deadline_seconds = AdmissionController.parse_deadline_ms(request.headers.get(REQUEST_DEADLINE_HEADER))
+    await admission_controller.acquire(BATCH, deadline_seconds)
+    hold_started = time.perf_counter()
+
+    # Reading the file runs in a thread; scoring every chunk runs on the inference executor
+    inference_executor = request.app.state.inference_executor
+    model_predictor = VehicleDataClassifier()
+    try:
+        chunks = model_predictor.read_csv_chunks(file.file)
+        chunk = await asyncio.to_thread(next, chunks, None)
+        first_text = "" if chunk is None else await inference_executor.run(
+            model_predictor.predict_csv_chunk, chunk, True)
+    except Exception as e:
+        admission_controller.release(BATCH, time.perf_counter() - hold_started)
+        http_request_errors_total.labels("/predict/csv").inc()
+        return {"status": False, "error": f"{e}"}
+
+    async def stream_predictions():
+        rows = 0 if chunk is None else len(chunk)
+        try:
+            yield first_text
+            while True:
+                try:
+                    next_chunk = await asyncio.to_thread(next, chunks, None)
+                    if next_chunk is None:
+                        break
+                    text = await inference_executor.run(model_predictor.predict_csv_chunk, next_chunk, False)
+                except Exception as e:
+                    logging.error(f"Scoring the uploaded CSV failed after {rows} rows: {e}")
+                    yield f"{PREDICTION_CSV_ERROR_MARKER}scoring stopped after {rows} rows: {e}\n"
+                    return
+                rows += len(next_chunk)
+                yield text
+            logging.info(f"Scored {rows} rows from the uploaded CSV")
+        finally:
+            admission_controller.release(BATCH, time.perf_counter() - hold_started)
+
+    return StreamingResponse(
+        stream_predictions(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="predictions_{file.filename}"'},
+    )
+
 # Main entry point to start the FastAPI server
 if __name__ == "__main__":
-    app_run(app, host=APP_HOST, port=APP_PORT)
+    if APP_WORKERS > 1:
+        # Load the model once, then fork workers that share it copy-on-write
+        from src.pipline.prefork_server import PreforkServer
+        PreforkServer(app, host=APP_HOST, port=APP_PORT, workers=APP_WORKERS).run()
+    else:
+        app_run(app, host=APP_HOST, port=APP_PORT)
@@ -0,0 +1,115 @@
+"""
+Benchmark of the per-row cost of the binary prediction protocols against the JSON batch path.
+
+Serves app.py in-process (through Starlette's TestClient, so no sockets are involved) with a
+synthetic model and posts the same rows to /predict/batch as JSON records and to /predict/binary
+as an Arrow IPC stream and as msgpack. Payloads are encoded once up front, so the timings cover
+what the server does: parsing, building the feature matrix, scoring and encoding the response.
+Reports the median request latency, the per-row cost and the payload size per format and batch
+size as JSON.
+
+Usage: python -m benchmarks.binary_protocol [--batch-sizes 1000 100000] [--repeats 10]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_model import FEATURE_COLUMNS, build_model, random_records
+from src.constants import ARROW_STREAM_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+
+FORMATS = ["json", "arrow", "msgpack"]
+
+
+def encode_payload(fmt: str, records: list) -> tuple:
+    """
+    Returns (body, content type) of records in one of FORMATS
+    """
+    if fmt == "json":
+        return json.dumps({"records": records}).encode(), "application/json"
+
+    columns = {column: np.array([record[column] for record in records], dtype=np.float64)
+               for column in FEATURE_COLUMNS}
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        batch = pa.record_batch([pa.array(values) for values in columns.values()], names=list(columns))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes(), ARROW_STREAM_MEDIA_TYPE
+
+    import msgpack
+
+    return msgpack.packb({column: values.tobytes() for column, values in columns.items()}), MSGPACK_MEDIA_TYPE
+
+
+def decode_predictions(fmt: str, response) -> np.ndarray:
+    if fmt == "json":
+        payload = response.json()
+        if not payload.get("status"):
+            raise RuntimeError(payload.get("error"))
+        return np.array(payload["predictions"])
+    if response.headers.get("content-type", "").startswith("application/json"):
+        raise RuntimeError(response.json().get("error"))
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(response.content).read_all().column("prediction").to_numpy()
+
+    import msgpack
+
+    return np.frombuffer(msgpack.unpackb(response.content)["predictions"], dtype="<i8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from app import app
+    from src.pipline.prediction_pipeline import VehicleDataClassifier
+
+    # The lifespan reuses a resident model, so no S3 access is needed
+    VehicleDataClassifier.loaded_model = build_model()
+    VehicleDataClassifier.model_version = "synthetic"
+
+    report = {"repeats": args.repeats, "batch_sizes": {}}
+    with TestClient(app) as client:
+        for batch_size in args.batch_sizes:
+            records = random_records(batch_size, seed=batch_size)
+            results, reference = {}, None
+            for fmt in FORMATS:
+                body, content_type = encode_payload(fmt, records)
+                path = "/predict/batch" if fmt == "json" else "/predict/binary"
+                timings = []
+                for _ in range(args.repeats + 1):  # The first request is a warmup
+                    start = time.perf_counter()
+                    response = client.post(path, content=body, headers={"content-type": content_type})
+                    timings.append(time.perf_counter() - start)
+                predictions = decode_predictions(fmt, response)
+                if reference is None:
+                    reference = predictions
+                elif not np.array_equal(reference, predictions):
+                    raise SystemExit(f"{fmt} predictions differ from the JSON path at batch size {batch_size}")
+
+                median_ms = 1000.0 * float(np.median(timings[1:]))
+                results[fmt] = {
+                    "payload_bytes": len(body),
+                    "response_bytes": len(response.content),
+                    "median_ms": round(median_ms, 3),
+                    "per_row_us": round(1000.0 * median_ms / batch_size, 3),
+                }
+            for fmt in FORMATS[1:]:
+                results[fmt]["speedup_vs_json"] = round(results["json"]["median_ms"] / results[fmt]["median_ms"], 2)
+            report["batch_sizes"][str(batch_size)] = results
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark of DataFrame exports to S3 and reads back.
+
+Starts a local S3 stand-in (moto server) in a separate process, so the CPU time measured here is the
+exporter's own, and uploads one synthetic vehicle dataset with:
+  - csv_temp_file: to_csv into a local file and upload_file, as upload_df_as_csv did before
+  - csv / csv_zst / parquet: SimpleStorageService.upload_df, streamed from memory
+Then reads each file back with read_df, and the Parquet file also with a column projection and with
+a row filter. Reports bytes on the wire, wall and CPU seconds of every step as JSON.
+
+Usage: python -m benchmarks.dataframe_upload [--rows 1000000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.load_harness import start_s3_stand_in_process
+from benchmarks.synthetic_model import FEATURE_COLUMNS
+from src.constants import AWS_ACCESS_KEY_ID_ENV_KEY, AWS_S3_ENDPOINT_URL_ENV_KEY, AWS_SECRET_ACCESS_KEY_ENV_KEY
+
+BUCKET_NAME = "bkt-dataframe-benchmark"
+UPLOADS = {"csv_temp_file": "export_temp.csv", "csv": "export.csv", "csv_zst": "export.csv.zst",
+           "parquet": "export.parquet"}
+
+
+def vehicle_dataset(n_rows: int, seed: int = 0):
+    """
+    Returns a DataFrame with the columns of the Proj1 data and plausible values
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    integers = lambda low, high: rng.integers(low, high, n_rows)
+    data = {
+        "id": np.arange(1, n_rows + 1),
+        "Gender": integers(0, 2),
+        "Age": integers(20, 80),
+        "Driving_License": np.ones(n_rows, dtype=np.int64),
+        "Region_Code": integers(0, 50).astype(np.float64),
+        "Previously_Insured": integers(0, 2),
+        "Annual_Premium": np.round(rng.uniform(2000, 60000, n_rows), 2),
+        "Policy_Sales_Channel": integers(1, 160).astype(np.float64),
+        "Vintage": integers(10, 300),
+        "Vehicle_Age_lt_1_Year": integers(0, 2),
+        "Vehicle_Age_gt_2_Years": np.zeros(n_rows, dtype=np.int64),
+        "Vehicle_Damage_Yes": integers(0, 2),
+        "Response": integers(0, 2),
+    }
+    return pd.DataFrame({column: data[column] for column in ["id", *FEATURE_COLUMNS, "Response"]})
+
+
+def measured(function) -> dict:
+    """
+    Runs function and returns its wall and CPU seconds and the bytes it moved to and from S3
+    """
+    from src.cloud_storage.s3_transfer import s3_transfer_bytes_total
+
+    uploaded, downloaded = (s3_transfer_bytes_total.labels(direction).value() for direction in ("upload", "download"))
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = function()
+    report = {
+        "seconds": round(time.perf_counter() - wall, 3),
+        "cpu_seconds": round(time.process_time() - cpu, 3),
+        "bytes_uploaded": int(s3_transfer_bytes_total.labels("upload").value() - uploaded),
+        "bytes_downloaded": int(s3_transfer_bytes_total.labels("download").value() - downloaded),
+    }
+    if hasattr(result, "shape"):
+        report["shape"] = list(result.shape)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows of the exported dataset")
+    args = parser.parse_args()
+
+    server, endpoint_url = start_s3_stand_in_process()
+    try:
+        os.environ.setdefault(AWS_ACCESS_KEY_ID_ENV_KEY, "testing")
+        os.environ.setdefault(AWS_SECRET_ACCESS_KEY_ENV_KEY, "testing")
+        os.environ[AWS_S3_ENDPOINT_URL_ENV_KEY] = endpoint_url
+        from src.cloud_storage.aws_storage import SimpleStorageService
+
+        storage = SimpleStorageService()
+        storage.s3_client.create_bucket(Bucket=BUCKET_NAME)
+        data_frame = vehicle_dataset(args.rows)
+
+        def upload_through_temp_file() -> None:
+            with tempfile.TemporaryDirectory() as directory:
+                local_filename = os.path.join(directory, UPLOADS["csv_temp_file"])
+                data_frame.to_csv(local_filename, index=None, header=True)
+                storage.upload_file(local_filename, UPLOADS["csv_temp_file"], BUCKET_NAME)
+
+        report = {"rows": args.rows, "uploads": {}, "reads": {}}
+        report["uploads"]["csv_temp_file"] = measured(upload_through_temp_file)
+        for mode in ("csv", "csv_zst", "parquet"):
+            report["uploads"][mode] = measured(lambda: storage.upload_df(data_frame, UPLOADS[mode], BUCKET_NAME))
+
+        for mode in ("csv", "csv_zst", "parquet"):
+            report["reads"][mode] = measured(lambda: storage.read_df(UPLOADS[mode], BUCKET_NAME))
+        report["reads"]["parquet_two_columns"] = measured(
+            lambda: storage.read_df(UPLOADS["parquet"], BUCKET_NAME, columns=["Age", "Vehicle_Damage_Yes"]))
+        report["reads"]["parquet_first_tenth"] = measured(
+            lambda: storage.read_df(UPLOADS["parquet"], BUCKET_NAME, filters=[("id", "<=", args.rows // 10)]))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
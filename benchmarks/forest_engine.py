@@ -0,0 +1,71 @@
+"""
+Benchmark of the compiled forest engine against sklearn's RandomForestClassifier.
+
+Trains a forest with the project's model trainer parameters on synthetic data shaped like the
+transformed vehicle features, checks parity and reports the median latency per call at several
+batch sizes.
+
+Usage: python -m benchmarks.forest_engine [--batch-sizes 1 64 10000] [--repeats 50]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.entity.config_entity import ModelTrainerConfig
+from src.entity.forest_engine import CompiledForest
+
+
+def train_forest(n_rows: int = 20000, n_features: int = 11, seed: int = 101) -> RandomForestClassifier:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    y = ((X[:, 0] + X[:, 3] * X[:, 5] + rng.normal(scale=0.5, size=n_rows)) > 0).astype(int)
+    config = ModelTrainerConfig()
+    model = RandomForestClassifier(n_estimators=config._n_estimators,
+                                   min_samples_split=config._min_samples_split,
+                                   min_samples_leaf=config._min_samples_leaf,
+                                   max_depth=config._max_depth,
+                                   criterion=config._criterion,
+                                   random_state=config._random_state)
+    return model.fit(X, y)
+
+
+def median_latency_ms(fn, X: np.ndarray, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return 1000.0 * float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 10000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    model = train_forest()
+    compiled = CompiledForest.from_random_forest(model)
+    rng = np.random.default_rng(0)
+
+    report = []
+    for batch_size in args.batch_sizes:
+        X = rng.normal(size=(batch_size, model.n_features_in_))
+        if not compiled.verify(model, X):
+            raise SystemExit(f"Parity check failed at batch size {batch_size}")
+        sklearn_ms = median_latency_ms(model.predict, X, args.repeats)
+        compiled_ms = median_latency_ms(compiled.predict, X, args.repeats)
+        report.append({
+            "batch_size": batch_size,
+            "sklearn_ms": round(sklearn_ms, 4),
+            "compiled_ms": round(compiled_ms, 4),
+            "speedup": round(sklearn_ms / compiled_ms, 2),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cold-start benchmark of the serving app.
+
+Imports app.py in fresh interpreters, reports the median import time and the slowest top-level
+imports, and checks that no training-only module is pulled in by the serving path.
+Exits with status 1 when the median exceeds the budget or a training-only module is imported,
+so it can gate CI.
+
+Usage: python -m benchmarks.import_time [--repeats 5] [--budget 1.5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from src.constants import APP_IMPORT_TIME_BUDGET_SECONDS
+
+# Modules the prediction path must not import; they are only loaded by the training job
+TRAINING_ONLY_MODULES = [
+    "imblearn",
+    "pymongo",
+    "mypy_boto3_s3",
+    "src.pipline.training_pipeline",
+    "src.components.data_ingestion",
+    "src.components.data_transformation",
+    "src.components.model_trainer",
+    "src.components.model_evaluation",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_once(project_root: str) -> dict:
+    """
+    Imports app in a new interpreter and returns the import time, loaded modules and -X importtime report
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], cwd=project_root,
+                            capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe["importtime"] = result.stderr
+    return probe
+
+
+def slowest_imports(importtime_report: str, top: int = 10) -> list:
+    """
+    Returns the top-level imports (direct children of the app import) with the largest cumulative time
+    """
+    # -X importtime prints children before their parent, indented two spaces per level
+    entries, children = [], []
+    for line in importtime_report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 1:
+            children.append({"module": name, "cumulative_ms": int(cumulative_us) / 1000.0})
+        elif depth == 0:
+            if name == "app":
+                entries = children
+            children = []
+    return sorted(entries, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=APP_IMPORT_TIME_BUDGET_SECONDS,
+                        help="Largest acceptable median import time of app.py, in seconds")
+    args = parser.parse_args()
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = [measure_once(project_root) for _ in range(args.repeats)]
+    median_seconds = statistics.median(run["seconds"] for run in runs)
+    loaded = set(runs[-1]["modules"])
+    training_modules_loaded = [module for module in TRAINING_ONLY_MODULES if module in loaded]
+
+    report = {
+        "repeats": args.repeats,
+        "median_import_seconds": round(median_seconds, 4),
+        "min_import_seconds": round(min(run["seconds"] for run in runs), 4),
+        "budget_seconds": args.budget,
+        "within_budget": median_seconds <= args.budget,
+        "training_only_modules_loaded": training_modules_loaded,
+        "sklearn_loaded": "sklearn" in loaded,
+        "slowest_imports": slowest_imports(runs[-1]["importtime"]),
+    }
+    print(json.dumps(report, indent=2))
+
+    if not report["within_budget"] or training_modules_loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
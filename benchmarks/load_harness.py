@@ -0,0 +1,236 @@
+"""
+Offline load test of the serving API.
+
+Starts a local S3 stand-in (moto server), saves a synthetic MyModel with save_model_object (the format and
+memory-mapped load path of production models), uploads it to the model bucket,
+boots app.py against it in a subprocess, waits for /readyz and drives the form endpoint and /predict/batch at a fixed
+concurrency. Reports cold start (until the model is loaded and warmed up), requests per second, p50/p95/p99
+latency and the error rate of every scenario as JSON.
+
+Usage:
+    python -m benchmarks.load_harness [--concurrency 32] [--duration 20] [--workers 1] [--batch-size 100]
+    python -m benchmarks.load_harness --scenarios batch --output load_test.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_model import build_model, random_records
+from src.constants import (AWS_ACCESS_KEY_ID_ENV_KEY, AWS_S3_ENDPOINT_URL_ENV_KEY, AWS_SECRET_ACCESS_KEY_ENV_KEY,
+                           MODEL_BUCKET_NAME, MODEL_FILE_NAME, REGION_NAME)
+from src.utils.main_utils import save_model_object
+
+SCENARIOS = ["form", "batch"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_s3_stand_in(model_path: str):
+    """
+    Starts a moto S3 server in this process and uploads the saved model file to the model bucket
+    """
+    import boto3
+    from moto.server import ThreadedMotoServer
+
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    with contextlib.redirect_stdout(sys.stderr):  # Keep stdout for the JSON report
+        server.start()
+    endpoint_url = f"http://127.0.0.1:{port}"
+    s3 = boto3.client("s3", endpoint_url=endpoint_url, region_name=REGION_NAME,
+                      aws_access_key_id="testing", aws_secret_access_key="testing")
+    s3.create_bucket(Bucket=MODEL_BUCKET_NAME)
+    s3.upload_file(model_path, MODEL_BUCKET_NAME, MODEL_FILE_NAME)
+    return server, endpoint_url
+
+
+def start_s3_stand_in_process():
+    """
+    Starts a moto S3 server in a process of its own, so its CPU time is not counted in this one,
+    and returns the process and its endpoint URL once it accepts connections
+    """
+    port = free_port()
+    # Served by uvicorn rather than moto's own werkzeug server, which closes the connection after every
+    # response, so clients keep their connections open between requests as they do with S3
+    server_code = ("import uvicorn; from moto.moto_server.werkzeug_app import DomainDispatcherApplication, "
+                   "create_backend_app; uvicorn.run(DomainDispatcherApplication(create_backend_app), "
+                   f"host='127.0.0.1', port={port}, interface='wsgi', log_level='warning')")
+    process = subprocess.Popen([sys.executable, "-c", server_code],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while True:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=1):
+            return process, f"http://127.0.0.1:{port}"
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("The moto server did not start")
+        time.sleep(0.1)
+
+
+async def wait_until_ready(client, base_url: str, process: subprocess.Popen, timeout: float) -> float:
+    """
+    Polls /readyz until the model is loaded and warmed up and returns the seconds it took
+    """
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"app.py exited with code {process.returncode} during startup")
+        try:
+            response = await client.get(f"{base_url}/readyz")
+            if response.status_code == 200:
+                return time.perf_counter() - start
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"app.py was not ready after {timeout} seconds")
+
+
+def is_error(scenario: str, response) -> bool:
+    """
+    Routes report failures as {"status": false, ...} with HTTP 200, so the body is checked too
+    """
+    if response.status_code != 200:
+        return True
+    if scenario == "batch":
+        return not response.json().get("status", False)
+    # The form route renders HTML on success and returns JSON on failure
+    return response.headers.get("content-type", "").startswith("application/json")
+
+
+async def run_scenario(client, base_url: str, scenario: str, concurrency: int, duration: float,
+                       batch_size: int) -> dict:
+    """
+    Keeps `concurrency` requests in flight for `duration` seconds and summarizes their latencies
+    """
+    records = random_records(max(batch_size, 1000), seed=7)
+    latencies, errors, error_samples = [], 0, []
+
+    async def one_request(i: int):
+        if scenario == "form":
+            return await client.post(f"{base_url}/", data=records[i % len(records)])
+        start = (i * batch_size) % (len(records) - batch_size + 1)
+        return await client.post(f"{base_url}/predict/batch", json={"records": records[start:start + batch_size]})
+
+    async def worker(worker_id: int, deadline: float):
+        nonlocal errors
+        i = worker_id
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await one_request(i)
+                failed = is_error(scenario, response)
+                if failed and len(error_samples) < 3:
+                    error_samples.append(response.text[:200])
+            except Exception as e:
+                failed = True
+                if len(error_samples) < 3:
+                    error_samples.append(repr(e)[:200])
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+            i += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(n, started + duration) for n in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = 1000.0 * np.array(latencies) if latencies else np.zeros(1)
+    rows_per_request = batch_size if scenario == "batch" else 1
+    return {
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "rows_per_request": rows_per_request,
+        "rps": round(len(latencies) / elapsed, 2),
+        "rows_per_second": round(len(latencies) * rows_per_request / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "max_ms": round(float(latencies_ms.max()), 3),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 5) if latencies else None,
+        "error_samples": error_samples,
+    }
+
+
+async def drive(args, base_url: str, process: subprocess.Popen) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        cold_start = await wait_until_ready(client, base_url, process, args.startup_timeout)
+        report = {"cold_start_seconds": round(cold_start, 3), "scenarios": {}}
+        for scenario in args.scenarios:
+            # A short warmup so connection setup and first-call effects stay out of the numbers
+            await run_scenario(client, base_url, scenario, args.concurrency, min(2.0, args.duration), args.batch_size)
+            report["scenarios"][scenario] = await run_scenario(client, base_url, scenario, args.concurrency,
+                                                               args.duration, args.batch_size)
+        readiness = (await client.get(f"{base_url}/readyz")).json()
+        report["model_load_seconds"] = readiness.get("model_load_seconds")
+        report["warmup_seconds"] = readiness.get("warmup_seconds")
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests kept in flight")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per scenario")
+    parser.add_argument("--batch-size", type=int, default=100, help="Records per /predict/batch request")
+    parser.add_argument("--workers", type=int, default=1, help="APP_WORKERS of the app under test")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # One INFO line per request would swamp the report
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = os.path.join(directory, MODEL_FILE_NAME)
+        save_model_object(model_path, build_model())
+        model_file_bytes = os.path.getsize(model_path)
+        server, endpoint_url = start_s3_stand_in(model_path)
+
+    port = free_port()
+    environment = {
+        **os.environ,
+        AWS_ACCESS_KEY_ID_ENV_KEY: "testing",
+        AWS_SECRET_ACCESS_KEY_ENV_KEY: "testing",
+        AWS_S3_ENDPOINT_URL_ENV_KEY: endpoint_url,
+        "APP_PORT": str(port),
+        "APP_WORKERS": str(args.workers),
+    }
+    process = subprocess.Popen([sys.executable, "app.py"], cwd=project_root, env=environment,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        report = asyncio.run(drive(args, f"http://127.0.0.1:{port}", process))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        server.stop()
+
+    report = {"app_workers": args.workers, "model_file_bytes": model_file_bytes, **report}
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark of the request-path cost of logging.
+
+Runs the single-row prediction path (VehicleData -> DataFrame -> VehicleDataClassifier.predict, which
+emits the same log lines as a form request) against a synthetic model, once per logging mode, each
+in a fresh interpreter because the logger is configured at import time. Reports latency percentiles
+per mode as JSON, for the whole request and for VehicleData.get_vehicle_data_as_dict alone (three log
+lines around a dict build), which isolates the logging cost from the model.
+
+Usage: python -m benchmarks.logging_overhead [--requests 2000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Environment of each logging mode; see src/logger for the meaning of the variables
+MODES = {
+    "sync": {"LOG_USE_QUEUE": "false", "LOG_SAMPLED_MODULES": ""},
+    "queue": {"LOG_USE_QUEUE": "true", "LOG_SAMPLED_MODULES": ""},
+    "queue_sampled": {"LOG_USE_QUEUE": "true"},
+    "queue_sampled_json": {"LOG_USE_QUEUE": "true", "LOG_FORMAT": "json"},
+}
+
+
+def run_worker(n_requests: int) -> None:
+    """
+    Times n_requests single-row predictions in this process and prints the latencies in milliseconds
+    """
+    from benchmarks.synthetic_model import build_model
+    from src.logger import flush_logs
+    from src.pipline.prediction_pipeline import VehicleData, VehicleDataClassifier
+
+    VehicleDataClassifier.loaded_model = build_model()
+    classifier = VehicleDataClassifier()
+    rng = np.random.default_rng(0)
+    latencies, dict_latencies = [], []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        vehicle_data = VehicleData(Gender=1, Age=int(rng.integers(20, 80)), Driving_License=1, Region_Code=28.0,
+                                   Previously_Insured=0, Annual_Premium=float(rng.uniform(2000, 60000)),
+                                   Policy_Sales_Channel=26.0, Vintage=int(rng.integers(10, 300)),
+                                   Vehicle_Age_lt_1_Year=0, Vehicle_Age_gt_2_Years=1, Vehicle_Damage_Yes=1)
+        classifier.predict(vehicle_data.get_vehicle_input_data_frame())
+        latencies.append(1000.0 * (time.perf_counter() - start))
+
+        start = time.perf_counter()
+        vehicle_data.get_vehicle_data_as_dict()
+        dict_latencies.append(1000.0 * (time.perf_counter() - start))
+
+    flush_start = time.perf_counter()
+    flush_logs()
+    flush_ms = 1000.0 * (time.perf_counter() - flush_start)
+    print(json.dumps({"latencies_ms": latencies, "dict_latencies_ms": dict_latencies, "flush_ms": flush_ms}))
+
+
+def summarize(latencies_ms: list) -> dict:
+    latencies = np.array(latencies_ms)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "mean_ms": round(float(latencies.mean()), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.requests)
+        return
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    report = {"requests": args.requests, "modes": {}}
+    for mode, environment in MODES.items():
+        result = subprocess.run([sys.executable, "-m", "benchmarks.logging_overhead", "--worker",
+                                 "--requests", str(args.requests)],
+                                cwd=project_root, env={**os.environ, **environment},
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+        worker = json.loads(result.stdout.strip().splitlines()[-1])
+        report["modes"][mode] = {
+            "request": summarize(worker["latencies_ms"]),
+            "get_vehicle_data_as_dict": summarize(worker["dict_latencies_ms"]),
+            "flush_at_exit_ms": round(worker["flush_ms"], 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark of peak memory while loading a model file.
+
+Saves one synthetic MyModel twice, as a dill pickle (the format models were saved in before) and with
+save_model_object (joblib), and loads each in a fresh interpreter:
+  - pickle_bytes: the previous load path, the whole file read into bytes and then pickle.loads
+  - joblib_mmap: load_model_object with mmap_mode "r", the current load path
+Reports the growth of peak RSS during the load, the RSS once the model is loaded and the size of the
+model's arrays as JSON, and checks that both copies of the model predict the same.
+
+Usage: python -m benchmarks.model_load_memory [--rows 200000] [--trees 100] [--max-depth 30]
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+MODES = ["pickle_bytes", "joblib_mmap"]
+
+
+def current_rss_bytes() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def peak_rss_bytes() -> int:
+    # VmHWM starts afresh with the new address space at exec, unlike ru_maxrss which a child inherits
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmHWM is not reported by /proc/self/status")
+
+
+def run_worker(mode: str, path: str) -> None:
+    """
+    Loads the model file at path with one of MODES and prints the memory figures as JSON
+    """
+    from benchmarks.synthetic_model import FEATURE_COLUMNS, random_records
+    from src.entity.estimator import MyModel  # noqa: F401 (imported before measuring, as in the app)
+    from src.utils.main_utils import load_model_object
+
+    import joblib  # noqa: F401 (imported before measuring)
+    import sklearn.compose, sklearn.ensemble, sklearn.pipeline, sklearn.preprocessing  # noqa: F401,E401
+
+    baseline_rss = current_rss_bytes()
+    if mode == "pickle_bytes":
+        with open(path, "rb") as file:
+            model = pickle.loads(file.read())
+    else:
+        model = load_model_object(path, mmap_mode="r")
+    loaded_rss = current_rss_bytes()
+
+    records = random_records(1000, seed=3)
+    raw = np.array([[record[column] for column in FEATURE_COLUMNS] for record in records], dtype=np.float64)
+    peak_rss = peak_rss_bytes()  # Before predicting, which pages in the mapped arrays
+    predictions = model.predict_array(raw)
+    print(json.dumps({
+        "peak_rss_growth_bytes": max(0, peak_rss - baseline_rss),
+        "rss_growth_after_load_bytes": loaded_rss - baseline_rss,
+        "predictions_checksum": int(np.sum(predictions * np.arange(len(predictions)))),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000, help="Training rows of the synthetic model")
+    parser.add_argument("--trees", type=int, default=100, help="Trees of the synthetic model")
+    parser.add_argument("--max-depth", type=int, default=30, help="Depth limit of its trees")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.path)
+        return
+
+    import dill
+
+    from benchmarks.synthetic_model import build_model
+    from src.utils.main_utils import save_model_object
+
+    # Noisy labels and deep trees give a forest of production size rather than a toy one
+    model = build_model(n_rows=args.rows, n_estimators=args.trees, max_depth=args.max_depth, label_noise=0.3)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {"pickle_bytes": os.path.join(directory, "model_dill.pkl"),
+                 "joblib_mmap": os.path.join(directory, "model_joblib.pkl")}
+        with open(paths["pickle_bytes"], "wb") as file:
+            dill.dump(model, file)
+        save_model_object(paths["joblib_mmap"], model)
+
+        report = {
+            "compiled_forest_bytes": model.compiled_forest.nbytes,
+            "file_bytes": {mode: os.path.getsize(path) for mode, path in paths.items()},
+            "modes": {},
+        }
+        for mode in MODES:
+            result = subprocess.run([sys.executable, "-m", "benchmarks.model_load_memory", "--worker", mode,
+                                     "--path", paths[mode]], cwd=project_root, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, text=True, check=True)
+            report["modes"][mode] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    checksums = {result.pop("predictions_checksum") for result in report["modes"].values()}
+    if len(checksums) != 1:
+        raise SystemExit("The two loaded copies of the model predict differently")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of concurrent S3 requests from many threads.
+
+Starts a local S3 stand-in (moto server) behind a proxy that adds --latency-ms to every request and
+response and two round trips to every new connection, then has --threads threads GET small objects
+through one shared client, in --rounds bursts of one request per thread (as batch existence checks,
+parallel transfers and batch scoring send them):
+  - previous_client: boto3.client with the default configuration (10 pooled connections, legacy
+    retries), as S3Client created it before
+  - pooled_client: S3Client().s3_client (S3_MAX_POOL_CONNECTIONS connections, adaptive retries, timeouts)
+Reports requests per second, p50/p99 latency, errors and the connections opened as JSON. A pool keeps
+at most its size of idle connections, so with 10 every burst has to reconnect all but 10 threads.
+
+Usage: python -m benchmarks.s3_concurrency [--threads 64] [--rounds 20] [--latency-ms 20]
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.load_harness import start_s3_stand_in_process
+from benchmarks.s3_transfer import ThrottlingProxy
+from src.constants import (AWS_ACCESS_KEY_ID_ENV_KEY, AWS_S3_ENDPOINT_URL_ENV_KEY, AWS_SECRET_ACCESS_KEY_ENV_KEY,
+                           REGION_NAME)
+
+BUCKET_NAME = "bkt-concurrency-benchmark"
+MODES = ["previous_client", "pooled_client"]
+
+
+def run_threads(client, keys: list, threads: int, rounds: int) -> dict:
+    """
+    GETs random keys from threads at once, one request per thread and round, and returns the
+    throughput, latency and error figures
+    """
+    latencies, errors = [], []
+    start_barrier = threading.Barrier(threads + 1)
+    round_barrier = threading.Barrier(threads)
+
+    def worker(seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        start_barrier.wait()
+        for _ in range(rounds):
+            round_barrier.wait()
+            started = time.perf_counter()
+            try:
+                client.get_object(Bucket=BUCKET_NAME, Key=keys[rng.integers(len(keys))])["Body"].read()
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 1) if latencies else None,
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=64, help="Threads sending requests at once")
+    parser.add_argument("--rounds", type=int, default=20, help="Bursts of one GET per thread")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="One-way latency added by the proxy")
+    parser.add_argument("--objects", type=int, default=100, help="Objects in the bucket")
+    parser.add_argument("--object-kb", type=int, default=16, help="Size of each object")
+    args = parser.parse_args()
+
+    import boto3
+
+    from src.configuration.aws_connection import S3Client
+
+    logging.getLogger("urllib3").setLevel(logging.ERROR)  # "Connection pool is full" per discarded connection
+    server, endpoint_url = start_s3_stand_in_process()
+    try:
+        proxy = ThrottlingProxy(int(endpoint_url.rsplit(":", 1)[1]), latency_seconds=args.latency_ms / 1000)
+        proxy_url = f"http://127.0.0.1:{proxy.port}"
+        os.environ.setdefault(AWS_ACCESS_KEY_ID_ENV_KEY, "testing")
+        os.environ.setdefault(AWS_SECRET_ACCESS_KEY_ENV_KEY, "testing")
+        os.environ[AWS_S3_ENDPOINT_URL_ENV_KEY] = proxy_url
+
+        setup = boto3.client("s3", endpoint_url=endpoint_url, region_name=REGION_NAME,
+                             aws_access_key_id="testing", aws_secret_access_key="testing")
+        setup.create_bucket(Bucket=BUCKET_NAME)
+        keys = [f"objects/{number:05d}.bin" for number in range(args.objects)]
+        for key in keys:
+            setup.put_object(Bucket=BUCKET_NAME, Key=key, Body=os.urandom(args.object_kb * 1024))
+
+        clients = {
+            "previous_client": lambda: boto3.client("s3", endpoint_url=proxy_url, region_name=REGION_NAME,
+                                                    aws_access_key_id=os.environ[AWS_ACCESS_KEY_ID_ENV_KEY],
+                                                    aws_secret_access_key=os.environ[AWS_SECRET_ACCESS_KEY_ENV_KEY]),
+            "pooled_client": lambda: S3Client().s3_client,
+        }
+        report = {"threads": args.threads, "rounds": args.rounds, "latency_ms": args.latency_ms,
+                  "modes": {}}
+        for mode in MODES:
+            connections = proxy.connections
+            report["modes"][mode] = run_threads(clients[mode](), keys, args.threads, args.rounds)
+            report["modes"][mode]["connections_opened"] = proxy.connections - connections
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmark of S3 upload and download throughput, single stream against parallel parts.
+
+Starts a local S3 stand-in (moto server) behind a proxy that limits every TCP connection to
+--connection-mbps, as S3 limits the throughput of a single connection, and transfers one object of
+--size-mb with:
+  - upload single_stream: one PutObject, as upload_file sent files before
+  - upload parallel: ParallelTransfer.upload_file, a multipart upload of parallel parts
+  - download single_stream: one GetObject read into memory, as read_object read objects before
+  - download parallel_buffer / parallel_file: a RangedDownload into a buffer / a local file
+Reports seconds, MB/s and the speedup over the single stream as JSON, and checks the downloaded bytes.
+
+Usage: python -m benchmarks.s3_transfer [--size-mb 128] [--connection-mbps 10] [--chunk-mb 8] [--concurrency 10]
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.load_harness import free_port
+from src.constants import REGION_NAME
+
+BUCKET_NAME = "bkt-transfer-benchmark"
+
+
+class ThrottlingProxy:
+    """
+    TCP proxy forwarding every connection to the S3 stand-in at no more than bytes_per_second
+    in each direction. With latency_seconds, every request and every response is delayed by it
+    and a new connection costs two more round trips, as a TLS handshake with S3 does.
+    """
+
+    block_size = 64 * 1024
+
+    def __init__(self, upstream_port: int, bytes_per_second: float = None, latency_seconds: float = 0.0):
+        self.upstream_port = upstream_port
+        self.bytes_per_second = bytes_per_second
+        self.latency_seconds = latency_seconds
+        self.connections = 0
+        self.listener = socket.create_server(("127.0.0.1", 0), backlog=512)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            client, _ = self.listener.accept()
+            self.connections += 1
+            upstream = socket.create_connection(("127.0.0.1", self.upstream_port))
+            handshake = 4 * self.latency_seconds
+            for source, target, delay in ((client, upstream, handshake), (upstream, client, 0.0)):
+                threading.Thread(target=self._pump, args=(source, target, delay), daemon=True).start()
+
+    def _pump(self, source: socket.socket, target: socket.socket, initial_delay: float) -> None:
+        started, sent, idle_since = None, 0, float("-inf")
+        with contextlib.suppress(OSError):
+            while True:
+                data = source.recv(self.block_size)
+                if not data:
+                    break
+                now = time.perf_counter()
+                if self.latency_seconds and now - idle_since > 0.001:  # A new request or response
+                    time.sleep(self.latency_seconds + initial_delay)
+                    initial_delay, now = 0.0, time.perf_counter()
+                if self.bytes_per_second:
+                    if started is None or now - started > sent / self.bytes_per_second + 0.05:
+                        started, sent = now, 0  # The connection was idle; the limit applies from here
+                    sent += len(data)
+                    delay = started + sent / self.bytes_per_second - now
+                    if delay > 0:
+                        time.sleep(delay)
+                target.sendall(data)
+                idle_since = time.perf_counter()
+        for sock in (source, target):
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+
+def timed(function) -> float:
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=128, help="Size of the transferred object")
+    parser.add_argument("--connection-mbps", type=float, default=10.0, help="Throughput limit of one connection, MB/s")
+    parser.add_argument("--chunk-mb", type=int, default=8, help="Part size of the parallel transfers")
+    parser.add_argument("--concurrency", type=int, default=10, help="Parts transferred in parallel")
+    args = parser.parse_args()
+
+    import boto3
+    from botocore.config import Config
+    from moto.server import ThreadedMotoServer
+
+    from src.cloud_storage.s3_transfer import ParallelTransfer
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # One INFO line per request would swamp the report
+    moto_port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=moto_port)
+    with contextlib.redirect_stdout(sys.stderr):  # Keep stdout for the JSON report
+        server.start()
+    proxy = ThrottlingProxy(moto_port, args.connection_mbps * 1e6)
+    client = boto3.client("s3", endpoint_url=f"http://127.0.0.1:{proxy.port}", region_name=REGION_NAME,
+                          aws_access_key_id="testing", aws_secret_access_key="testing",
+                          config=Config(max_pool_connections=max(10, args.concurrency)))
+    client.create_bucket(Bucket=BUCKET_NAME)
+
+    chunk_size = args.chunk_mb * 1024 * 1024
+    single_stream = ParallelTransfer(chunk_size=chunk_size, max_concurrency=1, multipart_threshold=2 ** 62)
+    parallel = ParallelTransfer(chunk_size=chunk_size, max_concurrency=args.concurrency, multipart_threshold=chunk_size)
+
+    size = args.size_mb * 1024 * 1024
+    payload = os.urandom(size)
+    expected_digest = hashlib.sha256(payload).hexdigest()
+    seconds = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            source_path = os.path.join(directory, "source.bin")
+            with open(source_path, "wb") as file:
+                file.write(payload)
+            del payload
+
+            seconds["upload_single_stream"] = timed(
+                lambda: single_stream.upload_file(client, source_path, BUCKET_NAME, "single.bin"))
+            seconds["upload_parallel"] = timed(
+                lambda: parallel.upload_file(client, source_path, BUCKET_NAME, "parallel.bin"))
+
+            digests = {}
+
+            def read_single_stream() -> None:
+                digests["single_stream"] = hashlib.sha256(
+                    client.get_object(Bucket=BUCKET_NAME, Key="parallel.bin")["Body"].read()).hexdigest()
+
+            def read_parallel_buffer() -> None:
+                digests["parallel_buffer"] = hashlib.sha256(
+                    parallel.open_download(client, BUCKET_NAME, "single.bin").read()).hexdigest()
+
+            def read_parallel_file() -> None:
+                target_path = os.path.join(directory, "target.bin")
+                with open(target_path, "wb") as file:
+                    parallel.open_download(client, BUCKET_NAME, "parallel.bin").write_to(file)
+                digest = hashlib.sha256()
+                with open(target_path, "rb") as file:
+                    for block in iter(lambda: file.read(chunk_size), b""):
+                        digest.update(block)
+                digests["parallel_file"] = digest.hexdigest()
+
+            seconds["download_single_stream"] = timed(read_single_stream)
+            seconds["download_parallel_buffer"] = timed(read_parallel_buffer)
+            seconds["download_parallel_file"] = timed(read_parallel_file)
+    finally:
+        server.stop()
+
+    if any(digest != expected_digest for digest in digests.values()):
+        raise SystemExit(f"Downloaded bytes differ from the uploaded object: {digests}")
+
+    report = {
+        "size_bytes": size,
+        "connection_limit_mbps": args.connection_mbps,
+        "chunk_bytes": chunk_size,
+        "concurrency": args.concurrency,
+        "transfers": {},
+    }
+    for name, elapsed in seconds.items():
+        baseline = seconds["upload_single_stream" if name.startswith("upload") else "download_single_stream"]
+        report["transfers"][name] = {
+            "seconds": round(elapsed, 3),
+            "mb_per_second": round(size / elapsed / 1e6, 1),
+            "speedup": round(baseline / elapsed, 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Synthetic MyModel shared by the benchmarks.
+
+Fits the project's preprocessing (StandardScaler on Age/Vintage, MinMaxScaler on Annual_Premium,
+passthrough for the rest) and the model trainer's forest settings on random vehicle rows, so the
+benchmarks exercise a model with the production structure without MongoDB or S3.
+"""
+import numpy as np
+
+FEATURE_COLUMNS = ["Gender", "Age", "Driving_License", "Region_Code", "Previously_Insured", "Annual_Premium",
+                   "Policy_Sales_Channel", "Vintage", "Vehicle_Age_lt_1_Year", "Vehicle_Age_gt_2_Years",
+                   "Vehicle_Damage_Yes"]
+
+
+def random_records(n_rows: int, seed: int = 0) -> list:
+    """
+    Returns n_rows request records with plausible feature values
+    """
+    rng = np.random.default_rng(seed)
+    return [{
+        "Gender": int(rng.integers(0, 2)),
+        "Age": int(rng.integers(20, 80)),
+        "Driving_License": 1,
+        "Region_Code": float(rng.integers(0, 50)),
+        "Previously_Insured": int(rng.integers(0, 2)),
+        "Annual_Premium": round(float(rng.uniform(2000, 60000)), 2),
+        "Policy_Sales_Channel": float(rng.integers(1, 160)),
+        "Vintage": int(rng.integers(10, 300)),
+        "Vehicle_Age_lt_1_Year": int(rng.integers(0, 2)),
+        "Vehicle_Age_gt_2_Years": 0,
+        "Vehicle_Damage_Yes": int(rng.integers(0, 2)),
+    } for _ in range(n_rows)]
+
+
+def build_model(n_rows: int = 5000, seed: int = 101, n_estimators: int = None, max_depth: int = None,
+                label_noise: float = 0.0):
+    """
+    Fits the project's preprocessing and forest settings on synthetic vehicle rows.
+    n_estimators, max_depth (None keeps the trainer's setting) and label_noise (share of flipped labels,
+    which makes the trees grow) give larger models for memory benchmarks.
+    """
+    import pandas as pd
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+    from src.entity.config_entity import ModelTrainerConfig
+    from src.entity.estimator import MyModel
+    from src.entity.feature_layout import FeatureLayout
+    from src.entity.forest_engine import CompiledForest
+
+    X = pd.DataFrame(random_records(n_rows, seed))[FEATURE_COLUMNS]
+    y = ((X["Vehicle_Damage_Yes"] == 1) & (X["Previously_Insured"] == 0)).astype(int)
+    if label_noise:
+        flip = np.random.default_rng(seed + 1).random(n_rows) < label_noise
+        y = y ^ flip.astype(int)
+
+    preprocessor = Pipeline(steps=[("Preprocessor", ColumnTransformer(
+        transformers=[("StandardScaler", StandardScaler(), ["Age", "Vintage"]),
+                      ("MinMaxScaler", MinMaxScaler(), ["Annual_Premium"])],
+        remainder="passthrough"))])
+    config = ModelTrainerConfig()
+    forest = RandomForestClassifier(n_estimators=n_estimators or config._n_estimators,
+                                    min_samples_split=config._min_samples_split,
+                                    min_samples_leaf=config._min_samples_leaf,
+                                    max_depth=max_depth or config._max_depth,
+                                    criterion=config._criterion,
+                                    random_state=config._random_state).fit(preprocessor.fit_transform(X), y)
+    return MyModel(preprocessor, forest,
+                   feature_layout=FeatureLayout.from_preprocessing_object(preprocessor),
+                   compiled_forest=CompiledForest.from_random_forest(forest))
@@ -1,14 +1,23 @@
 import boto3
 from src.configuration.aws_connection import S3Client
-from io import StringIO
-from typing import Union,List
+from src.cloud_storage.model_cache import model_disk_cache
+from src.cloud_storage.s3_metadata import s3_metadata_cache
+from src.cloud_storage.s3_transfer import RangedFile, s3_transfer
+from src.constants import MODEL_MMAP_MODE, S3_DATAFRAME_CHUNK_ROWS, S3_HEAD_MAX_CONCURRENCY, S3_PARQUET_COMPRESSION
+from src.utils.main_utils import load_model_object
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from typing import TYPE_CHECKING,Union,List,Dict,Optional,Tuple,Sequence
 import os,sys
+import tempfile
 from src.logger import logging
-from mypy_boto3_s3.service_resource import Bucket
 from src.exception import MyException
 from botocore.exceptions import ClientError
 from pandas import DataFrame,read_csv
-import pickle
+
+if TYPE_CHECKING:
+    # Type stubs only; not needed (or loaded) at runtime
+    from mypy_boto3_s3.service_resource import Bucket
 
 
 class SimpleStorageService:
@@ -22,13 +31,28 @@ class SimpleStorageService:
         Initializes the SimpleStorageService instance with S3 resource and client
         from the S3Client class.
         """
-        s3_client = S3Client()
-        self.s3_resource = s3_client.s3_resource
-        self.s3_client = s3_client.s3_client
+        self.s3_connection = S3Client()
+
+    @property
+    def s3_resource(self):
+        """
+        The S3 resource of the calling thread; boto3 resources must not be shared between threads.
+        """
+        return self.s3_connection.s3_resource
+
+    @property
+    def s3_client(self):
+        """
+        The S3 client shared by every thread, with its pool of S3_MAX_POOL_CONNECTIONS connections.
+        """
+        return self.s3_connection.s3_client
 
     def s3_key_path_available(self, bucket_name, s3_key) -> bool:
         """
         Checks if a specified S3 key path (file path) is available in the specified bucket.
+        Uses an exact-key HEAD (answered from the metadata cache while fresh) instead of a prefix
+        listing, so the cost does not grow with the number of objects and model.pkl does not match
+        model.pkl.bak.
 
         Args:
             bucket_name (str): Name of the S3 bucket.
@@ -38,16 +62,95 @@ class SimpleStorageService:
             bool: True if the file exists, False otherwise.
         """
         try:
-            bucket = self.get_bucket(bucket_name)
-            file_objects = [file_object for file_object in bucket.objects.filter(Prefix=s3_key)]
-            return len(file_objects) > 0
+            return self.get_object_metadata(bucket_name, s3_key) is not None
         except Exception as e:
             raise MyException(e, sys)
 
+    def s3_keys_available(self, bucket_name: str, s3_keys: List[str]) -> Dict[str, bool]:
+        """
+        Checks many exact keys at once. Keys with fresh cached metadata cost nothing; the others are
+        checked with HEAD requests sent in parallel.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            s3_keys (List[str]): Key paths of the files to check.
+
+        Returns:
+            Dict[str, bool]: Whether each key exists.
+        """
+        try:
+            unique_keys = list(dict.fromkeys(s3_keys))
+            with ThreadPoolExecutor(max_workers=max(1, min(S3_HEAD_MAX_CONCURRENCY, len(unique_keys)))) as executor:
+                metadata = executor.map(lambda key: self.get_object_metadata(bucket_name, key), unique_keys)
+                return {key: value is not None for key, value in zip(unique_keys, metadata)}
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_object_metadata(self, bucket_name: str, s3_key: str, version_id: str = None,
+                            use_cache: bool = True) -> Optional[dict]:
+        """
+        Returns the size, ETag and last-modified time of the object stored at the exact S3 key,
+        from the in-process metadata cache while it is fresh and from a HEAD request otherwise.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            s3_key (str): Key path of the object.
+            version_id (str): S3 version of the object (optional). Versions are not cached.
+            use_cache (bool): Set to False to always ask S3 (the answer still refreshes the cache).
+
+        Returns:
+            Optional[dict]: {"size", "etag", "last_modified"}, or None when the key does not exist.
+        """
+        try:
+            if use_cache and not version_id:
+                found, metadata = s3_metadata_cache.get(bucket_name, s3_key)
+                if found:
+                    return metadata
+
+            version_args = {"VersionId": version_id} if version_id else {}
+            try:
+                response = self.s3_client.head_object(Bucket=bucket_name, Key=s3_key, **version_args)
+                metadata = {
+                    "size": response["ContentLength"],
+                    "etag": response["ETag"].strip('"'),
+                    "last_modified": response["LastModified"],
+                }
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("404", "NoSuchKey", "NotFound"):
+                    raise
+                metadata = None
+
+            if not version_id:
+                s3_metadata_cache.put(bucket_name, s3_key, metadata)
+            return metadata
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_object_etag(self, bucket_name: str, s3_key: str, version_id: str = None) -> str:
+        """
+        Returns the ETag of the object stored at the exact S3 key.
+
+        Args:
+            bucket_name (str): Name of the S3 bucket.
+            s3_key (str): Key path of the object.
+            version_id (str): S3 version of the object (optional). Defaults to the latest version.
+
+        Returns:
+            str: The object's ETag with the surrounding quotes removed.
+        """
+        try:
+            metadata = self.get_object_metadata(bucket_name, s3_key, version_id=version_id)
+            if metadata is None:
+                raise FileNotFoundError(f"s3://{bucket_name}/{s3_key} does not exist")
+            return metadata["etag"]
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     @staticmethod
     def read_object(object_name: str, decode: bool = True, make_readable: bool = False) -> Union[StringIO, str]:
         """
         Reads the specified S3 object with optional decoding and formatting.
+        Large objects are downloaded as ranged GETs in parallel (see s3_transfer).
 
         Args:
             object_name (str): The S3 object name.
@@ -60,10 +163,9 @@ class SimpleStorageService:
         # logging.info("Entered the read_object method of SimpleStorageService class")
         try:
             # Read and decode the object content if decode=True
-            func = (
-                lambda: object_name.get()["Body"].read().decode()
-                if decode else object_name.get()["Body"].read()
-            )
+            read = lambda: s3_transfer.open_download(object_name.meta.client, object_name.bucket_name,
+                                                     object_name.key).read()
+            func = lambda: read().decode() if decode else read()
             # Convert to StringIO if make_readable=True
             conv_func = lambda: StringIO(func()) if make_readable else func()
             # logging.info("Exited the read_object method of SimpleStorageService class")
@@ -71,7 +173,7 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
-    def get_bucket(self, bucket_name: str) -> Bucket:
+    def get_bucket(self, bucket_name: str) -> "Bucket":
         """
         Retrieves the S3 bucket object based on the provided bucket name.
 
@@ -92,6 +194,8 @@ class SimpleStorageService:
     def get_file_object(self, filename: str, bucket_name: str) -> Union[List[object], object]:
         """
         Retrieves the file object(s) from the specified bucket based on the filename.
+        An exact key is resolved with a (cached) HEAD; only a name that is not a key itself,
+        such as a folder, falls back to a prefix listing.
 
         Args:
             filename (str): The name of the file to retrieve.
@@ -102,6 +206,9 @@ class SimpleStorageService:
         """
         logging.info("Entered the get_file_object method of SimpleStorageService class")
         try:
+            if self.get_object_metadata(bucket_name, filename) is not None:
+                return self.s3_resource.Object(bucket_name, filename)
+
             bucket = self.get_bucket(bucket_name)
             file_objects = [file_object for file_object in bucket.objects.filter(Prefix=filename)]
             func = lambda x: x[0] if len(x) == 1 else x
@@ -111,7 +218,7 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
-    def load_model(self, model_name: str, bucket_name: str, model_dir: str = None) -> object:
+    def load_model(self, model_name: str, bucket_name: str, model_dir: str = None, version_id: str = None) -> object:
         """
         Loads a serialized model from the specified S3 bucket.
 
@@ -119,17 +226,104 @@ class SimpleStorageService:
             model_name (str): Name of the model file in the bucket.
             bucket_name (str): Name of the S3 bucket.
             model_dir (str): Directory path within the bucket.
+            version_id (str): S3 version of the model file (optional). Defaults to the latest version.
 
         Returns:
             object: The deserialized model object.
         """
+        return self.load_model_with_etag(model_name, bucket_name, model_dir, version_id)[0]
+
+    def load_model_with_etag(self, model_name: str, bucket_name: str, model_dir: str = None,
+                             version_id: str = None) -> Tuple[object, Optional[str], int]:
+        """
+        Loads a serialized model and returns it with the ETag of the object it came from and the size
+        of the model file (the memory its arrays take once mapped, without pickling the model again).
+        With the model disk cache enabled the model is read from the local copy, which is only
+        downloaded again when S3 holds a newer object (see get_model_file).
+
+        Args:
+            model_name (str): Name of the model file in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+            model_dir (str): Directory path within the bucket.
+            version_id (str): S3 version of the model file (optional). Defaults to the latest version.
+
+        Returns:
+            Tuple[object, Optional[str], int]: The deserialized model object, its ETag
+            (None when a requested version was served from the cache without asking S3) and the
+            size of the model file in bytes.
+        """
         try:
             model_file = model_dir + "/" + model_name if model_dir else model_name
-            file_object = self.get_file_object(model_file, bucket_name)
-            model_obj = self.read_object(file_object, decode=False)
-            model = pickle.loads(model_obj)
+            # The body is streamed to a local file and the model's arrays are memory-mapped from it, so
+            # the download is never held in memory as bytes next to the unpickled model
+            mmap_mode = MODEL_MMAP_MODE or None
+            if model_disk_cache.enabled:
+                path, etag = self.get_model_file(model_file, bucket_name, version_id)
+                nbytes = os.path.getsize(path)
+                model = load_model_object(path, mmap_mode=mmap_mode)
+            else:
+                download = s3_transfer.open_download(self.s3_client, bucket_name, model_file, version_id=version_id)
+                etag = download.etag
+                with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as file:
+                    download.write_to(file)
+                nbytes = os.path.getsize(file.name)
+                try:
+                    model = load_model_object(file.name, mmap_mode=mmap_mode)
+                finally:
+                    os.remove(file.name)  # Mapped pages stay readable until the model is released
             logging.info("Production model loaded from S3 bucket.")
-            return model
+            return model, etag, nbytes
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_model_file(self, s3_key: str, bucket_name: str, version_id: str = None) -> Tuple[str, Optional[str]]:
+        """
+        Returns the local path of an up-to-date copy of a model file from the model disk cache.
+
+        A requested version is immutable, so a cached copy is used without asking S3. For the latest
+        object a conditional GET (If-None-Match with the cached ETag) is sent: S3 answers 304 without
+        a body when the cached copy is current and the full object otherwise, which is then downloaded
+        in parallel ranges and cached.
+
+        Args:
+            s3_key (str): Key of the model file in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+            version_id (str): S3 version of the model file (optional). Defaults to the latest version.
+
+        Returns:
+            Tuple[str, Optional[str]]: Path of the local copy and the object's ETag
+            (None when a cached version was used).
+        """
+        try:
+            if version_id:
+                path = model_disk_cache.get(bucket_name, s3_key, version_id=version_id)
+                if path is not None:
+                    model_disk_cache.record("hit")
+                    return path, None
+                cached_etag = None
+            else:
+                cached_etag = model_disk_cache.latest_etag(bucket_name, s3_key)
+
+            try:
+                download = s3_transfer.open_download(self.s3_client, bucket_name, s3_key, version_id=version_id,
+                                                     if_none_match=cached_etag)
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("304", "NotModified"):
+                    raise
+                path = model_disk_cache.get(bucket_name, s3_key, etag=cached_etag)
+                if path is not None:
+                    model_disk_cache.record("not_modified")
+                    logging.info(f"Cached copy of s3://{bucket_name}/{s3_key} is current ({cached_etag})")
+                    return path, cached_etag
+                # Evicted since the check; download it unconditionally
+                download = s3_transfer.open_download(self.s3_client, bucket_name, s3_key, version_id=version_id)
+
+            etag = download.etag
+            if not version_id:
+                s3_metadata_cache.put(bucket_name, s3_key, download.metadata)
+            path = model_disk_cache.put(bucket_name, s3_key, download, etag=etag, version_id=version_id)
+            model_disk_cache.record("miss")
+            return path, etag
         except Exception as e:
             raise MyException(e, sys) from e
 
@@ -150,11 +344,13 @@ class SimpleStorageService:
             if e.response["Error"]["Code"] == "404":
                 folder_obj = folder_name + "/"
                 self.s3_client.put_object(Bucket=bucket_name, Key=folder_obj)
+                s3_metadata_cache.invalidate(bucket_name, folder_obj)
             logging.info("Exited the create_folder method of SimpleStorageService class")
 
     def upload_file(self, from_filename: str, to_filename: str, bucket_name: str, remove: bool = True):
         """
         Uploads a local file to the specified S3 bucket with an optional file deletion.
+        Files of S3_MULTIPART_THRESHOLD bytes or more are sent as a multipart upload of parallel parts.
 
         Args:
             from_filename (str): Path of the local file.
@@ -165,7 +361,8 @@ class SimpleStorageService:
         logging.info("Entered the upload_file method of SimpleStorageService class")
         try:
             logging.info(f"Uploading {from_filename} to {to_filename} in {bucket_name}")
-            self.s3_resource.meta.client.upload_file(from_filename, bucket_name, to_filename)
+            s3_transfer.upload_file(self.s3_client, from_filename, bucket_name, to_filename)
+            s3_metadata_cache.invalidate(bucket_name, to_filename)
             logging.info(f"Uploaded {from_filename} to {to_filename} in {bucket_name}")
 
             # Delete the local file if remove is True
@@ -176,25 +373,176 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
 
+    def download_file(self, s3_key: str, bucket_name: str, to_filename: str, version_id: str = None) -> str:
+        """
+        Downloads an S3 object to a local file as ranged GETs sent in parallel. The file is written
+        under a temporary name and renamed into place once complete.
+
+        Args:
+            s3_key (str): Key path of the object.
+            bucket_name (str): Name of the S3 bucket.
+            to_filename (str): Path of the local file.
+            version_id (str): S3 version of the object (optional). Defaults to the latest version.
+
+        Returns:
+            str: The path of the local file.
+        """
+        logging.info("Entered the download_file method of SimpleStorageService class")
+        try:
+            directory = os.path.dirname(os.path.abspath(to_filename))
+            os.makedirs(directory, exist_ok=True)
+            download = s3_transfer.open_download(self.s3_client, bucket_name, s3_key, version_id=version_id)
+            with tempfile.NamedTemporaryFile(dir=directory, prefix=".download-", delete=False) as file:
+                try:
+                    download.write_to(file)
+                except BaseException:
+                    file.close()
+                    os.remove(file.name)
+                    raise
+            os.replace(file.name, to_filename)
+            logging.info("Exited the download_file method of SimpleStorageService class")
+            return to_filename
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def dataframe_file_format(filename: str) -> str:
+        """
+        Returns the format of a DataFrame file from its extension.
+
+        Args:
+            filename (str): Key path ending in .parquet, .csv.zst or .csv.
+
+        Returns:
+            str: "parquet", "csv.zst" or "csv".
+        """
+        for file_format in ("parquet", "csv.zst", "csv"):
+            if filename.endswith("." + file_format):
+                return file_format
+        raise ValueError(f"Unsupported DataFrame file {filename}: use a .parquet, .csv.zst or .csv key")
+
+    def upload_df(self, data_frame: DataFrame, bucket_filename: str, bucket_name: str, file_format: str = None) -> int:
+        """
+        Uploads a DataFrame without a local file: it is serialized S3_DATAFRAME_CHUNK_ROWS rows at a time
+        into a pipe that a multipart upload reads from, so neither the disk nor a full copy of the
+        encoded file in memory is needed.
+
+        Args:
+            data_frame (DataFrame): DataFrame to be uploaded.
+            bucket_filename (str): Target filename in the bucket.
+            bucket_name (str): Name of the S3 bucket.
+            file_format (str): "parquet" (S3_PARQUET_COMPRESSION compressed, one row group per chunk of rows),
+                "csv.zst" (zstd compressed CSV) or "csv". Defaults to the extension of bucket_filename.
+
+        Returns:
+            int: Bytes uploaded.
+        """
+        logging.info("Entered the upload_df method of SimpleStorageService class")
+        try:
+            file_format = file_format or self.dataframe_file_format(bucket_filename)
+            if file_format not in ("parquet", "csv.zst", "csv"):
+                raise ValueError(f"Unsupported DataFrame file format {file_format}")
+            chunks = lambda: (data_frame.iloc[start:start + S3_DATAFRAME_CHUNK_ROWS]
+                              for start in range(0, max(len(data_frame), 1), S3_DATAFRAME_CHUNK_ROWS))
+
+            def write(stream) -> None:
+                if file_format == "parquet":
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    schema = pa.Schema.from_pandas(data_frame, preserve_index=False)
+                    with pq.ParquetWriter(stream, schema, compression=S3_PARQUET_COMPRESSION) as writer:
+                        for chunk in chunks():
+                            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                    return
+
+                if file_format == "csv.zst":
+                    import pyarrow as pa
+                    stream = pa.CompressedOutputStream(stream, "zstd")
+                for number, chunk in enumerate(chunks()):
+                    stream.write(chunk.to_csv(index=None, header=number == 0).encode())
+                stream.close()
+
+            size = s3_transfer.upload_from_writer(self.s3_client, write, bucket_name, bucket_filename)
+            s3_metadata_cache.invalidate(bucket_name, bucket_filename)
+            logging.info(f"Uploaded {len(data_frame)} rows to {bucket_filename} in {bucket_name} as {file_format}")
+            logging.info("Exited the upload_df method of SimpleStorageService class")
+            return size
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def upload_df_as_csv(self, data_frame: DataFrame, local_filename: str, bucket_filename: str, bucket_name: str) -> None:
         """
         Uploads a DataFrame as a CSV file to the specified S3 bucket.
+        The CSV is streamed to S3 by upload_df; nothing is written to local_filename any more.
 
         Args:
             data_frame (DataFrame): DataFrame to be uploaded.
-            local_filename (str): Temporary local filename for the DataFrame.
+            local_filename (str): Unused, kept for existing callers.
             bucket_filename (str): Target filename in the bucket.
             bucket_name (str): Name of the S3 bucket.
         """
         logging.info("Entered the upload_df_as_csv method of SimpleStorageService class")
         try:
-            # Save DataFrame to CSV locally and then upload it
-            data_frame.to_csv(local_filename, index=None, header=True)
-            self.upload_file(local_filename, bucket_filename, bucket_name)
+            self.upload_df(data_frame, bucket_filename, bucket_name, file_format="csv")
             logging.info("Exited the upload_df_as_csv method of SimpleStorageService class")
         except Exception as e:
             raise MyException(e, sys) from e
 
+    def read_df(self, filename: str, bucket_name: str, columns: Sequence[str] = None,
+                filters: list = None) -> DataFrame:
+        """
+        Reads a DataFrame file written by upload_df (or any .parquet, .csv.zst or .csv object).
+
+        For Parquet, columns and filters are applied while reading: when either is given, only the
+        footer and the column chunks of the selected columns are fetched, with ranged GETs, and row
+        groups whose statistics rule out the filters are skipped. Without them, or for objects no larger
+        than one transfer chunk, the object is downloaded whole in parallel ranges.
+
+        Args:
+            filename (str): The name of the file in the bucket.
+            bucket_name (str): The name of the S3 bucket.
+            columns (Sequence[str]): Columns to read (optional). Defaults to all columns.
+            filters (list): Row filters in pyarrow's DNF form, e.g. [("Age", ">", 30)] (Parquet only).
+
+        Returns:
+            DataFrame: The selected columns of the matching rows.
+        """
+        logging.info("Entered the read_df method of SimpleStorageService class")
+        try:
+            file_format = self.dataframe_file_format(filename)
+            if file_format == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                metadata = self.get_object_metadata(bucket_name, filename, use_cache=False)
+                if metadata is None:
+                    raise FileNotFoundError(f"s3://{bucket_name}/{filename} does not exist")
+                if (columns is None and filters is None) or metadata["size"] <= s3_transfer.chunk_size:
+                    source = pa.BufferReader(s3_transfer.open_download(self.s3_client, bucket_name, filename).read())
+                else:
+                    source = RangedFile(self.s3_client, bucket_name, filename, metadata["size"], metadata["etag"])
+                table = pq.read_table(source, columns=list(columns) if columns is not None else None,
+                                      filters=filters)
+                if isinstance(source, RangedFile):
+                    logging.info(f"Read {source.bytes_read} of {source.size} bytes of {filename} "
+                                 f"in {source.requests} ranged GETs")
+                df = table.to_pandas()
+            else:
+                if filters is not None:
+                    raise ValueError("Row filters need a Parquet file; CSV has no row groups to skip")
+                content = s3_transfer.open_download(self.s3_client, bucket_name, filename).read()
+                if file_format == "csv.zst":
+                    import pyarrow as pa
+                    stream = pa.CompressedInputStream(pa.BufferReader(content), "zstd")
+                else:
+                    stream = BytesIO(content)
+                df = read_csv(stream, usecols=columns, na_values="na")
+            logging.info("Exited the read_df method of SimpleStorageService class")
+            return df
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def get_df_from_object(self, object_: object) -> DataFrame:
         """
         Converts an S3 object to a DataFrame.
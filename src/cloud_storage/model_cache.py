@@ -0,0 +1,211 @@
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from typing import Optional
+
+from src.constants import MODEL_CACHE_DIR, MODEL_CACHE_ENABLED, MODEL_CACHE_MAX_BYTES, S3_DOWNLOAD_CHUNK_SIZE
+from src.exception import MyException
+from src.logger import logging
+from src.utils.metrics import metrics_registry
+
+model_cache_requests_total = metrics_registry.counter(
+    "model_cache_requests_total",
+    "Model loads by outcome of the local disk cache: hit (no S3 call), not_modified (S3 answered 304) or miss",
+    labelnames=("result",))
+
+
+class ModelDiskCache:
+    """
+    Local disk cache of model files downloaded from S3, so that restarts and new pods read the model
+    from disk instead of downloading it again.
+
+    Every bucket/key has its own folder holding one file per ETag it was downloaded with, plus a LATEST
+    file naming the most recent ETag; S3 version ids get files of their own, since a version never
+    changes. Files are written to a temporary name and renamed into place, so a reader (in this or any
+    other process sharing the folder) never sees a partial file. Once the files take more than max_bytes
+    the least recently used ones are deleted.
+    """
+
+    latest_file_name = "LATEST"
+    model_file_suffix = ".pkl"
+
+    def __init__(self, cache_dir: str = MODEL_CACHE_DIR, max_bytes: int = MODEL_CACHE_MAX_BYTES,
+                 enabled: bool = MODEL_CACHE_ENABLED):
+        """
+        :param cache_dir: Folder holding the cached model files
+        :param max_bytes: Disk budget of the cache; least recently used files beyond it are deleted
+        :param enabled: When False every load downloads the model, as before the cache existed
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+        self.bytes_downloaded = 0
+        self.evictions = 0
+
+    def _object_dir(self, bucket_name: str, s3_key: str) -> str:
+        digest = hashlib.sha256(f"{bucket_name}/{s3_key}".encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, digest)
+
+    def _file_path(self, bucket_name: str, s3_key: str, etag: str = None, version_id: str = None) -> str:
+        name = f"v-{version_id}" if version_id else f"e-{etag}"
+        safe_name = "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
+        return os.path.join(self._object_dir(bucket_name, s3_key), safe_name + self.model_file_suffix)
+
+    def latest_etag(self, bucket_name: str, s3_key: str) -> Optional[str]:
+        """
+        Returns the ETag of the most recent download of the latest object at bucket/key,
+        when its file is still in the cache
+        """
+        try:
+            with open(os.path.join(self._object_dir(bucket_name, s3_key), self.latest_file_name)) as file:
+                etag = file.read().strip()
+            return etag if etag and os.path.exists(self._file_path(bucket_name, s3_key, etag=etag)) else None
+        except OSError:
+            return None
+
+    def get(self, bucket_name: str, s3_key: str, etag: str = None, version_id: str = None) -> Optional[str]:
+        """
+        Returns the path of the cached file of an ETag or version id, None when it is not cached
+        """
+        path = self._file_path(bucket_name, s3_key, etag=etag, version_id=version_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(path)  # Marks the file as recently used for eviction
+        except OSError:
+            return None
+        return path
+
+    def put(self, bucket_name: str, s3_key: str, body, etag: str, version_id: str = None) -> str:
+        """
+        Writes a downloaded model atomically and returns its path
+        :param body: File-like object (e.g. the S3 response body), bytes, or a RangedDownload
+        """
+        try:
+            path = self._file_path(bucket_name, s3_key, etag=etag, version_id=version_id)
+            object_dir = os.path.dirname(path)
+            os.makedirs(object_dir, exist_ok=True)
+
+            descriptor, temp_path = tempfile.mkstemp(dir=object_dir, prefix=".download-")
+            size = 0
+            try:
+                with os.fdopen(descriptor, "wb") as file:
+                    if isinstance(body, (bytes, bytearray, memoryview)):
+                        size = file.write(body)
+                    elif hasattr(body, "write_to"):
+                        size = body.write_to(file)
+                    else:
+                        for chunk in iter(lambda: body.read(S3_DOWNLOAD_CHUNK_SIZE), b""):
+                            size += file.write(chunk)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+            if not version_id:
+                self._write_latest(object_dir, etag)
+            with self._lock:
+                self.bytes_downloaded += size
+            logging.info(f"Cached s3://{bucket_name}/{s3_key} ({etag or version_id}, {size} bytes) at {path}")
+            self.evict(keep=path)
+            return path
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _write_latest(self, object_dir: str, etag: str) -> None:
+        descriptor, temp_path = tempfile.mkstemp(dir=object_dir, prefix=".latest-")
+        with os.fdopen(descriptor, "w") as file:
+            file.write(etag)
+        os.replace(temp_path, os.path.join(object_dir, self.latest_file_name))
+
+    def record(self, result: str) -> None:
+        """
+        Counts a model load as a "hit", "not_modified" or "miss"
+        """
+        with self._lock:
+            if result == "hit":
+                self.hits += 1
+            elif result == "not_modified":
+                self.not_modified += 1
+            else:
+                self.misses += 1
+        model_cache_requests_total.labels(result).inc()
+
+    def _cached_files(self) -> list:
+        """
+        Returns (last used time, size, path) of every cached model file
+        """
+        files = []
+        if not os.path.isdir(self.cache_dir):
+            return files
+        for object_dir in os.scandir(self.cache_dir):
+            if not object_dir.is_dir():
+                continue
+            for entry in os.scandir(object_dir.path):
+                if entry.name.endswith(self.model_file_suffix):
+                    try:
+                        stat = entry.stat()
+                    except OSError:  # Deleted by another process meanwhile
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def evict(self, keep: str = None) -> None:
+        """
+        Deletes the least recently used files until the cache fits in max_bytes; keep is never deleted
+        """
+        try:
+            files = sorted(self._cached_files())
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+                logging.info(f"Evicted {path} from the model cache")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit, 304 and miss counts, downloaded bytes and the current disk usage of the cache
+        """
+        files = self._cached_files() if self.enabled else []
+        with self._lock:
+            loads = self.hits + self.not_modified + self.misses
+            return {
+                "enabled": self.enabled,
+                "cache_dir": os.path.abspath(self.cache_dir),
+                "files": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "not_modified": self.not_modified,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.not_modified) / loads if loads else None,
+                "bytes_downloaded": self.bytes_downloaded,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide cache used by SimpleStorageService.load_model
+model_disk_cache = ModelDiskCache()
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.constants import S3_METADATA_CACHE_MAX_ENTRIES, S3_METADATA_CACHE_TTL_SECONDS
+from src.utils.metrics import metrics_registry
+
+s3_requests_total = metrics_registry.counter(
+    "s3_requests_total", "S3 API requests sent by this process, by operation (every listing page counts)",
+    labelnames=("operation",))
+
+
+class S3CallCounter:
+    """
+    Counts the S3 API requests sent by this process, per operation.
+
+    Hooked into botocore's before-call event of every S3 client and resource that S3Client creates,
+    so it sees each request actually sent, including every page of a paginated listing.
+    snapshot() and since() give the number of requests made by one pipeline run or one load.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def on_before_call(self, model=None, **kwargs) -> None:
+        """
+        botocore event handler; model is the operation model of the request about to be sent
+        """
+        operation = model.name if model is not None else "Unknown"
+        with self._lock:
+            self._counts[operation] = self._counts.get(operation, 0) + 1
+        s3_requests_total.labels(operation).inc()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def since(self, snapshot: Dict[str, int]) -> Dict[str, int]:
+        """
+        Returns the requests per operation sent after snapshot was taken
+        """
+        current = self.snapshot()
+        return {operation: count - snapshot.get(operation, 0) for operation, count in current.items()
+                if count - snapshot.get(operation, 0) > 0}
+
+
+class S3MetadataCache:
+    """
+    In-process cache of S3 object metadata (size, ETag, last modified) per bucket/key, filled by
+    exact-key HEAD requests. Missing keys are cached too, so repeated existence checks of an absent
+    model do not reach S3 either. Entries expire after ttl_seconds and the least recently used ones
+    are dropped beyond max_entries; writes through SimpleStorageService invalidate their key.
+    """
+
+    def __init__(self, ttl_seconds: float = S3_METADATA_CACHE_TTL_SECONDS,
+                 max_entries: int = S3_METADATA_CACHE_MAX_ENTRIES):
+        """
+        :param ttl_seconds: Age after which metadata is fetched from S3 again
+        :param max_entries: Most bucket/key entries kept in memory
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Optional[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, bucket_name: str, s3_key: str) -> Tuple[bool, Optional[dict]]:
+        """
+        Returns (found, metadata); metadata is None for a key cached as missing
+        """
+        key = (bucket_name, s3_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, bucket_name: str, s3_key: str, metadata: Optional[dict]) -> None:
+        """
+        Stores the metadata of a key, or None when the key does not exist
+        """
+        with self._lock:
+            self._entries[(bucket_name, s3_key)] = (time.monotonic() + self.ttl_seconds, metadata)
+            self._entries.move_to_end((bucket_name, s3_key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, bucket_name: str, s3_key: str) -> None:
+        with self._lock:
+            if self._entries.pop((bucket_name, s3_key), None) is not None:
+                self.invalidations += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+
+# Process-wide instances shared by every S3Client and SimpleStorageService
+s3_call_counter = S3CallCounter()
+s3_metadata_cache = S3MetadataCache()
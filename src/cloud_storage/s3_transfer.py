@@ -0,0 +1,340 @@
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from s3transfer.download import S3_RETRYABLE_DOWNLOAD_ERRORS
+
+from src.constants import (S3_MULTIPART_CHUNK_SIZE, S3_MULTIPART_THRESHOLD, S3_TRANSFER_MAX_CONCURRENCY,
+                           S3_TRANSFER_PART_ATTEMPTS)
+from src.exception import MyException
+from src.logger import logging
+from src.utils.metrics import metrics_registry
+
+s3_transfer_bytes_total = metrics_registry.counter(
+    "s3_transfer_bytes_total", "Bytes uploaded to and downloaded from S3, by direction", labelnames=("direction",))
+
+s3_transfer_seconds = metrics_registry.histogram(
+    "s3_transfer_seconds", "Duration of whole S3 uploads and downloads, by direction", labelnames=("direction",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0))
+
+
+def log_throughput(direction: str, uri: str, size: int, seconds: float, parts: int) -> None:
+    """
+    Logs the size, duration and throughput of one finished transfer and adds it to the metrics
+    :param direction: "upload" or "download"
+    """
+    megabytes_per_second = size / seconds / 1e6 if seconds > 0 else 0.0
+    logging.info(f"S3 {direction} of {uri}: {size} bytes in {seconds:.3f}s "
+                 f"({megabytes_per_second:.1f} MB/s, {parts} part{'s' if parts != 1 else ''})")
+    s3_transfer_bytes_total.labels(direction).inc(size)
+    s3_transfer_seconds.labels(direction).observe(seconds)
+
+
+class RangedDownload:
+    """
+    Download of one S3 object as ranged GETs of chunk_size bytes sent in parallel.
+
+    The first range is requested by ParallelTransfer.open_download; its response carries the size and
+    ETag of the object, so no HEAD request is needed, and a conditional request (If-None-Match) is
+    answered before any body is transferred. The remaining ranges are requested with If-Match on that
+    ETag, so all parts come from the same object even if it is overwritten meanwhile, and are written
+    into a preallocated buffer (read) or at their offsets in a file (write_to).
+    """
+
+    def __init__(self, transfer: "ParallelTransfer", client, bucket_name: str, s3_key: str,
+                 version_id: Optional[str], response: dict, started: float):
+        self.transfer = transfer
+        self.client = client
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+        self.version_id = version_id
+        self.etag: str = response["ETag"].strip('"')
+        self.last_modified = response["LastModified"]
+        content_range = response.get("ContentRange")  # "bytes 0-8388607/1073741824"; absent for a whole object
+        self.size: int = int(content_range.rsplit("/", 1)[1]) if content_range else response["ContentLength"]
+        self._first_body = response["Body"]
+        self._first_length: int = response["ContentLength"]
+        self._started = started
+
+    @property
+    def metadata(self) -> dict:
+        """
+        The same fields as SimpleStorageService.get_object_metadata, for the metadata cache
+        """
+        return {"size": self.size, "etag": self.etag, "last_modified": self.last_modified}
+
+    def _ranges(self) -> List[Tuple[int, int]]:
+        """
+        Returns the (first, last) byte offsets of the parts after the first response
+        """
+        chunk_size = self.transfer.chunk_size
+        return [(start, min(start + chunk_size, self.size) - 1)
+                for start in range(self._first_length, self.size, chunk_size)]
+
+    def _read_range(self, first: int, last: int) -> bytes:
+        request_args = {"VersionId": self.version_id} if self.version_id else {"IfMatch": f'"{self.etag}"'}
+        for attempt in range(1, self.transfer.part_attempts + 1):
+            try:
+                response = self.client.get_object(Bucket=self.bucket_name, Key=self.s3_key,
+                                                  Range=f"bytes={first}-{last}", **request_args)
+                data = response["Body"].read()
+                if len(data) != last - first + 1:
+                    raise ConnectionError(f"Expected {last - first + 1} bytes of range {first}-{last}, "
+                                          f"received {len(data)}")
+                return data
+            except S3_RETRYABLE_DOWNLOAD_ERRORS:
+                # botocore retries failed requests itself, but not a body that breaks off mid-stream
+                if attempt == self.transfer.part_attempts:
+                    raise
+        raise RuntimeError("part_attempts must be at least 1")
+
+    def _read_first(self) -> bytes:
+        try:
+            data = self._first_body.read()
+            if len(data) == self._first_length:
+                return data
+        except S3_RETRYABLE_DOWNLOAD_ERRORS:
+            pass
+        return self._read_range(0, self._first_length - 1) if self._first_length else b""
+
+    def _fetch(self, sink: Callable[[int, bytes], None]) -> None:
+        """
+        Reads every part and hands it to sink(offset, data); parts arrive in any order
+        """
+        ranges = self._ranges()
+        # The first body is read on this thread while the other ranges are requested, so at most
+        # max_concurrency connections are in use at once
+        workers = min(self.transfer.max_concurrency - 1, len(ranges))
+        if workers < 1:
+            sink(0, self._read_first())
+            for first, last in ranges:
+                sink(first, self._read_range(first, last))
+        else:
+            def fetch_range(byte_range: Tuple[int, int]) -> None:
+                sink(byte_range[0], self._read_range(*byte_range))
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(fetch_range, byte_range) for byte_range in ranges]
+                sink(0, self._read_first())
+                for future in futures:
+                    future.result()  # Re-raises a failed part
+        log_throughput("download", f"s3://{self.bucket_name}/{self.s3_key}", self.size,
+                       time.perf_counter() - self._started, len(ranges) + 1)
+
+    def read(self) -> bytearray:
+        """
+        Downloads the whole object into one buffer and returns it
+        """
+        try:
+            buffer = bytearray(self.size)
+
+            def write(offset: int, data: bytes) -> None:
+                buffer[offset:offset + len(data)] = data
+
+            self._fetch(write)
+            return buffer
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def write_to(self, file) -> int:
+        """
+        Downloads the whole object into a file opened for binary writing, from its current start,
+        and returns the number of bytes written
+        """
+        try:
+            lock = threading.Lock()
+            start = file.tell()
+
+            def write(offset: int, data: bytes) -> None:
+                with lock:
+                    file.seek(start + offset)
+                    file.write(data)
+
+            self._fetch(write)
+            file.seek(start + self.size)
+            return self.size
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+class RangedFile(io.RawIOBase):
+    """
+    Read-only, seekable file over one S3 object: every read is a ranged GET of just the bytes asked for.
+
+    Lets a reader that seeks, such as a Parquet reader taking the footer and then only the column chunks
+    of the selected columns and row groups, transfer part of an object instead of all of it. Ranges are
+    requested with If-Match on etag, so every read sees the same object.
+    """
+
+    def __init__(self, client, bucket_name: str, s3_key: str, size: int, etag: str, version_id: str = None):
+        super().__init__()
+        self.client = client
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+        self.size = size
+        self.etag = etag
+        self.version_id = version_id
+        self.position = 0
+
+        # Metrics
+        self.requests = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}[whence]
+        self.position = max(0, base + offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        request_args = {"VersionId": self.version_id} if self.version_id else {"IfMatch": f'"{self.etag}"'}
+        response = self.client.get_object(Bucket=self.bucket_name, Key=self.s3_key,
+                                          Range=f"bytes={self.position}-{self.position + length - 1}", **request_args)
+        data = response["Body"].read()
+        buffer[:len(data)] = data
+        self.position += len(data)
+        self.requests += 1
+        self.bytes_read += len(data)
+        s3_transfer_bytes_total.labels("download").inc(len(data))
+        return len(data)
+
+
+class _PipeReader(io.RawIOBase):
+    """
+    Read end of the pipe that upload_from_writer uploads. Ends with the writer's error instead of a
+    clean end of file when the writer failed, so a partial object is never completed.
+    """
+
+    def __init__(self, descriptor: int, writer: threading.Thread, errors: List[BaseException]):
+        super().__init__()
+        self._file = os.fdopen(descriptor, "rb", buffering=0)
+        self._writer = writer
+        self._errors = errors
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = self._file.readinto(buffer)
+        if not size:
+            self._writer.join()  # The write end is closed; the writer records its error before it returns
+            if self._errors:
+                raise self._errors[0]
+        self.bytes_read += size or 0
+        return size
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+class ParallelTransfer:
+    """
+    Chunk size and concurrency of S3 uploads and downloads.
+
+    Uploads go through boto3's managed transfer with a TransferConfig built from these settings, which
+    sends files from multipart_threshold on as a multipart upload of chunk_size parts. Downloads are
+    RangedDownloads. With max_concurrency 1 both transfer over a single connection.
+    """
+
+    def __init__(self, chunk_size: int = S3_MULTIPART_CHUNK_SIZE, max_concurrency: int = S3_TRANSFER_MAX_CONCURRENCY,
+                 multipart_threshold: int = S3_MULTIPART_THRESHOLD, part_attempts: int = S3_TRANSFER_PART_ATTEMPTS):
+        """
+        :param chunk_size: Size of each uploaded part and of each ranged GET
+        :param max_concurrency: Parts of one transfer sent or received in parallel
+        :param multipart_threshold: Size from which an upload is sent in parts
+        :param part_attempts: Attempts of a ranged GET whose body breaks off mid-stream
+        """
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.multipart_threshold = multipart_threshold
+        self.part_attempts = part_attempts
+        self.transfer_config = TransferConfig(multipart_threshold=multipart_threshold,
+                                              multipart_chunksize=chunk_size,
+                                              max_concurrency=max_concurrency,
+                                              use_threads=max_concurrency > 1)
+
+    def upload_file(self, client, from_filename: str, bucket_name: str, s3_key: str) -> None:
+        """
+        Uploads a local file, in parallel parts when it is at least multipart_threshold bytes
+        """
+        started = time.perf_counter()
+        size = os.path.getsize(from_filename)
+        client.upload_file(from_filename, bucket_name, s3_key, Config=self.transfer_config)
+        parts = -(-size // self.chunk_size) if size >= self.multipart_threshold else 1
+        log_throughput("upload", f"s3://{bucket_name}/{s3_key}", size, time.perf_counter() - started, parts)
+
+    def upload_from_writer(self, client, write: Callable[[io.RawIOBase], None], bucket_name: str,
+                           s3_key: str) -> int:
+        """
+        Uploads what write(stream) writes, without a local file or the whole object in memory.
+        write runs on a thread of its own and writes into a pipe that the managed upload reads from,
+        so only the parts being uploaded are held in memory. Returns the number of bytes uploaded.
+        """
+        started = time.perf_counter()
+        read_descriptor, write_descriptor = os.pipe()
+        errors: List[BaseException] = []
+
+        def run_writer() -> None:
+            try:
+                with os.fdopen(write_descriptor, "wb") as stream:
+                    write(stream)
+            except BaseException as e:
+                errors.append(e)
+
+        writer = threading.Thread(target=run_writer, name="s3-upload-writer", daemon=True)
+        reader = _PipeReader(read_descriptor, writer, errors)
+        writer.start()
+        try:
+            client.upload_fileobj(reader, bucket_name, s3_key, Config=self.transfer_config)
+        finally:
+            reader.close()  # Makes a writer still writing after a failed upload fail instead of blocking
+            writer.join()
+        if errors:
+            raise errors[0]
+        size = reader.bytes_read
+        parts = -(-size // self.chunk_size) if size >= self.multipart_threshold else 1
+        log_throughput("upload", f"s3://{bucket_name}/{s3_key}", size, time.perf_counter() - started, parts)
+        return size
+
+    def open_download(self, client, bucket_name: str, s3_key: str, version_id: str = None,
+                      if_none_match: str = None) -> RangedDownload:
+        """
+        Requests the first chunk of an object and returns the download of the rest.
+        With if_none_match, S3 answers 304 (raised as a ClientError) when the object still has that ETag.
+        """
+        started = time.perf_counter()
+        request_args = {"VersionId": version_id} if version_id else {}
+        if if_none_match:
+            request_args["IfNoneMatch"] = f'"{if_none_match}"'
+        try:
+            response = client.get_object(Bucket=bucket_name, Key=s3_key, Range=f"bytes=0-{self.chunk_size - 1}",
+                                         **request_args)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "InvalidRange":
+                raise
+            # An empty object has no byte 0 to start a range at
+            response = client.get_object(Bucket=bucket_name, Key=s3_key, **request_args)
+        return RangedDownload(self, client, bucket_name, s3_key, version_id, response, started)
+
+
+# Process-wide settings used by SimpleStorageService
+s3_transfer = ParallelTransfer()
@@ -18,6 +18,7 @@ from src.entity.artifact_entity import DataTransformationArtifact, DataIngestion
 from src.exception import MyException  # Custom exception class
 from src.logger import logging  # Logger to track execution steps
 from src.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file  # Utility functions for saving objects and reading YAML files
+from src.entity.feature_layout import FeatureLayout  # Compiled preprocessing used by the pandas-free prediction path
 
 # DataTransformation Class
 class DataTransformation:
@@ -143,6 +144,12 @@ class DataTransformation:
             input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df)
             input_feature_test_arr = preprocessor.transform(input_feature_test_df)
 
+            # The compiled feature layout must feed the model exactly what the preprocessor does
+            feature_layout = FeatureLayout.from_preprocessing_object(preprocessor)
+            if not feature_layout.verify(preprocessor, input_feature_test_df):
+                raise Exception("Compiled feature layout does not reproduce the preprocessing object output")
+            logging.info("Compiled feature layout verified against the preprocessing object")
+
             # Handling Imbalanced Dataset using SMOTEENN
             smt = SMOTEENN(sampling_strategy="minority")
             input_feature_train_final, target_feature_train_final = smt.fit_resample(input_feature_train_arr, target_feature_train_df)
@@ -4,7 +4,7 @@ from sklearn.metrics import f1_score
 from src.exception import MyException
 from src.constants import TARGET_COLUMN
 from src.logger import logging
-from src.utils.main_utils import load_object
+from src.utils.main_utils import load_model_object
 import sys
 import pandas as pd
 from typing import Optional
@@ -101,7 +101,7 @@ class ModelEvaluation:
             x = self._create_dummy_columns(x)
             x = self._rename_columns(x)
 
-            trained_model = load_object(file_path=self.model_trainer_artifact.trained_model_file_path)
+            trained_model = load_model_object(file_path=self.model_trainer_artifact.trained_model_file_path)
             logging.info("Trained model loaded/exists.")
             trained_model_f1_score = self.model_trainer_artifact.metric_artifact.f1_score
             logging.info(f"F1_Score for this model: {trained_model_f1_score}")
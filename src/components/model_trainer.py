@@ -10,10 +10,12 @@ from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_sc
 # Importing custom modules
 from src.exception import MyException  # Custom exception class to handle exceptions
 from src.logger import logging  # Custom logging module to log information
-from src.utils.main_utils import load_numpy_array_data, load_object, save_object  # Utility functions to load and save data and models
+from src.utils.main_utils import load_numpy_array_data, load_object, save_model_object  # Utility functions to load and save data and models
 from src.entity.config_entity import ModelTrainerConfig  # Configuration class for model trainer parameters
 from src.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact  # Classes to manage different artifacts in the pipeline
 from src.entity.estimator import MyModel  # Class to encapsulate preprocessing and model objects
+from src.entity.feature_layout import FeatureLayout  # Compiled preprocessing used by the pandas-free prediction path
+from src.entity.forest_engine import CompiledForest  # Array-backed forest used for fast inference
 
 class ModelTrainer:
     def __init__(self, data_transformation_artifact: DataTransformationArtifact, model_trainer_config: ModelTrainerConfig):
@@ -97,8 +99,17 @@ class ModelTrainer:
 
             # Save final model including preprocessing and trained model
             logging.info("Saving new model as performance is better than previous one.")
-            my_model = MyModel(preprocessing_object=preprocessing_obj, trained_model_object=trained_model)
-            save_object(self.model_trainer_config.trained_model_file_path, my_model)
+            feature_layout = FeatureLayout.from_preprocessing_object(preprocessing_obj)
+
+            # Export the forest into flat arrays and make sure it scores exactly like sklearn
+            compiled_forest = CompiledForest.from_random_forest(trained_model)
+            if not compiled_forest.verify(trained_model, test_arr[:, :-1]):
+                raise Exception("Compiled forest does not reproduce the trained model's probabilities")
+            logging.info("Compiled forest verified against the trained model")
+
+            my_model = MyModel(preprocessing_object=preprocessing_obj, trained_model_object=trained_model,
+                               feature_layout=feature_layout, compiled_forest=compiled_forest)
+            save_model_object(self.model_trainer_config.trained_model_file_path, my_model)
             logging.info("Saved final model object that includes both preprocessing and the trained model")
 
             # Create ModelTrainerArtifact containing model path and metrics
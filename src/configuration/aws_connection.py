@@ -1,35 +1,109 @@
 import boto3
 import os
-from src.constants import AWS_SECRET_ACCESS_KEY_ENV_KEY, AWS_ACCESS_KEY_ID_ENV_KEY, REGION_NAME
+import threading
+from botocore.config import Config
+from src.cloud_storage.s3_metadata import s3_call_counter
+from src.constants import (AWS_SECRET_ACCESS_KEY_ENV_KEY, AWS_ACCESS_KEY_ID_ENV_KEY, AWS_S3_ENDPOINT_URL_ENV_KEY, REGION_NAME,
+                           S3_CONNECT_TIMEOUT_SECONDS, S3_MAX_POOL_CONNECTIONS, S3_READ_TIMEOUT_SECONDS,
+                           S3_RETRY_MAX_ATTEMPTS, S3_RETRY_MODE)
 
 
 class S3Client:
+    """
+    Factory of the S3 connections of this process.
+
+    boto3 clients are thread-safe but resources are not, so one client (with a pool of
+    S3_MAX_POOL_CONNECTIONS connections) is shared by every thread, while each thread gets an
+    s3_resource of its own. Both come from one session and use adaptive retries and connect/read
+    timeouts. A forked child drops the parent's session, client and resources and creates its own,
+    so parent and child never write to the same socket.
+    """
+
+    _lock = threading.Lock()
+    _session = None
+    _endpoint_url = None
+    _client = None
+    _local = threading.local()
 
-    s3_client=None
-    s3_resource = None
     def __init__(self, region_name=REGION_NAME):
-        """ 
-        This Class gets aws credentials from env_variable and creates an connection with s3 bucket 
+        """
+        This Class gets aws credentials from env_variable and creates an connection with s3 bucket
         and raise exception when environment variable is not set
         """
+        self.region_name = region_name
+        self._get_session(region_name)
+
+    @classmethod
+    def _get_session(cls, region_name: str) -> boto3.session.Session:
+        session = cls._session
+        if session is None:
+            with cls._lock:
+                if cls._session is None:
+                    __access_key_id = os.getenv(AWS_ACCESS_KEY_ID_ENV_KEY, )
+                    __secret_access_key = os.getenv(AWS_SECRET_ACCESS_KEY_ENV_KEY, )
+                    if __access_key_id is None:
+                        raise Exception(f"Environment variable: {AWS_ACCESS_KEY_ID_ENV_KEY} is not not set.")
+                    if __secret_access_key is None:
+                        raise Exception(f"Environment variable: {AWS_SECRET_ACCESS_KEY_ENV_KEY} is not set.")
+                    cls._endpoint_url = os.getenv(AWS_S3_ENDPOINT_URL_ENV_KEY)  # None means the real AWS endpoint
+                    cls._session = boto3.session.Session(aws_access_key_id=__access_key_id,
+                                                         aws_secret_access_key=__secret_access_key,
+                                                         region_name=region_name)
+                session = cls._session
+        return session
+
+    @staticmethod
+    def client_config() -> Config:
+        return Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                      retries={"mode": S3_RETRY_MODE, "total_max_attempts": S3_RETRY_MAX_ATTEMPTS},
+                      connect_timeout=S3_CONNECT_TIMEOUT_SECONDS,
+                      read_timeout=S3_READ_TIMEOUT_SECONDS,
+                      tcp_keepalive=True)
+
+    @property
+    def s3_client(self):
+        """
+        The S3 client shared by every thread of this process
+        """
+        client = S3Client._client
+        if client is None:
+            session = self._get_session(self.region_name)
+            with S3Client._lock:
+                if S3Client._client is None:
+                    client = session.client("s3", endpoint_url=S3Client._endpoint_url,
+                                            config=self.client_config())
+                    # Count every request sent, so the S3 calls of a pipeline run or a model load can be checked
+                    client.meta.events.register("before-call.s3", s3_call_counter.on_before_call)
+                    S3Client._client = client
+                client = S3Client._client
+        return client
+
+    @property
+    def s3_resource(self):
+        """
+        The S3 resource of the calling thread
+        """
+        resource = getattr(S3Client._local, "resource", None)
+        if resource is None:
+            session = self._get_session(self.region_name)
+            with S3Client._lock:  # Creating clients from one session is not thread-safe
+                resource = session.resource("s3", endpoint_url=S3Client._endpoint_url,
+                                            config=self.client_config())
+            resource.meta.client.meta.events.register("before-call.s3", s3_call_counter.on_before_call)
+            S3Client._local.resource = resource
+        return resource
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Forgets the session, client and resources, so the next use creates new connections.
+        Runs in a child process after fork().
+        """
+        cls._lock = threading.Lock()
+        cls._session = None
+        cls._client = None
+        cls._local = threading.local()
+
 
-        if S3Client.s3_resource==None or S3Client.s3_client==None:
-            __access_key_id = os.getenv(AWS_ACCESS_KEY_ID_ENV_KEY, )
-            __secret_access_key = os.getenv(AWS_SECRET_ACCESS_KEY_ENV_KEY, )
-            if __access_key_id is None:
-                raise Exception(f"Environment variable: {AWS_ACCESS_KEY_ID_ENV_KEY} is not not set.")
-            if __secret_access_key is None:
-                raise Exception(f"Environment variable: {AWS_SECRET_ACCESS_KEY_ENV_KEY} is not set.")
-        
-            S3Client.s3_resource = boto3.resource('s3',
-                                            aws_access_key_id=__access_key_id,
-                                            aws_secret_access_key=__secret_access_key,
-                                            region_name=region_name
-                                            )
-            S3Client.s3_client = boto3.client('s3',
-                                        aws_access_key_id=__access_key_id,
-                                        aws_secret_access_key=__secret_access_key,
-                                        region_name=region_name
-                                        )
-        self.s3_resource = S3Client.s3_resource
-        self.s3_client = S3Client.s3_client
\ No newline at end of file
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=S3Client.reset)
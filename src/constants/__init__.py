@@ -30,6 +30,7 @@ SCHEMA_FILE_PATH = os.path.join("config", "schema.yaml")  # Path of schema.yaml
 AWS_ACCESS_KEY_ID_ENV_KEY = "AWS_ACCESS_KEY_ID"  # AWS Access Key ID environment variable
 AWS_SECRET_ACCESS_KEY_ENV_KEY = "AWS_SECRET_ACCESS_KEY"  # AWS Secret Key environment variable
 REGION_NAME = "us-east-1"  # AWS Region Name
+AWS_S3_ENDPOINT_URL_ENV_KEY = "AWS_S3_ENDPOINT_URL"  # Optional S3 endpoint (e.g. a local moto server for load tests)
 
 """
 Data Ingestion Constants
@@ -76,4 +77,95 @@ MODEL_BUCKET_NAME = "my-model-mlopsproj14"  # AWS S3 bucket name to store models
 MODEL_PUSHER_S3_KEY = "model-registry"  # Folder inside S3 bucket to store models
 
 APP_HOST = "0.0.0.0"
-APP_PORT = 5000  # This is where my application will run 
+APP_PORT = int(os.getenv("APP_PORT", 5000))  # This is where my application will run 
+APP_WORKERS: int = int(os.getenv("APP_WORKERS", 1))  # Serving processes forked from a parent that holds the model
+APP_SOCKET_BACKLOG: int = 2048  # Pending connections the shared listening socket queues for the workers
+APP_IMPORT_TIME_BUDGET_SECONDS: float = 2.0  # Longest acceptable import time of app.py, checked by benchmarks/import_time.py
+
+"""
+Prediction Serving Constants
+"""
+PREDICTION_BATCH_WINDOW_MS: float = 2.0  # Longest time a request waits for others to join its micro-batch
+PREDICTION_MAX_BATCH_SIZE: int = 256  # Largest number of rows scored together in one micro-batch
+INFERENCE_EXECUTOR_KIND: str = "thread"  # "thread" (shares the resident model; NumPy kernels release the GIL) or "process" (scales across cores)
+INFERENCE_EXECUTOR_WORKERS: int = 4  # Number of threads or processes that run model inference
+INFERENCE_EXECUTOR_MAX_QUEUE: int = 64  # Calls allowed to wait for a free worker before new ones are rejected
+MODEL_INFERENCE_BACKEND: str = os.getenv("MODEL_INFERENCE_BACKEND", "compiled").lower()  # "compiled" (NumPy copy of the forest, when the model has one) or "sklearn" (the trained model's own predict)
+TRAINING_JOB_HISTORY_SIZE: int = 20  # Number of finished training jobs whose status stays queryable
+TRAINING_JOB_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0  # Grace period for a running training process to end on shutdown
+TRAINING_JOB_DIR_NAME: str = "training_jobs"  # Folder (inside the artifact folder) for the training job lock and status files, shared by all app workers
+TRAINING_JOB_LOCK_WAIT_SECONDS: float = 5.0  # Longest time a request waits for a job that another worker is starting
+PREDICTION_CACHE_MAX_ENTRIES: int = 100000  # Most feature tuples whose prediction is kept in memory
+PREDICTION_CACHE_TTL_SECONDS: float = 3600.0  # Age after which a cached prediction is recomputed
+PREDICTION_CSV_CHUNK_SIZE: int = 50000  # Rows read, scored and streamed back at a time when scoring an uploaded CSV
+PREDICTION_CSV_ERROR_MARKER: str = "#error: "  # Prefix of the last line of a CSV prediction stream that failed part way
+WARMUP_BATCH_SIZES: tuple = (1, 32, 256, 4096)  # Synthetic batch sizes scored through every prediction path before the app reports ready
+WARMUP_ROUNDS: int = 3  # Calls per batch size and prediction path during warmup
+WARMUP_RETRY_SECONDS: float = 5.0  # Pause between attempts to load the model when S3 is unreachable at startup
+ARROW_STREAM_MEDIA_TYPE: str = "application/vnd.apache.arrow.stream"  # Content type of Arrow IPC stream payloads on /predict/binary
+MSGPACK_MEDIA_TYPE: str = "application/msgpack"  # Content type of msgpack payloads on /predict/binary
+
+"""
+Batch Prediction Constants
+"""
+BATCH_PREDICTION_DIR_NAME: str = "batch_prediction"  # Folder (inside the artifact folder) for scored Parquet parts
+BATCH_PREDICTION_CHUNK_SIZE: int = 100000  # Rows read and scored per task
+BATCH_PREDICTION_WORKERS: int = os.cpu_count() or 1  # Scoring processes, each holding its own copy of the model
+
+"""
+Model Registry Constants
+"""
+MODEL_VERSION_HEADER: str = "X-Model-Version"  # Request header that pins a request to "champion", "challenger" or an S3 version id
+MODEL_REGISTRY_MAX_MODELS: int = 4  # Most non-champion model versions kept in memory at once
+MODEL_REGISTRY_MAX_BYTES: int = 1024 * 1024 * 1024  # Memory budget of those versions (size of their model files), 1 GB
+MODEL_REGISTRY_FAILED_LOOKUP_TTL_SECONDS: float = 30.0  # Time a version that failed to load is answered with the same error, without S3
+MODEL_REGISTRY_FAILED_LOOKUP_MAX_ENTRIES: int = 1000  # Most failed versions remembered at once
+MODEL_CHALLENGER_FILE_PATH = os.getenv("MODEL_CHALLENGER_FILE_PATH")  # S3 key of the challenger model; no challenger when unset
+MODEL_CHALLENGER_VERSION_ID = os.getenv("MODEL_CHALLENGER_VERSION_ID")  # S3 version of the challenger (of its own key, or of model.pkl)
+MODEL_CHALLENGER_TRAFFIC_WEIGHT: float = float(os.getenv("MODEL_CHALLENGER_TRAFFIC_WEIGHT", 0.0))  # Share of unpinned requests answered by the challenger
+MODEL_SHADOW_CHALLENGER: bool = os.getenv("MODEL_SHADOW_CHALLENGER", "false").lower() == "true"  # Also score champion requests with the challenger, off the response path
+MODEL_SHADOW_MAX_PENDING: int = 256  # Shadow scorings allowed to wait; beyond that they are dropped rather than slow the server
+
+"""
+S3 Client Constants
+"""
+S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 64))  # HTTP connections kept open by the shared S3 client, for all threads together
+S3_RETRY_MODE: str = os.getenv("S3_RETRY_MODE", "adaptive")  # botocore retry mode; "adaptive" also rate-limits the client while S3 throttles it
+S3_RETRY_MAX_ATTEMPTS: int = int(os.getenv("S3_RETRY_MAX_ATTEMPTS", 5))  # Attempts of one S3 request, the first included
+S3_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("S3_CONNECT_TIMEOUT_SECONDS", 5.0))  # Time allowed to open a connection to S3
+S3_READ_TIMEOUT_SECONDS: float = float(os.getenv("S3_READ_TIMEOUT_SECONDS", 60.0))  # Time allowed between two reads of an S3 response
+
+"""
+S3 Cache Constants
+"""
+MODEL_CACHE_ENABLED: bool = os.getenv("MODEL_CACHE_ENABLED", "true").lower() == "true"  # Keep downloaded models on local disk and revalidate them with a conditional GET
+MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", "model_cache")  # Folder of the cached model files, shared by every process on the host
+MODEL_CACHE_MAX_BYTES: int = int(os.getenv("MODEL_CACHE_MAX_BYTES", 4 * 1024 * 1024 * 1024))  # Disk budget of the model cache, 4 GB
+MODEL_MMAP_MODE: str = os.getenv("MODEL_MMAP_MODE", "r")  # "r" memory-maps the model's NumPy arrays from the local file; "" reads them into memory
+S3_DOWNLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024  # Bytes read from an S3 response body and written to disk at a time
+S3_METADATA_CACHE_TTL_SECONDS: float = 30.0  # Age after which the size/ETag/last-modified of an S3 key is fetched again
+S3_METADATA_CACHE_MAX_ENTRIES: int = 10000  # Most S3 keys whose metadata is kept in memory
+S3_HEAD_MAX_CONCURRENCY: int = 16  # HEAD requests sent in parallel by a batch existence check
+
+"""
+S3 Transfer Constants
+"""
+S3_MULTIPART_THRESHOLD: int = int(os.getenv("S3_MULTIPART_THRESHOLD", 16 * 1024 * 1024))  # Uploads from this size on are sent as a multipart upload
+S3_MULTIPART_CHUNK_SIZE: int = int(os.getenv("S3_MULTIPART_CHUNK_SIZE", 8 * 1024 * 1024))  # Size of each uploaded part and of each ranged GET of a download
+S3_TRANSFER_MAX_CONCURRENCY: int = int(os.getenv("S3_TRANSFER_MAX_CONCURRENCY", 10))  # Parts of one upload or download transferred in parallel (1 = single stream)
+S3_TRANSFER_PART_ATTEMPTS: int = 3  # Attempts of a ranged GET whose body fails mid-stream before the download fails
+S3_PARQUET_COMPRESSION: str = "zstd"  # Codec of the Parquet files written by SimpleStorageService.upload_df
+S3_DATAFRAME_CHUNK_ROWS: int = 100000  # Rows serialized at a time by upload_df, which is also the Parquet row group size
+
+"""
+Admission Control Constants
+"""
+ADMISSION_MAX_CONCURRENT: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", 64))  # Prediction requests handled at once, all priority classes together
+ADMISSION_BATCH_MAX_CONCURRENT: int = int(os.getenv("ADMISSION_BATCH_MAX_CONCURRENT", 4))  # Of those, most held by batch requests (/predict/batch, /predict/binary, /predict/csv)
+ADMISSION_INTERACTIVE_MAX_QUEUE: int = 512  # Form submissions allowed to wait for a slot before new ones are shed
+ADMISSION_BATCH_MAX_QUEUE: int = 16  # Batch requests allowed to wait for a slot before new ones are shed
+ADMISSION_INTERACTIVE_DEADLINE_MS: float = float(os.getenv("ADMISSION_INTERACTIVE_DEADLINE_MS", 2000.0))  # Default time budget of a form submission
+ADMISSION_BATCH_DEADLINE_MS: float = float(os.getenv("ADMISSION_BATCH_DEADLINE_MS", 30000.0))  # Default time budget of a batch request
+ADMISSION_INITIAL_HOLD_SECONDS: float = 0.05  # Assumed slot hold time until real requests have been measured
+ADMISSION_HOLD_TIME_SMOOTHING: float = 0.1  # Weight of the newest request in the moving average of slot hold time
+REQUEST_DEADLINE_HEADER: str = "X-Request-Deadline-Ms"  # Request header carrying the client's own time budget in milliseconds
@@ -1,7 +1,7 @@
 import sys
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import Iterator, Optional
 
 from src.configuration.mongo_db_connection import MongoDBClient
 from src.constants import DATABASE_NAME
@@ -57,4 +57,42 @@ class Proj1Data:
             return df
 
         except Exception as e:
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+    def iter_collection_chunks(self, collection_name: str, chunk_size: int,
+                               database_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams a MongoDB collection as pandas DataFrames of at most chunk_size rows,
+        so that a whole collection can be processed without holding it in memory.
+
+        Parameters:
+        ----------
+        collection_name : str
+            The name of the MongoDB collection to read.
+        chunk_size : int
+            Maximum number of documents per DataFrame.
+        database_name : Optional[str]
+            Name of the database (optional). Defaults to DATABASE_NAME.
+
+        Yields:
+        -------
+        pd.DataFrame
+            Chunks of the collection with the Mongo '_id' column removed and 'na' values replaced with NaN.
+        """
+        try:
+            if database_name is None:
+                collection = self.mongo_client.database[collection_name]
+            else:
+                collection = self.mongo_client.client[database_name][collection_name]
+
+            documents = []
+            for document in collection.find({}, {"_id": 0}, batch_size=min(chunk_size, 10000)):
+                documents.append(document)
+                if len(documents) == chunk_size:
+                    yield pd.DataFrame(documents).replace({"na": np.nan})
+                    documents = []
+            if documents:
+                yield pd.DataFrame(documents).replace({"na": np.nan})
+
+        except Exception as e:
+            raise MyException(e, sys)
@@ -75,4 +75,59 @@ class ModelPusherConfig:
 @dataclass
 class VehiclePredictorConfig:
     model_file_path: str = MODEL_FILE_NAME
-    model_bucket_name: str = MODEL_BUCKET_NAME
\ No newline at end of file
+    model_bucket_name: str = MODEL_BUCKET_NAME
+    model_version_id: str = None  # S3 version of the model file; None serves the latest version
+
+@dataclass
+class MicroBatcherConfig:
+    max_wait_ms: float = PREDICTION_BATCH_WINDOW_MS
+    max_batch_size: int = PREDICTION_MAX_BATCH_SIZE
+
+@dataclass
+class InferenceExecutorConfig:
+    executor_kind: str = INFERENCE_EXECUTOR_KIND
+    max_workers: int = INFERENCE_EXECUTOR_WORKERS
+    max_queue_size: int = INFERENCE_EXECUTOR_MAX_QUEUE
+
+@dataclass
+class ModelWarmupConfig:
+    batch_sizes: tuple = WARMUP_BATCH_SIZES
+    rounds: int = WARMUP_ROUNDS
+    retry_seconds: float = WARMUP_RETRY_SECONDS
+
+@dataclass
+class PredictionCacheConfig:
+    max_entries: int = PREDICTION_CACHE_MAX_ENTRIES
+    ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS
+
+@dataclass
+class BatchPredictionConfig:
+    output_dir: str = os.path.join(training_pipeline_config.artifact_dir, BATCH_PREDICTION_DIR_NAME)
+    chunk_size: int = BATCH_PREDICTION_CHUNK_SIZE
+    n_workers: int = BATCH_PREDICTION_WORKERS
+    collection_name: str = COLLECTION_NAME
+    model_file_path: str = MODEL_FILE_NAME
+    model_bucket_name: str = MODEL_BUCKET_NAME
+
+@dataclass
+class ModelRegistryConfig:
+    max_models: int = MODEL_REGISTRY_MAX_MODELS
+    max_bytes: int = MODEL_REGISTRY_MAX_BYTES
+    failed_lookup_ttl_seconds: float = MODEL_REGISTRY_FAILED_LOOKUP_TTL_SECONDS
+    failed_lookup_max_entries: int = MODEL_REGISTRY_FAILED_LOOKUP_MAX_ENTRIES
+    challenger_file_path: str = MODEL_CHALLENGER_FILE_PATH
+    challenger_version_id: str = MODEL_CHALLENGER_VERSION_ID
+    challenger_weight: float = MODEL_CHALLENGER_TRAFFIC_WEIGHT
+    shadow_challenger: bool = MODEL_SHADOW_CHALLENGER
+    shadow_max_pending: int = MODEL_SHADOW_MAX_PENDING
+
+@dataclass
+class AdmissionControlConfig:
+    max_concurrent: int = ADMISSION_MAX_CONCURRENT
+    batch_max_concurrent: int = ADMISSION_BATCH_MAX_CONCURRENT
+    interactive_max_queue: int = ADMISSION_INTERACTIVE_MAX_QUEUE
+    batch_max_queue: int = ADMISSION_BATCH_MAX_QUEUE
+    interactive_deadline_ms: float = ADMISSION_INTERACTIVE_DEADLINE_MS
+    batch_deadline_ms: float = ADMISSION_BATCH_DEADLINE_MS
+    initial_hold_seconds: float = ADMISSION_INITIAL_HOLD_SECONDS
+    hold_time_smoothing: float = ADMISSION_HOLD_TIME_SMOOTHING
@@ -1,12 +1,19 @@
 import sys
+from typing import TYPE_CHECKING, Tuple
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
-from sklearn.pipeline import Pipeline
 
+from src.constants import MODEL_INFERENCE_BACKEND
+from src.entity.feature_layout import FeatureLayout
+from src.entity.forest_engine import CompiledForest
 from src.exception import MyException
 from src.logger import logging
 
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
 class TargetValueMapping:
     def __init__(self):
         self.yes:int = 0
@@ -18,13 +25,50 @@ class TargetValueMapping:
         return dict(zip(mapping_response.values(),mapping_response.keys()))
 
 class MyModel:
-    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object):
+    def __init__(self, preprocessing_object: "Pipeline", trained_model_object: object,
+                 feature_layout: FeatureLayout = None, compiled_forest: CompiledForest = None):
         """
         :param preprocessing_object: Input Object of preprocesser
         :param trained_model_object: Input Object of trained model 
+        :param feature_layout: Compiled form of preprocessing_object used by the pandas-free prediction path
+        :param compiled_forest: Array-backed copy of the trained forest used instead of sklearn's predict
         """
         self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
+        self.feature_layout = feature_layout
+        self.compiled_forest = compiled_forest
+
+    def get_inference_engine(self):
+        """
+        Returns the backend that scores transformed features: the compiled forest when the model
+        was exported with one, otherwise the sklearn model (also for models saved before it existed).
+        MODEL_INFERENCE_BACKEND=sklearn always selects the sklearn model, e.g. to rule out the compiled forest.
+        """
+        if MODEL_INFERENCE_BACKEND == "sklearn":
+            return self.trained_model_object
+        compiled_forest = getattr(self, "compiled_forest", None)
+        return compiled_forest if compiled_forest is not None else self.trained_model_object
+
+    def get_feature_layout(self) -> FeatureLayout:
+        """
+        Returns the compiled feature layout, compiling it on first use for models saved before it existed
+        """
+        if getattr(self, "feature_layout", None) is None:
+            self.feature_layout = FeatureLayout.from_preprocessing_object(self.preprocessing_object)
+        return self.feature_layout
+
+    def predict_array(self, raw_features: np.ndarray) -> np.ndarray:
+        """
+        Pandas-free prediction: raw_features is a float64 buffer whose columns follow
+        get_feature_layout().input_columns; scaling is applied by the compiled layout.
+        """
+        try:
+            transformed_feature = self.get_feature_layout().transform(raw_features)
+            return self.get_inference_engine().predict(transformed_feature)
+
+        except Exception as e:
+            logging.error("Error occurred in predict_array method", exc_info=True)
+            raise MyException(e, sys) from e
 
     def predict(self, dataframe: pd.DataFrame) -> DataFrame:
         """
@@ -39,7 +83,7 @@ class MyModel:
 
             # Step 2: Perform prediction using the trained model
             logging.info("Using the trained model to get predictions")
-            predictions = self.trained_model_object.predict(transformed_feature)
+            predictions = self.get_inference_engine().predict(transformed_feature)
 
             return predictions
 
@@ -48,6 +92,23 @@ class MyModel:
             raise MyException(e, sys) from e
 
 
+    def predict_with_proba(self, dataframe: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transforms the inputs once and returns both the predicted labels and the class probabilities.
+        Labels are derived from the probabilities exactly as the forest's own predict does it.
+        """
+        try:
+            logging.info("Starting prediction with probabilities.")
+            transformed_feature = self.preprocessing_object.transform(dataframe)
+            engine = self.get_inference_engine()
+            probabilities = engine.predict_proba(transformed_feature)
+            predictions = engine.classes_.take(np.argmax(probabilities, axis=1), axis=0)
+            return predictions, probabilities
+
+        except Exception as e:
+            logging.error("Error occurred in predict_with_proba method", exc_info=True)
+            raise MyException(e, sys) from e
+
     def __repr__(self):
         return f"{type(self.trained_model_object).__name__}()"
 
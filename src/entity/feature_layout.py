@@ -0,0 +1,238 @@
+import sys
+from typing import List, Mapping, Sequence
+
+import numpy as np
+from pandas import DataFrame
+
+from src.exception import MyException
+from src.logger import logging
+
+# How an output column is derived from its source input column
+PASSTHROUGH = 0
+STANDARD_SCALED = 1
+MIN_MAX_SCALED = 2
+
+
+class FeatureLayout:
+    """
+    Compiled form of the fitted preprocessing object.
+
+    Records, for every column the ColumnTransformer outputs, which input column it comes from and
+    the scaler parameters applied to it. Request values can then be written straight into a
+    preallocated float64 buffer and scaled with NumPy, skipping the dict -> DataFrame ->
+    ColumnTransformer round trip. The arithmetic mirrors the scalers' own transform
+    (StandardScaler: subtract mean_ then divide by scale_, MinMaxScaler: multiply by scale_ then add min_),
+    so the result is bit-identical to preprocessing_object.transform for numeric inputs.
+    Missing values are rejected instead of being scored as NaN.
+    """
+
+    def __init__(self, input_columns: List[str], output_columns: List[str], source_index: np.ndarray,
+                 kind: np.ndarray, offset: np.ndarray, scale: np.ndarray, clip_range: np.ndarray):
+        """
+        :param input_columns: Column names expected by the preprocessing object, in order
+        :param output_columns: Names of the transformed columns, in the order the model expects them
+        :param source_index: Input column index of every output column
+        :param kind: PASSTHROUGH, STANDARD_SCALED or MIN_MAX_SCALED for every output column
+        :param offset: mean_ (standard) or min_ (min-max) of every output column
+        :param scale: scale_ of every output column
+        :param clip_range: (low, high) bounds for clipped min-max columns, NaN when not clipped
+        """
+        self.input_columns = list(input_columns)
+        self.output_columns = list(output_columns)
+        self.source_index = np.asarray(source_index, dtype=np.intp)
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.clip_range = np.asarray(clip_range, dtype=np.float64)
+
+        self._standard = np.flatnonzero(self.kind == STANDARD_SCALED)
+        self._min_max = np.flatnonzero(self.kind == MIN_MAX_SCALED)
+        self._clipped = np.flatnonzero(~np.isnan(self.clip_range[:, 0]))
+
+    @classmethod
+    def from_preprocessing_object(cls, preprocessing_object) -> "FeatureLayout":
+        """
+        Builds the layout from a fitted Pipeline holding a single ColumnTransformer
+        (the object created by DataTransformation.get_data_transformer_object)
+        """
+        # Only needed when compiling (at training time); the serving path never imports them
+        from sklearn.compose import ColumnTransformer
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, StandardScaler
+
+        try:
+            column_transformer = preprocessing_object
+            if isinstance(preprocessing_object, Pipeline):
+                if len(preprocessing_object.steps) != 1:
+                    raise ValueError("Only a pipeline with a single ColumnTransformer step can be compiled")
+                column_transformer = preprocessing_object.steps[0][1]
+            if not isinstance(column_transformer, ColumnTransformer):
+                raise ValueError(f"Cannot compile preprocessing step {type(column_transformer).__name__}")
+
+            input_columns = list(column_transformer.feature_names_in_)
+            output_columns, source_index, kind, offset, scale, clip_range = [], [], [], [], [], []
+
+            for name, transformer, columns in column_transformer.transformers_:
+                if transformer == "drop":
+                    continue
+                indices = cls._column_indices(columns, input_columns)
+                if len(indices) == 0:
+                    continue
+
+                # Recent sklearn versions store fitted passthrough columns as an identity FunctionTransformer
+                if transformer == "passthrough" or (isinstance(transformer, FunctionTransformer)
+                                                    and transformer.func is None):
+                    params = [(PASSTHROUGH, 0.0, 1.0, (np.nan, np.nan))] * len(indices)
+                elif isinstance(transformer, StandardScaler):
+                    # Without with_mean/with_std the scaler leaves that step out (mean_ may be fitted all the same)
+                    mean = transformer.mean_ if transformer.with_mean else np.zeros(len(indices))
+                    std = transformer.scale_ if transformer.with_std else np.ones(len(indices))
+                    params = [(STANDARD_SCALED, m, s, (np.nan, np.nan)) for m, s in zip(mean, std)]
+                elif isinstance(transformer, MinMaxScaler):
+                    bounds = transformer.feature_range if getattr(transformer, "clip", False) else (np.nan, np.nan)
+                    params = [(MIN_MAX_SCALED, m, s, bounds) for m, s in zip(transformer.min_, transformer.scale_)]
+                else:
+                    raise ValueError(f"Cannot compile transformer {name} of type {type(transformer).__name__}")
+
+                for index, (column_kind, column_offset, column_scale, bounds) in zip(indices, params):
+                    output_columns.append(input_columns[index])
+                    source_index.append(index)
+                    kind.append(column_kind)
+                    offset.append(column_offset)
+                    scale.append(column_scale)
+                    clip_range.append(bounds)
+
+            logging.info(f"Compiled feature layout with output columns {output_columns}")
+            return cls(input_columns, output_columns, np.array(source_index), np.array(kind),
+                       np.array(offset), np.array(scale), np.array(clip_range, dtype=np.float64))
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def _column_indices(columns, input_columns: List[str]) -> List[int]:
+        """
+        Resolves the column selection of a ColumnTransformer entry to input column indices
+        """
+        if isinstance(columns, slice):
+            return list(range(len(input_columns)))[columns]
+        columns = list(np.atleast_1d(columns))
+        if len(columns) and isinstance(columns[0], (bool, np.bool_)):
+            return [i for i, keep in enumerate(columns) if keep]
+        return [input_columns.index(col) if isinstance(col, str) else int(col) for col in columns]
+
+    @property
+    def n_inputs(self) -> int:
+        return len(self.input_columns)
+
+    def new_buffer(self, n_rows: int) -> np.ndarray:
+        """
+        Returns an uninitialised float64 buffer for n_rows raw input rows
+        """
+        return np.empty((n_rows, self.n_inputs), dtype=np.float64)
+
+    @staticmethod
+    def parse_value(column: str, value) -> float:
+        """
+        Converts one raw request value (a number or numeric string, e.g. a form field) to float.
+        Missing, empty and NaN values are rejected, as the fitted ColumnTransformer would reject them.
+        """
+        if value is None or (isinstance(value, str) and not value.strip()):
+            raise ValueError(f"Missing value for feature {column}")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Feature {column} must be a number, got {value!r}") from None
+        if np.isnan(number):
+            raise ValueError(f"Missing value for feature {column}")
+        return number
+
+    def fill_row(self, buffer: np.ndarray, row: int, record: Mapping) -> None:
+        """
+        Writes the raw values of one record (a mapping of input column name to value) into the buffer.
+        Raises ValueError naming the feature when a value is missing or not a number.
+        """
+        values = buffer[row]
+        for i, column in enumerate(self.input_columns):
+            values[i] = self.parse_value(column, record.get(column))
+
+    def records_to_buffer(self, records: Sequence[Mapping]) -> np.ndarray:
+        """
+        Writes many records into a new raw input buffer
+        """
+        buffer = self.new_buffer(len(records))
+        for row, record in enumerate(records):
+            self.fill_row(buffer, row, record)
+        return buffer
+
+    def transform(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Applies the compiled preprocessing to a (n_rows, n_inputs) raw buffer and returns
+        the (n_rows, n_outputs) float64 matrix the trained model expects
+        """
+        try:
+            raw = np.asarray(raw, dtype=np.float64)
+            if raw.ndim != 2 or raw.shape[1] != self.n_inputs:
+                raise ValueError(f"Expected a (n_rows, {self.n_inputs}) array, got shape {raw.shape}")
+
+            return self._scale(raw[:, self.source_index])
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def transform_columns(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Applies the compiled preprocessing to columnar inputs (input column name -> 1-d array, for
+        example NumPy views of Arrow buffers) and returns the matrix the trained model expects.
+        Every input column is copied once, straight into its place in the feature matrix; there is
+        no intermediate row buffer or DataFrame.
+        """
+        try:
+            missing = [column for column in self.input_columns if column not in columns]
+            if missing:
+                raise ValueError(f"Missing feature columns: {missing}")
+            lengths = {len(columns[column]) for column in self.input_columns}
+            if len(lengths) != 1:
+                raise ValueError("All feature columns must have the same number of values")
+            n_rows = lengths.pop()
+            if n_rows == 0:
+                raise ValueError("No rows to score")
+
+            features = np.empty((n_rows, len(self.output_columns)), dtype=np.float64)
+            for output_index, input_index in enumerate(self.source_index):
+                features[:, output_index] = columns[self.input_columns[input_index]]
+            missing_values = np.isnan(features).any(axis=0)
+            if missing_values.any():
+                raise ValueError(f"Missing values in feature columns: "
+                                 f"{[self.output_columns[i] for i in np.flatnonzero(missing_values)]}")
+            return self._scale(features)
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _scale(self, features: np.ndarray) -> np.ndarray:
+        """
+        Scales the columns of a (n_rows, n_outputs) matrix in place, as the fitted scalers would
+        """
+        if len(self._standard):
+            columns = self._standard
+            features[:, columns] = (features[:, columns] - self.offset[columns]) / self.scale[columns]
+        if len(self._min_max):
+            columns = self._min_max
+            features[:, columns] = features[:, columns] * self.scale[columns] + self.offset[columns]
+        if len(self._clipped):
+            columns = self._clipped
+            features[:, columns] = np.clip(features[:, columns], self.clip_range[columns, 0],
+                                           self.clip_range[columns, 1])
+        return features
+
+    def verify(self, preprocessing_object, dataframe: DataFrame) -> bool:
+        """
+        Checks that the layout reproduces preprocessing_object.transform bit for bit on the given rows
+        """
+        try:
+            expected = np.asarray(preprocessing_object.transform(dataframe), dtype=np.float64)
+            actual = self.transform(dataframe[self.input_columns].to_numpy(dtype=np.float64))
+            return expected.shape == actual.shape and np.array_equal(expected, actual, equal_nan=True)
+        except Exception as e:
+            raise MyException(e, sys) from e
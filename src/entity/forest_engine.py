@@ -0,0 +1,149 @@
+import sys
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.exception import MyException
+from src.logger import logging
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
+
+TREE_LEAF = -1  # Child index sklearn uses to mark a leaf node
+ROW_CHUNK_SIZE = 2048  # Rows traversed together; keeps the per-level working arrays cache friendly
+
+
+class CompiledForest:
+    """
+    Array-backed inference engine for a fitted RandomForestClassifier.
+
+    All estimators_ are flattened into contiguous NumPy arrays (feature, threshold, left, right and
+    normalized leaf value) with node indices made global across trees. A batch is scored by moving
+    every (row, tree) pair one level down per step, so the Python loop runs max_depth times instead of
+    once per tree. Comparisons, per-tree probabilities and their accumulation follow the order sklearn
+    uses, so predict_proba and predict match RandomForestClassifier exactly.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, classes: np.ndarray):
+        """
+        :param feature: Feature tested at every node (0 at leaves)
+        :param threshold: Split threshold of every node
+        :param left: Global index of the left child (leaves point to themselves)
+        :param right: Global index of the right child (leaves point to themselves)
+        :param value: Normalized class probabilities of every node, shape (n_nodes, n_classes)
+        :param roots: Global index of the root node of every tree
+        :param max_depth: Depth of the deepest tree
+        :param classes: Class labels of the forest
+        """
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        # Interleaved children: the child of node i is children[2 * i + went_right]
+        self.children = np.ascontiguousarray(np.stack([self.left, self.right], axis=1).ravel())
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def from_random_forest(cls, model: "RandomForestClassifier") -> "CompiledForest":
+        """
+        Flattens the trees of a fitted RandomForestClassifier into contiguous arrays
+        """
+        try:
+            if model.n_outputs_ != 1:
+                raise ValueError("Only single-output forests can be compiled")
+
+            features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+            offset = 0
+            for estimator in model.estimators_:
+                tree = estimator.tree_
+                node_ids = np.arange(tree.node_count) + offset
+                is_leaf = tree.children_left == TREE_LEAF
+
+                features.append(np.where(is_leaf, 0, tree.feature))
+                thresholds.append(tree.threshold)
+                lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+                rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+
+                # Same normalization as DecisionTreeClassifier.predict_proba
+                value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+                normalizer = value.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                values.append(value / normalizer)
+
+                roots.append(offset)
+                offset += tree.node_count
+
+            compiled = cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+                           np.concatenate(rights), np.concatenate(values), np.array(roots),
+                           max(estimator.tree_.max_depth for estimator in model.estimators_), model.classes_)
+            logging.info(f"Compiled forest with {len(roots)} trees and {offset} nodes ({compiled.nbytes} bytes)")
+            return compiled
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in (self.feature, self.threshold, self.left, self.right,
+                                          self.children, self.value, self.roots))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the global leaf index reached by every row in every tree, shape (n_rows, n_trees)
+        """
+        # The forest compares float32 inputs against float64 thresholds, as sklearn does
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[0] > ROW_CHUNK_SIZE:
+            return np.concatenate([self._apply_chunk(X[start:start + ROW_CHUNK_SIZE])
+                                   for start in range(0, X.shape[0], ROW_CHUNK_SIZE)])
+        return self._apply_chunk(X)
+
+    def _apply_chunk(self, X: np.ndarray) -> np.ndarray:
+        """
+        Moves every (row, tree) pair of the chunk one level down per step; leaves point to themselves
+        """
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            go_right = ~(flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes])
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the class probabilities averaged over all trees, shape (n_rows, n_classes)
+        """
+        try:
+            leaves = self.apply(X)
+            proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+            for tree in range(self.n_trees):
+                proba += self.value[leaves[:, tree]]
+            proba /= self.n_trees
+            return proba
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the predicted class label of every row
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def verify(self, model: "RandomForestClassifier", X: np.ndarray) -> bool:
+        """
+        Checks that the compiled forest gives exactly the same probabilities as the sklearn forest on X
+        """
+        try:
+            return np.array_equal(self.predict_proba(X), model.predict_proba(X))
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -10,15 +10,19 @@ class Proj1Estimator:
     This class is used to save and retrieve our model from s3 bucket and to do prediction
     """
 
-    def __init__(self,bucket_name,model_path,):
+    def __init__(self,bucket_name,model_path,version_id:str=None):
         """
         :param bucket_name: Name of your model bucket
         :param model_path: Location of your model in bucket
+        :param version_id: S3 version of the model file to load; the latest version when None
         """
         self.bucket_name = bucket_name
         self.s3 = SimpleStorageService()
         self.model_path = model_path
+        self.version_id = version_id
         self.loaded_model:MyModel=None
+        self.model_version:str=None
+        self.model_nbytes:int=None
 
 
     def is_model_present(self,model_path):
@@ -30,11 +34,16 @@ class Proj1Estimator:
 
     def load_model(self,)->MyModel:
         """
-        Load the model from the model_path
+        Load the model from the model_path and remember the version of the object it came from
+        (the S3 version id when one was requested, otherwise the ETag of the latest object)
+        and the size of its model file
         :return:
         """
-
-        return self.s3.load_model(self.model_path,bucket_name=self.bucket_name)
+        model, etag, nbytes = self.s3.load_model_with_etag(self.model_path, bucket_name=self.bucket_name,
+                                                           version_id=self.version_id)
+        self.model_version = self.version_id or etag
+        self.model_nbytes = nbytes
+        return model
 
     def save_model(self,from_file,remove:bool=False)->None:
         """
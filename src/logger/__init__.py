@@ -1,6 +1,11 @@
+import atexit  # This module runs a function when the program exits (used to flush queued logs).
+import json  # This module is used to write logs as structured JSON lines.
 import logging  # This module is used to create logs in the application.
 import os  # This module helps to interact with the operating system (like creating folders).
-from logging.handlers import RotatingFileHandler  # This class automatically rotates log files when they reach a certain size.
+import queue  # This module provides the in-memory queue between request threads and the log writer thread.
+import threading  # This module is used to protect the sampling counters.
+import time  # This module gives the current time used by the sampling window.
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler  # Queue classes move log writing to a background thread.
 from from_root import from_root  # This function gives the root folder path of the project.
 from datetime import datetime  # This module provides the current date and time.
 
@@ -10,35 +15,196 @@ LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"  # Log file nam
 # LOG_FILE = 'AYAZ.log'
 MAX_LOG_SIZE = 5 * 1024 * 1024  # Maximum log file size is set to 5 MB.
 BACKUP_COUNT = 3  # Only 3 backup log files will be kept.
+LOG_USE_QUEUE = os.getenv("LOG_USE_QUEUE", "true").lower() == "true"  # Format and write logs on a background thread.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" for the classic format, "json" for one JSON object per line.
+LOG_SAMPLE_MAX_PER_SECOND = int(os.getenv("LOG_SAMPLE_MAX_PER_SECOND", 20))  # INFO/DEBUG lines kept per second from each sampled module.
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 100))  # Beyond that budget, only 1 line in this many is kept.
+LOG_SAMPLED_MODULES = os.getenv("LOG_SAMPLED_MODULES", "prediction_pipeline,estimator,s3_estimator,aws_storage")  # Hot-path modules that are sampled.
 
 # Log file path setup
 log_dir_path = os.path.join(from_root(), LOG_DIR)  # Create full folder path like 'root_folder/logs'.
 os.makedirs(log_dir_path, exist_ok=True)  # If the folder doesn't exist, it will create the folder automatically.
 log_file_path = os.path.join(log_dir_path, LOG_FILE)  # Complete log file path including file name.
 
-def configure_logger():
+
+class JsonFormatter(logging.Formatter):
     """
-    This function configures the logging system to write logs to both a file and the console.
+    Formats every log record as one JSON object per line, so logs can be parsed without regexes.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limits INFO and DEBUG lines coming from high-frequency modules.
+
+    The whole project logs through the root logger, so records are grouped by the module that
+    emitted them. Each sampled module may log up to max_per_second lines per second in full;
+    beyond that only one line in sample_every is kept until the next second starts.
+    Warnings and errors are never dropped. Attached to the logger itself, a dropped record
+    is never formatted, queued or written.
+    """
+    def __init__(self, modules, max_per_second: int = LOG_SAMPLE_MAX_PER_SECOND,
+                 sample_every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.modules = frozenset(modules)
+        self.max_per_second = max_per_second
+        self.sample_every = max(1, sample_every)
+        self._windows = {}  # module -> [window start second, lines seen in that second]
+        self._lock = threading.Lock()
+        self.dropped = 0  # Number of records dropped since startup
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.module not in self.modules:
+            return True
+        now = int(time.monotonic())
+        with self._lock:
+            window = self._windows.get(record.module)
+            if window is None or window[0] != now:
+                window = self._windows[record.module] = [now, 0]
+            window[1] += 1
+            seen = window[1]
+            if seen <= self.max_per_second or (seen - self.max_per_second) % self.sample_every == 0:
+                return True
+            self.dropped += 1
+            return False
+
+
+queue_listener = None  # Background thread that formats and writes queued log records (queue mode only).
+_flush_lock = threading.Lock()  # Serializes flush_logs calls, which stop and restart the listener.
+
+
+def _build_handlers():
+    """
+    Creates the file and console handlers with the configured format.
     """
-    logger = logging.getLogger()  # Create a logger object.
-    logger.setLevel(logging.DEBUG)  # Set log level to DEBUG, which means all logs will be recorded (DEBUG, INFO, WARNING, ERROR, CRITICAL).
-    
     # Log message format
-    formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
 
     # File handler with rotation (logs will rotate if the file reaches 5 MB)
     file_handler = RotatingFileHandler(log_file_path, maxBytes=MAX_LOG_SIZE, backupCount=BACKUP_COUNT)
     file_handler.setFormatter(formatter)  # Attach the log format to file logs.
     file_handler.setLevel(logging.DEBUG)  # Save all logs from DEBUG level and above.
-    
+
     # Console handler (display logs in the terminal)
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)  # Attach the log format to console logs.
     console_handler.setLevel(logging.INFO)  # Display only INFO level and higher logs in the terminal.
-    
-    # Add both handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    return [file_handler, console_handler]
+
+
+def _start_queue_listener(handlers=None):
+    """
+    Puts a QueueHandler on the root logger and starts the listener thread that feeds the real handlers.
+    Also called in forked children, where the parent's listener thread does not exist.
+    """
+    global queue_listener, _flush_lock
+    _flush_lock = threading.Lock()  # A forked child may inherit the lock held by another parent thread.
+    logger = logging.getLogger()
+    if handlers is None:
+        handlers = list(queue_listener.handlers)  # Reuse the inherited file and console handlers.
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()  # Unbounded and lock-free for the threads that log.
+    logger.addHandler(QueueHandler(log_queue))
+    queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_listener.start()
+
+
+def flush_logs():
+    """
+    Writes every record still in the queue, e.g. before a worker leaves with os._exit.
+    Stopping the listener drains the queue; it is started again right away, so records logged
+    afterwards by other threads are still written. At interpreter exit stop_logging is used instead.
+    """
+    with _flush_lock:
+        if queue_listener is not None:
+            queue_listener.stop()
+            queue_listener.start()
+
+
+def _pause_queue_listener():
+    """
+    Stops the listener thread before a fork: a fork taken while it writes a record would leave the
+    file or console stream lock held for good in the child, and the child's first log line would hang
+    """
+    _flush_lock.acquire()
+    if queue_listener is not None:
+        queue_listener.stop()
+
+
+def _resume_queue_listener():
+    """
+    Starts the listener thread again in the parent once the fork is done
+    """
+    if queue_listener is not None:
+        queue_listener.start()
+    _flush_lock.release()
+
+
+def stop_logging():
+    """
+    Writes every record still in the queue and stops the listener for good; registered with atexit.
+    A thread cannot be started at interpreter shutdown, so instead of restarting the listener the
+    real handlers are attached to the root logger, and records logged by later exit handlers are
+    written directly.
+    """
+    global queue_listener
+    with _flush_lock:
+        if queue_listener is None:
+            return
+        queue_listener.stop()
+        logger = logging.getLogger()
+        for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+            logger.removeHandler(handler)
+        for handler in queue_listener.handlers:
+            logger.addHandler(handler)
+        queue_listener = None
+
+
+def configure_logger():
+    """
+    This function configures the logging system to write logs to both a file and the console.
+    In queue mode (the default) request threads only put records on an in-memory queue;
+    formatting and file writes happen on a background listener thread.
+    """
+    logger = logging.getLogger()  # Create a logger object.
+    logger.setLevel(logging.DEBUG)  # Set log level to DEBUG, which means all logs will be recorded (DEBUG, INFO, WARNING, ERROR, CRITICAL).
+
+    # Sample high-frequency INFO lines of the hot paths before they reach any handler
+    sampled_modules = [module.strip() for module in LOG_SAMPLED_MODULES.split(",") if module.strip()]
+    if sampled_modules:
+        logger.addFilter(SamplingFilter(sampled_modules))
+
+    handlers = _build_handlers()
+    if LOG_USE_QUEUE:
+        _start_queue_listener(handlers)
+        atexit.register(stop_logging)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(before=_pause_queue_listener, after_in_parent=_resume_queue_listener,
+                                after_in_child=_start_queue_listener)
+    else:
+        # Add both handlers to the logger
+        for handler in handlers:
+            logger.addHandler(handler)
 
 # Start logging setup by calling the function
 configure_logger()
@@ -53,6 +219,8 @@ Summary
 
 ------>If the log file exceeds 5 MB, it automatically creates a new file and keeps only 3 backup files.
 
------->The log format includes time, logger name, log level, and message.
+------>The log format includes time, logger name, log level, and message (or one JSON object per line with LOG_FORMAT=json).
+
+------>By default logs are queued and written by a background thread, and chatty hot-path modules are sampled.
 
-'''
\ No newline at end of file
+'''
@@ -0,0 +1,219 @@
+import asyncio
+import math
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from src.entity.config_entity import AdmissionControlConfig
+from src.exception import MyException
+from src.logger import logging
+from src.utils.metrics import metrics_registry
+
+# Priority classes, highest first: form submissions are served before batch traffic
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+admission_shed_total = metrics_registry.counter(
+    "admission_shed_total", "Prediction requests rejected with 503 by admission control, by priority and reason",
+    labelnames=("priority", "reason"))
+
+
+class RequestShedError(Exception):
+    """
+    Raised when admission control rejects a request; the route answers 503 with Retry-After
+    """
+
+    def __init__(self, priority: str, reason: str, retry_after_seconds: float):
+        super().__init__(f"Server is overloaded ({reason}), retry after {math.ceil(retry_after_seconds)} seconds")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """
+    Bounds how many prediction requests are worked on at once and how many may wait for a slot.
+
+    Every prediction request takes one of max_concurrent slots for as long as it is handled; batch
+    requests may hold at most batch_max_concurrent of them, so a burst of large batches cannot take
+    the server away from form submissions. Requests that find no free slot wait in a bounded queue
+    per priority class, and a freed slot always goes to a waiting interactive request before a batch
+    one. A request is rejected at once (503 + Retry-After) when its queue is full or when the wait
+    estimated from the queue ahead of it and the average slot hold time exceeds its deadline; the
+    deadline comes from the X-Request-Deadline-Ms header or the default of its priority class.
+    A request still waiting when its deadline passes is rejected as well.
+    Runs on the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, admission_control_config: AdmissionControlConfig = AdmissionControlConfig()):
+        """
+        :param admission_control_config: Slot limits, queue bounds and default deadlines
+        """
+        try:
+            self.admission_control_config = admission_control_config
+            self._waiters: Dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+            self.in_flight: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+            # Moving average of how long a request holds its slot, per priority class
+            self.average_hold_seconds: Dict[str, float] = {
+                INTERACTIVE: admission_control_config.initial_hold_seconds,
+                BATCH: admission_control_config.initial_hold_seconds,
+            }
+
+            # Metrics
+            self.admitted = {priority: 0 for priority in PRIORITIES}
+            self.queued = {priority: 0 for priority in PRIORITIES}
+            self.shed = {priority: 0 for priority in PRIORITIES}
+            self.queue_wait_total_seconds = {priority: 0.0 for priority in PRIORITIES}
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def parse_deadline_ms(value: Optional[str]) -> Optional[float]:
+        """
+        Returns the deadline in seconds from an X-Request-Deadline-Ms header value, None when absent or invalid
+        """
+        try:
+            deadline_ms = float(value)
+        except (TypeError, ValueError):
+            return None
+        return deadline_ms / 1000.0 if deadline_ms > 0 else None
+
+    def default_deadline_seconds(self, priority: str) -> float:
+        config = self.admission_control_config
+        return (config.interactive_deadline_ms if priority == INTERACTIVE else config.batch_deadline_ms) / 1000.0
+
+    def _max_queue(self, priority: str) -> int:
+        config = self.admission_control_config
+        return config.interactive_max_queue if priority == INTERACTIVE else config.batch_max_queue
+
+    def _has_slot(self, priority: str) -> bool:
+        config = self.admission_control_config
+        if sum(self.in_flight.values()) >= config.max_concurrent:
+            return False
+        return priority == INTERACTIVE or self.in_flight[BATCH] < config.batch_max_concurrent
+
+    def estimate_wait_seconds(self, priority: str) -> float:
+        """
+        Estimates how long a request arriving now would wait for a slot: the requests queued ahead of it
+        (of its own and higher priority classes) times their average hold time, spread over the slots
+        """
+        config = self.admission_control_config
+        ahead = list(PRIORITIES[:PRIORITIES.index(priority) + 1])
+        work_ahead = sum((len(self._waiters[p]) + (p == priority)) * self.average_hold_seconds[p] for p in ahead)
+        slots = config.max_concurrent if priority == INTERACTIVE else min(config.batch_max_concurrent,
+                                                                         config.max_concurrent)
+        return work_ahead / max(1, slots)
+
+    def _reject(self, priority: str, reason: str, retry_after_seconds: float) -> RequestShedError:
+        self.shed[priority] += 1
+        admission_shed_total.labels(priority, reason).inc()
+        logging.warning(f"Shed a {priority} prediction request: {reason}")
+        return RequestShedError(priority, reason, max(1.0, retry_after_seconds))
+
+    def _wake_waiters(self) -> None:
+        """
+        Hands free slots to waiting requests, interactive ones first
+        """
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self._has_slot(priority):
+                future = waiters.popleft()
+                self.in_flight[priority] += 1
+                future.set_result(None)
+
+    async def acquire(self, priority: str, deadline_seconds: Optional[float] = None) -> None:
+        """
+        Takes a slot for a request of the given priority class, waiting at most until its deadline
+        :param deadline_seconds: Time budget of the request; the class default when None
+        Raises RequestShedError when the request is rejected
+        """
+        deadline_seconds = self.default_deadline_seconds(priority) if deadline_seconds is None else deadline_seconds
+        waiters = self._waiters[priority]
+        # Only an empty queue may be overtaken, so waiting requests keep their order
+        if not any(self._waiters[p] for p in PRIORITIES[:PRIORITIES.index(priority) + 1]) and self._has_slot(priority):
+            self.in_flight[priority] += 1
+            self.admitted[priority] += 1
+            return
+
+        if len(waiters) >= self._max_queue(priority):
+            raise self._reject(priority, "queue_full", self.estimate_wait_seconds(priority))
+        estimated_wait = self.estimate_wait_seconds(priority)
+        if estimated_wait > deadline_seconds:
+            raise self._reject(priority, "deadline_exceeded", estimated_wait)
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self.queued[priority] += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=deadline_seconds)
+        except asyncio.TimeoutError:
+            self._abandon(priority, future)
+            raise self._reject(priority, "deadline_expired", self.estimate_wait_seconds(priority))
+        except asyncio.CancelledError:
+            # The client went away while queued
+            self._abandon(priority, future)
+            raise
+        self.admitted[priority] += 1
+        self.queue_wait_total_seconds[priority] += time.perf_counter() - start
+
+    def _abandon(self, priority: str, future: asyncio.Future) -> None:
+        """
+        Takes a request that stopped waiting out of the queue, or gives back its slot
+        when it was granted in the same loop iteration
+        """
+        if future.done():
+            self.release(priority)
+        else:
+            future.cancel()
+            self._waiters[priority].remove(future)
+
+    def release(self, priority: str, hold_seconds: Optional[float] = None) -> None:
+        """
+        Gives back the slot of a finished request and hands it to the next waiting one
+        :param hold_seconds: How long the slot was held; feeds the wait estimate
+        """
+        self.in_flight[priority] -= 1
+        if hold_seconds:
+            alpha = self.admission_control_config.hold_time_smoothing
+            self.average_hold_seconds[priority] += alpha * (hold_seconds - self.average_hold_seconds[priority])
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def admit(self, priority: str, deadline_seconds: Optional[float] = None):
+        """
+        Holds a slot for the duration of the block; see acquire
+        """
+        await self.acquire(priority, deadline_seconds)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(priority, time.perf_counter() - start)
+
+    def get_stats(self) -> dict:
+        """
+        Returns slot use, queue depth, shed counts and the average queue wait per priority class
+        """
+        config = self.admission_control_config
+        return {
+            "max_concurrent": config.max_concurrent,
+            "batch_max_concurrent": config.batch_max_concurrent,
+            "priorities": {
+                priority: {
+                    "in_flight": self.in_flight[priority],
+                    "queued_now": len(self._waiters[priority]),
+                    "max_queue": self._max_queue(priority),
+                    "default_deadline_ms": 1000.0 * self.default_deadline_seconds(priority),
+                    "admitted": self.admitted[priority],
+                    "queued": self.queued[priority],
+                    "shed": self.shed[priority],
+                    "avg_queue_wait_ms": (1000.0 * self.queue_wait_total_seconds[priority] / self.queued[priority]
+                                          if self.queued[priority] else 0.0),
+                    "avg_hold_ms": 1000.0 * self.average_hold_seconds[priority],
+                } for priority in PRIORITIES
+            },
+        }
@@ -0,0 +1,150 @@
+"""
+Offline bulk scoring of the whole book.
+
+Reads rows in the raw collection schema from the Proj1-data MongoDB collection or from a local
+CSV/Parquet file in chunks, scores the chunks across a pool of worker processes (each loading the
+production model from S3 once) and writes one Parquet part file per chunk.
+
+Usage:
+    python -m src.pipline.batch_prediction --source mongodb
+    python -m src.pipline.batch_prediction --source path/to/data.parquet --workers 8 --output-dir out/
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator
+
+import pandas as pd
+
+from src.entity.config_entity import BatchPredictionConfig
+from src.entity.estimator import MyModel
+from src.exception import MyException
+from src.logger import logging
+from src.pipline.prediction_pipeline import VehicleRawData
+
+# Model held by each worker process, loaded once by _initialize_worker
+_worker_model: MyModel = None
+
+
+def _initialize_worker(model_bucket_name: str, model_file_path: str) -> None:
+    """
+    Loads the production model once per worker process
+    """
+    global _worker_model
+    from src.entity.s3_estimator import Proj1Estimator
+
+    estimator = Proj1Estimator(bucket_name=model_bucket_name, model_path=model_file_path)
+    _worker_model = estimator.load_model()
+    logging.info(f"Batch prediction worker {os.getpid()} loaded model version {estimator.model_version}")
+
+
+def _score_chunk(part_number: int, chunk: pd.DataFrame, output_dir: str) -> int:
+    """
+    Scores one chunk in a worker process and writes it as a Parquet part file
+    :return: Number of rows scored
+    """
+    features = VehicleRawData(chunk).get_vehicle_input_data_frame()
+    predictions, probabilities = _worker_model.predict_with_proba(features)
+    positive_class = list(_worker_model.get_inference_engine().classes_).index(1)
+
+    result = pd.DataFrame({"prediction": predictions.astype(int), "probability": probabilities[:, positive_class]})
+    if "id" in chunk.columns:
+        result.insert(0, "id", chunk["id"].to_numpy())
+    result.to_parquet(os.path.join(output_dir, f"part-{part_number:05d}.parquet"), index=False)
+    return len(result)
+
+
+class BatchPrediction:
+    """
+    Scores a whole dataset in chunks across a process pool and writes partitioned Parquet output
+    """
+
+    def __init__(self, batch_prediction_config: BatchPredictionConfig = BatchPredictionConfig()):
+        """
+        :param batch_prediction_config: Output folder, chunk size, worker count and model location
+        """
+        try:
+            self.batch_prediction_config = batch_prediction_config
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def iter_chunks(self, source: str) -> Iterator[pd.DataFrame]:
+        """
+        Yields the rows of the source in chunks: "mongodb" reads the configured collection,
+        any other value is a path to a local .csv or .parquet file
+        """
+        chunk_size = self.batch_prediction_config.chunk_size
+        if source == "mongodb":
+            from src.data_access.proj1_data import Proj1Data
+            yield from Proj1Data().iter_collection_chunks(self.batch_prediction_config.collection_name, chunk_size)
+        elif source.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+        elif source.endswith(".csv"):
+            yield from pd.read_csv(source, chunksize=chunk_size, na_values="na")
+        else:
+            raise ValueError(f"Unsupported source {source}: use 'mongodb' or a .csv/.parquet file")
+
+    def run(self, source: str) -> dict:
+        """
+        Scores every chunk of the source and returns a summary with the throughput in rows per second
+        """
+        try:
+            config = self.batch_prediction_config
+            os.makedirs(config.output_dir, exist_ok=True)
+            logging.info(f"Starting batch prediction of {source} with {config.n_workers} workers into {config.output_dir}")
+
+            start = time.perf_counter()
+            rows = 0
+            parts = 0
+            max_pending = 2 * config.n_workers  # Bounds the number of chunks held in memory at once
+
+            with ProcessPoolExecutor(max_workers=config.n_workers, initializer=_initialize_worker,
+                                     initargs=(config.model_bucket_name, config.model_file_path)) as pool:
+                pending = set()
+                for part_number, chunk in enumerate(self.iter_chunks(source)):
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        rows += sum(future.result() for future in done)
+                    pending.add(pool.submit(_score_chunk, part_number, chunk, config.output_dir))
+                    parts += 1
+                rows += sum(future.result() for future in wait(pending).done)
+
+            elapsed = time.perf_counter() - start
+            summary = {
+                "source": source,
+                "output_dir": config.output_dir,
+                "parts": parts,
+                "rows": rows,
+                "workers": config.n_workers,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+            }
+            logging.info(f"Batch prediction finished: {summary}")
+            return summary
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+def main() -> None:
+    defaults = BatchPredictionConfig()
+    parser = argparse.ArgumentParser(description="Score the whole book with the production model.")
+    parser.add_argument("--source", default="mongodb",
+                        help="'mongodb' for the Proj1-data collection, or a local .csv/.parquet file")
+    parser.add_argument("--output-dir", default=defaults.output_dir, help="Folder for the Parquet part files")
+    parser.add_argument("--workers", type=int, default=defaults.n_workers, help="Number of scoring processes")
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size, help="Rows per chunk")
+    args = parser.parse_args()
+
+    config = BatchPredictionConfig(output_dir=args.output_dir, chunk_size=args.chunk_size, n_workers=args.workers)
+    summary = BatchPrediction(batch_prediction_config=config).run(args.source)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
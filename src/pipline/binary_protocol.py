@@ -0,0 +1,142 @@
+import sys
+from typing import Dict, Tuple
+
+import numpy as np
+
+from src.constants import ARROW_STREAM_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from src.entity.estimator import MyModel
+from src.exception import MyException
+from src.pipline.prediction_pipeline import VehicleData, VehicleDataClassifier
+from src.utils.metrics import prediction_stage_seconds
+
+
+class BinaryPredictionProtocol:
+    """
+    Binary request and response formats of /predict/binary, for callers that send many rows at once.
+
+    Arrow IPC stream (Content-Type application/vnd.apache.arrow.stream): one or more record batches
+    with a column per VehicleData feature. Numeric columns without nulls are viewed as NumPy arrays
+    over the request body itself; the only copy is the one into the model's feature matrix. The
+    response is an Arrow stream with an int64 "prediction" and a float64 "probability" column.
+
+    msgpack (Content-Type application/msgpack): a map of feature name to either a list of numbers or
+    the raw bytes of a little-endian float64 array. The response is a map holding "model_version"
+    and the raw bytes of the little-endian int64 "predictions" and float64 "probabilities" arrays.
+
+    pyarrow and msgpack are imported on first use, so they stay off the import path of the app.
+    """
+
+    media_types = (ARROW_STREAM_MEDIA_TYPE, MSGPACK_MEDIA_TYPE)
+
+    def __init__(self, content_type: str):
+        """
+        :param content_type: Content-Type header of the request; the response uses the same format
+        """
+        try:
+            self.media_type = (content_type or "").split(";")[0].strip().lower()
+            if self.media_type not in self.media_types:
+                raise ValueError(f"Unsupported content type {content_type!r}, expected one of {self.media_types}")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def decode(self, body: bytes) -> Dict[str, np.ndarray]:
+        """
+        Returns the feature columns of the request body as 1-d NumPy arrays, in VehicleData order
+        """
+        try:
+            if self.media_type == ARROW_STREAM_MEDIA_TYPE:
+                return self._decode_arrow(body)
+            return self._decode_msgpack(body)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def encode(self, predictions: np.ndarray, probabilities: np.ndarray, model_version: str = None) -> bytes:
+        """
+        Returns the response body holding the predictions and positive-class probabilities
+        """
+        try:
+            predictions = np.ascontiguousarray(predictions, dtype="<i8")
+            probabilities = np.ascontiguousarray(probabilities, dtype="<f8")
+            if self.media_type == ARROW_STREAM_MEDIA_TYPE:
+                return self._encode_arrow(predictions, probabilities, model_version)
+            return self._encode_msgpack(predictions, probabilities, model_version)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def predict(self, body: bytes, model_predictor: VehicleDataClassifier, model: MyModel = None,
+                model_version: str = None) -> Tuple[np.ndarray, bytes]:
+        """
+        Decodes the request body, scores it and encodes the response
+        :param model: Model version to score with (see ModelRegistry); the resident production model when None
+        Returns: The predicted labels and the response body
+        """
+        try:
+            with prediction_stage_seconds.labels("binary_decode").time():
+                columns = self.decode(body)
+            predictions, probabilities = model_predictor.predict_columns(columns, model)
+            with prediction_stage_seconds.labels("binary_encode").time():
+                content = self.encode(predictions, probabilities, model_version)
+            return predictions, content
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def _decode_arrow(body: bytes) -> Dict[str, np.ndarray]:
+        import pyarrow as pa
+
+        # py_buffer wraps the body without copying it, so the column arrays below point into it
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        missing = [column for column in VehicleData.feature_columns if column not in table.column_names]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+
+        columns = {}
+        for column in VehicleData.feature_columns:
+            chunked = table.column(column)
+            if chunked.null_count:
+                raise ValueError(f"Feature column {column} contains nulls")
+            # A single-batch stream needs no concatenation; several batches are combined once here
+            array = chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+            columns[column] = array.to_numpy(zero_copy_only=False)
+        return columns
+
+    @staticmethod
+    def _encode_arrow(predictions: np.ndarray, probabilities: np.ndarray, model_version: str) -> bytes:
+        import pyarrow as pa
+
+        batch = pa.record_batch([pa.array(predictions), pa.array(probabilities)], names=["prediction", "probability"])
+        schema = batch.schema.with_metadata({"model_version": str(model_version)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def _decode_msgpack(body: bytes) -> Dict[str, np.ndarray]:
+        import msgpack
+
+        payload = msgpack.unpackb(body, raw=False)
+        if not isinstance(payload, dict):
+            raise ValueError("A msgpack payload must be a map of feature name to values")
+        missing = [column for column in VehicleData.feature_columns if column not in payload]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+
+        columns = {}
+        for column in VehicleData.feature_columns:
+            values = payload[column]
+            if isinstance(values, (bytes, bytearray)):
+                columns[column] = np.frombuffer(values, dtype="<f8")
+            else:
+                columns[column] = np.asarray(values, dtype=np.float64)
+        return columns
+
+    @staticmethod
+    def _encode_msgpack(predictions: np.ndarray, probabilities: np.ndarray, model_version: str) -> bytes:
+        import msgpack
+
+        return msgpack.packb({
+            "model_version": model_version,
+            "predictions": predictions.tobytes(),
+            "probabilities": probabilities.tobytes(),
+        })
@@ -0,0 +1,160 @@
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from src.entity.config_entity import InferenceExecutorConfig
+from src.exception import MyException
+from src.logger import logging
+
+
+def _timed_call(fn: Callable, *args) -> tuple:
+    """
+    Runs fn inside the executor worker and returns its result with the wall-clock start time
+    and the time spent, so utilization can be measured for both threads and processes.
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, started_at, time.perf_counter() - start
+
+
+def _initialize_process_worker() -> None:
+    """
+    Loads the production model once in every worker process of a process pool
+    """
+    from src.pipline.prediction_pipeline import VehicleDataClassifier
+    try:
+        VehicleDataClassifier().load_model()
+    except Exception as e:
+        logging.error(f"Inference worker could not preload the model: {e}")
+
+
+class InferenceQueueFullError(Exception):
+    """
+    Raised when the executor already has as many calls waiting as its queue allows
+    """
+
+
+class InferenceExecutor:
+    """
+    Runs blocking inference calls (unpickling, preprocessing, forest predict) off the event loop.
+
+    A thread pool is the default: calls share the resident model with no pickling, and most of
+    the time of a call is spent in the NumPy kernels of FeatureLayout and CompiledForest, which
+    release the GIL, so large batches overlap. The Python glue between those kernels still holds
+    the GIL; when many small calls keep every core busy, a process pool scales further at the cost
+    of one model copy per worker. The number of calls waiting for a worker is bounded so that a
+    burst of traffic is rejected instead of queuing without limit.
+    """
+
+    def __init__(self, inference_executor_config: InferenceExecutorConfig = InferenceExecutorConfig()):
+        """
+        :param inference_executor_config: Executor kind, worker count and queue bound
+        """
+        try:
+            self.inference_executor_config = inference_executor_config
+            self._lock = threading.Lock()
+            self._executor = None
+
+            # Metrics
+            self.started_at = time.time()
+            self.submitted_count = 0
+            self.completed_count = 0
+            self.failed_count = 0
+            self.rejected_count = 0
+            self.in_flight = 0
+            self.busy_seconds = 0.0
+            self.queue_wait_total_seconds = 0.0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @property
+    def max_workers(self) -> int:
+        return self.inference_executor_config.max_workers
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.inference_executor_config.executor_kind == "process"
+
+    def start(self) -> None:
+        """
+        Creates the worker pool; call it after any fork so that workers belong to this process
+        """
+        if self._executor is not None:
+            return
+        kind = self.inference_executor_config.executor_kind
+        if kind == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        elif kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 initializer=_initialize_process_worker)
+        else:
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.started_at = time.time()
+        logging.info(f"Inference executor started with {self.inference_executor_config}")
+
+    def shutdown(self) -> None:
+        """
+        Waits for running calls and releases the workers
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            logging.info("Inference executor stopped")
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Runs fn(*args) on the executor and waits for it without blocking the event loop.
+        Raises InferenceQueueFullError when the queue bound is reached.
+        """
+        if self._executor is None:
+            raise RuntimeError("Inference executor is not running")
+
+        with self._lock:
+            if self.in_flight >= self.max_workers + self.inference_executor_config.max_queue_size:
+                self.rejected_count += 1
+                raise InferenceQueueFullError("Inference queue is full, try again later")
+            self.in_flight += 1
+            self.submitted_count += 1
+
+        submitted_at = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, elapsed = await loop.run_in_executor(self._executor, _timed_call, fn, *args)
+            with self._lock:
+                self.completed_count += 1
+                self.busy_seconds += elapsed
+                self.queue_wait_total_seconds += max(0.0, started_at - submitted_at)
+            return result
+        except Exception:
+            with self._lock:
+                self.failed_count += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns queue depth and utilization of the executor
+        """
+        with self._lock:
+            uptime = max(time.time() - self.started_at, 1e-9)
+            return {
+                "executor_kind": self.inference_executor_config.executor_kind,
+                "max_workers": self.max_workers,
+                "max_queue_size": self.inference_executor_config.max_queue_size,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "submitted": self.submitted_count,
+                "completed": self.completed_count,
+                "failed": self.failed_count,
+                "rejected": self.rejected_count,
+                "busy_seconds": self.busy_seconds,
+                "utilization": min(1.0, self.busy_seconds / (self.max_workers * uptime)),
+                "avg_queue_wait_ms": (1000.0 * self.queue_wait_total_seconds / self.completed_count
+                                      if self.completed_count else 0.0),
+            }
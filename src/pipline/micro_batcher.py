@@ -0,0 +1,234 @@
+import asyncio
+import sys
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+from src.entity.config_entity import MicroBatcherConfig
+from src.exception import MyException
+from src.logger import logging
+from src.pipline.inference_executor import InferenceExecutor
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row prediction requests into one vectorized model call.
+
+    Requests are queued on the event loop. A single worker task takes the first waiting request,
+    keeps collecting more until the batch window closes or the batch is full, scores the whole
+    batch with one call to predict_fn and hands every caller back its own result.
+    The window is adaptive: while traffic is light (recent batches hold a single row) a request
+    is scored at once instead of waiting for company that is not coming.
+    When an InferenceExecutor is given, batches are scored on it so the event loop stays free,
+    and a new batch is only collected once a worker is available to score it.
+    """
+
+    # Upper bounds of the batch-size histogram buckets
+    batch_size_buckets = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+    def __init__(self, predict_fn: Callable[[List[Any]], Sequence[Any]],
+                 micro_batcher_config: MicroBatcherConfig = MicroBatcherConfig(),
+                 executor: Optional[InferenceExecutor] = None):
+        """
+        :param predict_fn: Function that scores a list of items and returns one result per item, in order
+        :param micro_batcher_config: Batch window and maximum batch size
+        :param executor: Executor that runs predict_fn; without one it runs on the event loop
+        """
+        try:
+            self.predict_fn = predict_fn
+            self.micro_batcher_config = micro_batcher_config
+            self.executor = executor
+            self._queue: Optional[asyncio.Queue] = None
+            self._worker: Optional[asyncio.Task] = None
+            self._slots: Optional[asyncio.Semaphore] = None  # Free executor workers
+            self._scoring_tasks: set = set()
+            self._avg_batch_size = 1.0  # Exponentially weighted average used to decide whether to wait
+
+            # Metrics
+            self.batch_count = 0
+            self.item_count = 0
+            self.max_batch_size_seen = 0
+            self.batch_size_histogram = [0] * (len(self.batch_size_buckets) + 1)
+            self.queue_wait_total_seconds = 0.0
+            self.queue_wait_max_seconds = 0.0
+            self.predict_total_seconds = 0.0
+            self.error_count = 0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    async def start(self) -> None:
+        """
+        Starts the worker task on the running event loop
+        """
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.executor.max_workers if self.executor is not None else 1)
+            self._worker = asyncio.create_task(self._run())
+            logging.info(f"Micro-batcher started with {self.micro_batcher_config}")
+
+    async def stop(self) -> None:
+        """
+        Stops the worker task; requests still waiting in the queue are cancelled
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            if self._scoring_tasks:
+                await asyncio.gather(*self._scoring_tasks, return_exceptions=True)
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                future.cancel()
+            logging.info("Micro-batcher stopped")
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queues one item for scoring and waits for its result
+        """
+        if self._worker is None:
+            raise RuntimeError("Micro-batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """
+        Waits for the first request, then gathers more until the window closes or the batch is full
+        """
+        batch = [await self._queue.get()]
+        max_batch_size = self.micro_batcher_config.max_batch_size
+
+        # Everything that is already waiting joins the batch straight away
+        while len(batch) < max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        # Only hold the batch open when recent traffic shows that other requests are likely to arrive
+        if len(batch) > 1 or self._avg_batch_size > 1.5:
+            deadline = time.perf_counter() + self.micro_batcher_config.max_wait_ms / 1000.0
+            while len(batch) < max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    async def _run(self) -> None:
+        """
+        Worker loop: wait for a free worker, collect a batch and hand it over for scoring
+        """
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+            if self.executor is None:
+                await self._score_batch(batch)
+            else:
+                task = asyncio.create_task(self._score_batch(batch))
+                self._scoring_tasks.add(task)
+                task.add_done_callback(self._scoring_tasks.discard)
+
+    async def _predict(self, items: list) -> Sequence[Any]:
+        """
+        Runs predict_fn on the executor (or the event loop) and checks that it returned one result per item
+        """
+        if self.executor is None:
+            results = self.predict_fn(items)
+        else:
+            results = await self.executor.run(self.predict_fn, items)
+        if len(results) != len(items):
+            raise ValueError(f"predict_fn returned {len(results)} results for {len(items)} items")
+        return results
+
+    async def _score_batch(self, batch: list) -> None:
+        """
+        Scores one batch with a single predict_fn call and fans the results back out.
+        If the batch call fails, every item is scored again on its own, so that only the
+        requests that cannot be scored (for example a malformed form field) get the error.
+        """
+        dispatched_at = time.perf_counter()
+        items = [item for item, _, _ in batch]
+
+        try:
+            try:
+                results = await self._predict(items)
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                if len(batch) == 1:
+                    self.error_count += 1
+                    logging.error(f"Micro-batch of 1 item failed: {e}")
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(e)
+                else:
+                    logging.warning(f"Micro-batch of {len(items)} items failed, scoring its items one by one: {e}")
+                    await self._score_items_alone(batch)
+
+            self._record_batch(batch, dispatched_at, time.perf_counter() - dispatched_at)
+        finally:
+            self._slots.release()
+
+    async def _score_items_alone(self, batch: list) -> None:
+        """
+        Scores every item of a failed batch with its own predict_fn call and sets its result or error
+        """
+        for item, future, _ in batch:
+            if future.done():
+                continue
+            try:
+                result = (await self._predict([item]))[0]
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.error_count += 1
+                logging.error(f"Micro-batch item failed: {e}")
+                if not future.done():
+                    future.set_exception(e)
+
+    def _record_batch(self, batch: list, dispatched_at: float, predict_seconds: float) -> None:
+        """
+        Updates the batch-size and queue-wait metrics after a batch has been scored
+        """
+        size = len(batch)
+        self._avg_batch_size = 0.8 * self._avg_batch_size + 0.2 * size
+        self.batch_count += 1
+        self.item_count += size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, size)
+        self.predict_total_seconds += predict_seconds
+
+        bucket = next((i for i, bound in enumerate(self.batch_size_buckets) if size <= bound),
+                      len(self.batch_size_buckets))
+        self.batch_size_histogram[bucket] += 1
+
+        for _, _, enqueued_at in batch:
+            wait = dispatched_at - enqueued_at
+            self.queue_wait_total_seconds += wait
+            self.queue_wait_max_seconds = max(self.queue_wait_max_seconds, wait)
+
+    def get_stats(self) -> dict:
+        """
+        Returns batch-size and queue-wait metrics for tuning the batch window
+        """
+        bucket_labels = [str(bound) for bound in self.batch_size_buckets] + ["+Inf"]
+        return {
+            "max_wait_ms": self.micro_batcher_config.max_wait_ms,
+            "max_batch_size": self.micro_batcher_config.max_batch_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batch_count,
+            "items": self.item_count,
+            "errors": self.error_count,
+            "avg_batch_size": self.item_count / self.batch_count if self.batch_count else 0.0,
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "batch_size_histogram": dict(zip(bucket_labels, self.batch_size_histogram)),
+            "avg_queue_wait_ms": 1000.0 * self.queue_wait_total_seconds / self.item_count if self.item_count else 0.0,
+            "max_queue_wait_ms": 1000.0 * self.queue_wait_max_seconds,
+            "avg_predict_ms": 1000.0 * self.predict_total_seconds / self.batch_count if self.batch_count else 0.0,
+        }
@@ -0,0 +1,336 @@
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.entity.config_entity import ModelRegistryConfig, VehiclePredictorConfig
+from src.entity.estimator import MyModel
+from src.entity.s3_estimator import Proj1Estimator
+from src.exception import MyException
+from src.logger import logging
+from src.pipline.prediction_pipeline import VehicleDataClassifier
+
+
+class ModelRegistry:
+    """
+    Holds several MyModel versions in memory so that they can be compared in production.
+
+    The champion is the resident production model of VehicleDataClassifier. Every other version
+    (the configured challenger, or any S3 version of model.pkl asked for by id) is loaded on first use
+    into a bounded LRU keyed by its S3 version id or ETag; the least recently used versions are dropped
+    once more than max_models are resident or the size of their model files exceeds max_bytes.
+    A version that fails to load (e.g. an unknown version id in the header) is answered with the same
+    error for failed_lookup_ttl_seconds, without asking S3 again.
+    Each request is routed to a version by the X-Model-Version header, or else by a weighted split
+    between champion and challenger.
+    """
+
+    champion = "champion"
+    challenger = "challenger"
+
+    def __init__(self, model_registry_config: ModelRegistryConfig = ModelRegistryConfig(),
+                 prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig()):
+        """
+        :param model_registry_config: Memory bounds, challenger location and traffic split
+        :param prediction_pipeline_config: Location of the champion model
+        """
+        try:
+            self.model_registry_config = model_registry_config
+            self.prediction_pipeline_config = prediction_pipeline_config
+            self._models: "OrderedDict[str, dict]" = OrderedDict()  # version key -> resident entry
+            self._aliases = {}  # route name (alias or requested version) -> version key
+            self._lock = threading.Lock()
+            self._load_locks = {}  # route name -> lock, so a version is downloaded once however many ask
+            self._failed: "OrderedDict[str, tuple]" = OrderedDict()  # route name -> (failed at, error)
+
+            # Metrics
+            self.routed = {self.champion: 0, self.challenger: 0, "pinned": 0}
+            self.loads = 0
+            self.evictions = 0
+            self.failed_lookups = 0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @property
+    def has_challenger(self) -> bool:
+        config = self.model_registry_config
+        return bool(config.challenger_file_path or config.challenger_version_id)
+
+    @property
+    def shadow_enabled(self) -> bool:
+        return self.has_challenger and self.model_registry_config.shadow_challenger
+
+    def choose_route(self, requested_version: Optional[str] = None) -> str:
+        """
+        Returns the version a request is served by: the one named in the request header if any,
+        otherwise the challenger for challenger_weight of the traffic and the champion for the rest
+        """
+        if requested_version:
+            self.routed["pinned"] += 1
+            return requested_version
+        if self.has_challenger and random.random() < self.model_registry_config.challenger_weight:
+            self.routed[self.challenger] += 1
+            return self.challenger
+        self.routed[self.champion] += 1
+        return self.champion
+
+    def is_champion(self, route: str) -> bool:
+        return route == self.champion or (route is not None and route == VehicleDataClassifier.model_version)
+
+    def get_model(self, route: str) -> Tuple[str, MyModel]:
+        """
+        Returns (version key, model) for a route, loading the version from S3 on first use.
+        Blocking; call it from a worker thread.
+        """
+        try:
+            if self.is_champion(route):
+                model = VehicleDataClassifier(self.prediction_pipeline_config).load_model()
+                return VehicleDataClassifier.model_version, model
+
+            with self._lock:
+                key = self._aliases.get(route, route)
+                entry = self._models.get(key)
+                if entry is not None:
+                    self._models.move_to_end(key)
+                    entry["last_used_at"] = time.time()
+                    return key, entry["model"]
+                self._raise_if_failed_recently(route)
+                load_lock = self._load_locks.get(route)
+                created_lock = load_lock is None
+                if created_lock:
+                    load_lock = self._load_locks[route] = threading.Lock()
+
+            try:
+                with load_lock:
+                    with self._lock:
+                        key = self._aliases.get(route, route)
+                        if key in self._models:
+                            return key, self._models[key]["model"]
+                        self._raise_if_failed_recently(route)
+                    try:
+                        return self._load(route, self._config_for(route))
+                    except Exception as e:
+                        self._record_failure(route, e)
+                        raise
+            finally:
+                # Only the caller that created the lock removes it, and only if no newer lock replaced it,
+                # so a waiter that finishes late never drops the lock of a load that is still running
+                if created_lock:
+                    with self._lock:
+                        if self._load_locks.get(route) is load_lock:
+                            del self._load_locks[route]
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _raise_if_failed_recently(self, route: str) -> None:
+        """
+        Raises the error of the last load of route if it failed less than failed_lookup_ttl_seconds ago.
+        Called with the lock held.
+        """
+        failure = self._failed.get(route)
+        if failure is None:
+            return
+        failed_at, error = failure
+        if time.monotonic() - failed_at < self.model_registry_config.failed_lookup_ttl_seconds:
+            self.failed_lookups += 1
+            raise ValueError(f"Model version {route} could not be loaded: {error}")
+        del self._failed[route]
+
+    def _record_failure(self, route: str, error: Exception) -> None:
+        with self._lock:
+            self._failed.pop(route, None)
+            self._failed[route] = (time.monotonic(), error)
+            while len(self._failed) > self.model_registry_config.failed_lookup_max_entries:
+                self._failed.popitem(last=False)
+        logging.warning(f"Model version {route} could not be loaded: {error}")
+
+    def _config_for(self, route: str) -> VehiclePredictorConfig:
+        """
+        Resolves a route to the S3 location of its model: the configured challenger,
+        or else a version id of the champion's model file
+        """
+        champion_config = self.prediction_pipeline_config
+        if route == self.challenger:
+            if not self.has_challenger:
+                raise ValueError("No challenger model is configured")
+            return VehiclePredictorConfig(
+                model_file_path=self.model_registry_config.challenger_file_path or champion_config.model_file_path,
+                model_bucket_name=champion_config.model_bucket_name,
+                model_version_id=self.model_registry_config.challenger_version_id,
+            )
+        return VehiclePredictorConfig(model_file_path=champion_config.model_file_path,
+                                      model_bucket_name=champion_config.model_bucket_name,
+                                      model_version_id=route)
+
+    def _load(self, route: str, config: VehiclePredictorConfig) -> Tuple[str, MyModel]:
+        start = time.perf_counter()
+        estimator = Proj1Estimator(bucket_name=config.model_bucket_name, model_path=config.model_file_path,
+                                   version_id=config.model_version_id)
+        model = estimator.load_model()
+        key = estimator.model_version
+        nbytes = estimator.model_nbytes  # The model's arrays are mapped from this file, so it is the resident size
+        load_seconds = time.perf_counter() - start
+
+        with self._lock:
+            self._models[key] = {
+                "model": model,
+                "model_file_path": config.model_file_path,
+                "nbytes": nbytes,
+                "loaded_at": time.time(),
+                "last_used_at": time.time(),
+                "load_seconds": load_seconds,
+            }
+            self._aliases[route] = key
+            self.loads += 1
+            self._evict()
+        logging.info(f"Model version {key} ({config.model_file_path}) loaded for route {route} "
+                     f"in {load_seconds:.3f} seconds, {nbytes} bytes")
+        return key, model
+
+    def _evict(self) -> None:
+        """
+        Drops least recently used versions beyond the count and memory bounds; the newest always stays
+        """
+        config = self.model_registry_config
+        while len(self._models) > 1 and (len(self._models) > config.max_models or
+                                         sum(e["nbytes"] for e in self._models.values()) > config.max_bytes):
+            key, _ = self._models.popitem(last=False)
+            for alias in [alias for alias, target in self._aliases.items() if target == key]:
+                del self._aliases[alias]
+            self.evictions += 1
+            logging.info(f"Model version {key} evicted from the registry")
+
+    def get_stats(self) -> dict:
+        """
+        Returns the resident versions, the traffic split and loading counters
+        """
+        with self._lock:
+            versions = [{"version": key, **{k: v for k, v in entry.items() if k != "model"}}
+                        for key, entry in self._models.items()]
+            aliases = dict(self._aliases)
+        return {
+            "champion": VehicleDataClassifier.get_model_info(),
+            "challenger_configured": self.has_challenger,
+            "challenger_weight": self.model_registry_config.challenger_weight,
+            "shadow_enabled": self.shadow_enabled,
+            "resident_versions": versions,
+            "aliases": aliases,
+            "resident_bytes": sum(version["nbytes"] for version in versions),
+            "max_models": self.model_registry_config.max_models,
+            "max_bytes": self.model_registry_config.max_bytes,
+            "routed": dict(self.routed),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "failed_lookups": self.failed_lookups,
+        }
+
+
+class ShadowScorer:
+    """
+    Scores champion traffic with the challenger in the background and records how often they agree.
+
+    Work runs on its own single thread, never on the inference executor, and is only handed over
+    after the champion result is known, so the champion response never waits for it. When the
+    shadow backlog is full new work is dropped instead of queued.
+    """
+
+    def __init__(self, max_pending: int):
+        """
+        :param max_pending: Shadow scorings allowed to wait before new ones are dropped
+        """
+        try:
+            self.max_pending = max_pending
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+            self._lock = threading.Lock()
+            self._pending = 0
+
+            # Metrics
+            self.submitted = 0
+            self.dropped = 0
+            self.scored = 0
+            self.errors = 0
+            self.rows = 0
+            self.agreeing_rows = 0
+            self.score_total_seconds = 0.0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def submit(self, score_fn: Callable[[], Sequence], champion_predictions: Sequence) -> bool:
+        """
+        Queues score_fn (the challenger's predictions for the same rows) for comparison
+        :return: False when the work was dropped because the backlog is full
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+            self.submitted += 1
+        self._executor.submit(self._score, score_fn, champion_predictions)
+        return True
+
+    def _score(self, score_fn: Callable[[], Sequence], champion_predictions: Sequence) -> None:
+        start = time.perf_counter()
+        try:
+            challenger = np.asarray(score_fn()).astype(int)
+            champion = np.asarray(champion_predictions).astype(int)
+            with self._lock:
+                self.scored += 1
+                self.rows += len(champion)
+                self.agreeing_rows += int(np.sum(challenger == champion))
+                self.score_total_seconds += time.perf_counter() - start
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logging.error(f"Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        """
+        Returns how many shadow scorings ran or were dropped and the champion/challenger agreement rate
+        """
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "scored": self.scored,
+                "errors": self.errors,
+                "rows": self.rows,
+                "agreement_rate": self.agreeing_rows / self.rows if self.rows else None,
+                "avg_score_ms": 1000.0 * self.score_total_seconds / self.scored if self.scored else 0.0,
+            }
+
+
+_process_registry: Optional[ModelRegistry] = None  # Registry of an inference worker process, created on first use
+_process_registry_lock = threading.Lock()
+
+
+def score_with_route(route: str, with_version: bool, score_fn: Callable, *args) -> Tuple[str, object]:
+    """
+    Runs score_fn(*args, model) (or score_fn(*args, model, version key) when with_version is set) with
+    the model version a route resolves to in this process's own ModelRegistry, and returns
+    (version key, result). Process-pool inference workers are handed only the route this way, so a
+    non-champion model is loaded once per worker instead of being pickled along with every call.
+    """
+    global _process_registry
+    if _process_registry is None:
+        with _process_registry_lock:
+            if _process_registry is None:
+                _process_registry = ModelRegistry()
+    model_version, model = _process_registry.get_model(route)
+    if with_version:
+        return model_version, score_fn(*args, model, model_version)
+    return model_version, score_fn(*args, model)
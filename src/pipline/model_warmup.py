@@ -0,0 +1,151 @@
+import sys
+import threading
+import time
+
+import numpy as np
+
+from src.entity.config_entity import ModelWarmupConfig
+from src.entity.feature_layout import MIN_MAX_SCALED, STANDARD_SCALED, FeatureLayout
+from src.exception import MyException
+from src.logger import logging
+from src.pipline.prediction_pipeline import VehicleData, VehicleDataClassifier
+
+
+def synthetic_columns(layout: FeatureLayout, n_rows: int, rng: np.random.Generator) -> dict:
+    """
+    Returns n_rows of plausible raw inputs per input column, drawn from the fitted scaler parameters,
+    so warmup traffic walks through the forest like real rows instead of down a single path
+    """
+    columns = {}
+    for column, kind, offset, scale in zip(layout.output_columns, layout.kind, layout.offset, layout.scale):
+        if kind == STANDARD_SCALED:
+            values = offset + scale * rng.standard_normal(n_rows)
+        elif kind == MIN_MAX_SCALED:
+            values = (rng.uniform(0.0, 1.0, n_rows) - offset) / scale
+        else:
+            values = rng.integers(0, 2, n_rows).astype(np.float64)
+        columns[column] = values
+    for column in layout.input_columns:  # Columns the preprocessing drops still have to be sent
+        columns.setdefault(column, np.zeros(n_rows))
+    return columns
+
+
+class ModelWarmup:
+    """
+    Loads the production model at startup and scores synthetic batches of several sizes through every
+    prediction path (form micro-batches, JSON batches, binary columns) before the app reports ready.
+
+    The first real requests then no longer pay for the S3 download, for first-call allocations or
+    for sklearn and pandas code paths that are slow the first time they run. Runs on its own
+    thread so the app answers liveness probes while it works; a failed model load is retried until
+    it succeeds, and /readyz stays 503 until then.
+    """
+
+    def __init__(self, model_warmup_config: ModelWarmupConfig = ModelWarmupConfig()):
+        """
+        :param model_warmup_config: Warmup batch sizes, rounds per size and retry interval
+        """
+        try:
+            self.model_warmup_config = model_warmup_config
+            self._stop = threading.Event()
+            self._thread: threading.Thread = None
+
+            # Status reported by /readyz
+            self.status = "starting"
+            self.started_at = time.time()
+            self.ready_at: float = None
+            self.load_attempts = 0
+            self.last_error: str = None
+            self.warmup_seconds: float = None
+            self.timings_ms = {}  # path -> batch size -> median milliseconds per call
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self) -> None:
+        """
+        Starts loading and warming up in the background
+        """
+        self._thread = threading.Thread(target=self.run, name="model-warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        """
+        Loads the model (retrying until it succeeds or the app stops) and warms it up
+        """
+        model_predictor = VehicleDataClassifier()
+        while not self._stop.is_set():
+            self.status = "loading"
+            self.load_attempts += 1
+            try:
+                model_predictor.load_model()
+                self.last_error = None
+                break
+            except Exception as e:
+                self.last_error = f"{e}"
+                logging.error(f"Model could not be loaded at startup (attempt {self.load_attempts}), "
+                              f"retrying in {self.model_warmup_config.retry_seconds} seconds: {e}")
+                self._stop.wait(self.model_warmup_config.retry_seconds)
+        if self._stop.is_set():
+            return
+
+        self.status = "warming"
+        start = time.perf_counter()
+        try:
+            self.warm_up(model_predictor)
+        except Exception as e:
+            # A model that fails on synthetic rows can still serve real ones; report it and go ready
+            self.last_error = f"{e}"
+            logging.error(f"Model warmup failed: {e}")
+        self.warmup_seconds = time.perf_counter() - start
+        self.ready_at = time.time()
+        self.status = "ready"
+        logging.info(f"Model version {VehicleDataClassifier.model_version} warmed up in "
+                     f"{self.warmup_seconds:.3f} seconds, ready to serve")
+
+    def warm_up(self, model_predictor: VehicleDataClassifier) -> None:
+        """
+        Scores synthetic batches of every configured size through each prediction path
+        """
+        layout = model_predictor.load_model().get_feature_layout()
+        rng = np.random.default_rng(0)
+        self.timings_ms = {"predict_batch": {}, "predict_records": {}, "predict_columns": {}}
+        for batch_size in self.model_warmup_config.batch_sizes:
+            columns = synthetic_columns(layout, batch_size, rng)
+            records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+            vehicle_data = [VehicleData(**{column: record[column] for column in VehicleData.feature_columns})
+                            for record in records]
+            paths = {
+                "predict_batch": lambda: model_predictor.predict_batch(vehicle_data),
+                "predict_records": lambda: model_predictor.predict_records(records),
+                "predict_columns": lambda: model_predictor.predict_columns(columns),
+            }
+            for path, call in paths.items():
+                timings = []
+                for _ in range(self.model_warmup_config.rounds):
+                    call_start = time.perf_counter()
+                    call()
+                    timings.append(time.perf_counter() - call_start)
+                self.timings_ms[path][batch_size] = round(1000.0 * float(np.median(timings)), 3)
+
+    def get_status(self) -> dict:
+        """
+        Returns readiness, the resident model version, load attempts and warmup timings
+        """
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "model_version": VehicleDataClassifier.model_version,
+            "model_load_seconds": VehicleDataClassifier.model_load_seconds,
+            "load_attempts": self.load_attempts,
+            "last_error": self.last_error,
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_timings_ms": self.timings_ms,
+            "seconds_to_ready": self.ready_at - self.started_at if self.ready_at else None,
+        }
@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Mapping, Optional, Sequence
+
+from src.entity.config_entity import PredictionCacheConfig
+from src.exception import MyException
+from src.logger import logging
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions with a time-to-live, keyed by the canonical feature tuple.
+
+    Entries are namespaced by the version (S3 ETag) of the model that produced them: the first lookup
+    made with a different version drops every entry, so a model swap can never serve stale predictions.
+    """
+
+    def __init__(self, prediction_cache_config: PredictionCacheConfig = PredictionCacheConfig()):
+        """
+        :param prediction_cache_config: Maximum number of entries and their time-to-live
+        """
+        try:
+            self.prediction_cache_config = prediction_cache_config
+            self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+            self._model_version: Optional[str] = None
+            self._lock = threading.Lock()
+
+            # Metrics
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def make_key(record: Mapping, columns: Sequence[str]) -> Optional[tuple]:
+        """
+        Canonicalizes a record into a hashable feature tuple, so that "1", 1 and 1.0 share an entry.
+        Returns None when a value is not numeric; such records are simply not cached.
+        """
+        try:
+            return tuple(float(record[column]) for column in columns)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _switch_version(self, model_version: Optional[str]) -> None:
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+                logging.info(f"Model version changed to {model_version}, dropping {len(self._entries)} cached predictions")
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get(self, model_version: Optional[str], key: Optional[tuple]) -> Any:
+        """
+        Returns the cached prediction for key under model_version, or None on a miss
+        """
+        if key is None:
+            return None
+        with self._lock:
+            self._switch_version(model_version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, model_version: Optional[str], key: Optional[tuple], value: Any) -> None:
+        """
+        Stores a prediction, evicting the least recently used entries beyond the size bound
+        """
+        if key is None or value is None:
+            return
+        with self._lock:
+            self._switch_version(model_version)
+            self._entries[key] = (value, time.monotonic() + self.prediction_cache_config.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.prediction_cache_config.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit, miss and eviction counters of the cache
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_version": self._model_version,
+                "entries": len(self._entries),
+                "max_entries": self.prediction_cache_config.max_entries,
+                "ttl_seconds": self.prediction_cache_config.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -1,12 +1,26 @@
 import sys
+import threading
+import time
+import numpy as np
+from src.constants import PREDICTION_CSV_CHUNK_SIZE
+from src.cloud_storage.model_cache import model_disk_cache
+from src.cloud_storage.s3_metadata import s3_call_counter, s3_metadata_cache
 from src.entity.config_entity import VehiclePredictorConfig
 from src.entity.s3_estimator import Proj1Estimator
+from src.entity.estimator import MyModel
 from src.exception import MyException
 from src.logger import logging
-from pandas import DataFrame
+from src.utils.metrics import metrics_registry, prediction_stage_seconds
+from typing import Iterator
+from pandas import DataFrame, read_csv
 
 
 class VehicleData:
+    # Column order expected by the preprocessing object of MyModel
+    feature_columns = ["Gender", "Age", "Driving_License", "Region_Code", "Previously_Insured",
+                       "Annual_Premium", "Policy_Sales_Channel", "Vintage", "Vehicle_Age_lt_1_Year",
+                       "Vehicle_Age_gt_2_Years", "Vehicle_Damage_Yes"]
+
     def __init__(self,
                 Gender,
                 Age,
@@ -81,7 +95,107 @@ class VehicleData:
         except Exception as e:
             raise MyException(e, sys) from e
 
+class VehicleBatchData:
+    def __init__(self, records):
+        """
+        Vehicle Batch Data constructor
+        Input: many rows of model features, either row-oriented (a list of dicts)
+        or columnar (a dict mapping every feature to a list of values)
+        """
+        try:
+            self.records = records
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_vehicle_input_data_frame(self) -> DataFrame:
+        """
+        This function returns one DataFrame holding every row of the batch, in input order
+        """
+        try:
+            if isinstance(self.records, dict):
+                missing = [col for col in VehicleData.feature_columns if col not in self.records]
+                if missing:
+                    raise ValueError(f"Missing feature columns: {missing}")
+                lengths = {len(self.records[col]) for col in VehicleData.feature_columns}
+                if len(lengths) != 1:
+                    raise ValueError("All feature columns must have the same number of values")
+                return DataFrame({col: self.records[col] for col in VehicleData.feature_columns})
+
+            if isinstance(self.records, list):
+                if len(self.records) == 0:
+                    raise ValueError("No records to score")
+                dataframe = DataFrame.from_records(self.records)
+                missing = [col for col in VehicleData.feature_columns if col not in dataframe.columns]
+                if missing:
+                    raise ValueError(f"Missing feature columns: {missing}")
+                return dataframe[VehicleData.feature_columns]
+
+            raise ValueError("Records must be a list of rows or a dict of columns")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+class VehicleRawData:
+    # Category values turned into the dummy columns produced by pd.get_dummies(drop_first=True) at training time
+    vehicle_age_lt_1_year = "< 1 Year"
+    vehicle_age_gt_2_years = "> 2 Years"
+    vehicle_damage_yes = "Yes"
+
+    def __init__(self, dataframe: DataFrame):
+        """
+        Vehicle Raw Data constructor
+        Input: rows in the raw collection schema of config/schema.yaml (Gender as Male/Female,
+        Vehicle_Age and Vehicle_Damage as categories)
+        """
+        try:
+            self.dataframe = dataframe
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_vehicle_input_data_frame(self) -> DataFrame:
+        """
+        Applies the feature preparation of DataTransformation (gender mapping, dummy columns, renaming)
+        and returns the model features in order.
+        Dummy columns are derived from the category values rather than from pd.get_dummies,
+        so every chunk of a file gets the same columns whatever categories it happens to contain.
+        """
+        try:
+            df = self.dataframe
+            gender = df["Gender"].map({"Female": 0, "Male": 1})
+            if gender.isna().any():
+                raise ValueError("Gender must be either 'Male' or 'Female'")
+
+            features = DataFrame({
+                "Gender": gender.astype(int),
+                "Age": df["Age"],
+                "Driving_License": df["Driving_License"],
+                "Region_Code": df["Region_Code"],
+                "Previously_Insured": df["Previously_Insured"],
+                "Annual_Premium": df["Annual_Premium"],
+                "Policy_Sales_Channel": df["Policy_Sales_Channel"],
+                "Vintage": df["Vintage"],
+                "Vehicle_Age_lt_1_Year": (df["Vehicle_Age"] == self.vehicle_age_lt_1_year).astype(int),
+                "Vehicle_Age_gt_2_Years": (df["Vehicle_Age"] == self.vehicle_age_gt_2_years).astype(int),
+                "Vehicle_Damage_Yes": (df["Vehicle_Damage"] == self.vehicle_damage_yes).astype(int),
+            })
+            return features[VehicleData.feature_columns]
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
 class VehicleDataClassifier:
+    """
+    Scores vehicle data with the production model.
+    The model is held once per process (like MongoDBClient.client and S3Client.s3_client),
+    so every classifier instance shares the same resident MyModel instead of downloading it again.
+    """
+
+    loaded_model: MyModel = None  # Process-wide model shared by all VehicleDataClassifier objects
+    model_version: str = None  # ETag of the S3 object the resident model was loaded from
+    model_loaded_at: float = None  # Unix timestamp of the moment the model became resident
+    model_load_seconds: float = None  # Time taken to download and unpickle the model
+    _model_lock = threading.Lock()  # Single-flight guard so concurrent first requests load the model once
+
     def __init__(self,prediction_pipeline_config: VehiclePredictorConfig = VehiclePredictorConfig(),) -> None:
         """
         :param prediction_pipeline_config: Configuration for prediction the value
@@ -91,6 +205,57 @@ class VehicleDataClassifier:
         except Exception as e:
             raise MyException(e, sys)
 
+    def load_model(self, force_reload: bool = False) -> MyModel:
+        """
+        Loads the production model from S3 into the process-wide holder if it is not resident yet.
+        Only one caller downloads the model; the others wait on the lock and reuse its result.
+        :param force_reload: Download the model again even if one is already resident
+        :return: The resident MyModel
+        """
+        try:
+            if VehicleDataClassifier.loaded_model is not None and not force_reload:
+                return VehicleDataClassifier.loaded_model
+
+            with VehicleDataClassifier._model_lock:
+                if VehicleDataClassifier.loaded_model is not None and not force_reload:
+                    return VehicleDataClassifier.loaded_model
+
+                logging.info("Loading production model into the process-wide model holder")
+                start = time.perf_counter()
+                estimator = Proj1Estimator(
+                    bucket_name=self.prediction_pipeline_config.model_bucket_name,
+                    model_path=self.prediction_pipeline_config.model_file_path,
+                    version_id=self.prediction_pipeline_config.model_version_id,
+                )
+                model = estimator.load_model()
+
+                VehicleDataClassifier.model_load_seconds = time.perf_counter() - start
+                VehicleDataClassifier.model_loaded_at = time.time()
+                VehicleDataClassifier.model_version = estimator.model_version
+                VehicleDataClassifier.loaded_model = model
+                logging.info(f"Model version {estimator.model_version} loaded in "
+                             f"{VehicleDataClassifier.model_load_seconds:.3f} seconds")
+                return model
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def get_model_info(cls) -> dict:
+        """
+        Returns the version and load timings of the resident model, the model disk cache and
+        S3 metadata cache statistics and the S3 requests sent so far
+        """
+        return {
+            "model_loaded": cls.loaded_model is not None,
+            "model_version": cls.model_version,
+            "model_loaded_at": cls.model_loaded_at,
+            "model_load_seconds": cls.model_load_seconds,
+            "model_cache": model_disk_cache.get_stats(),
+            "s3_metadata_cache": s3_metadata_cache.get_stats(),
+            "s3_requests": s3_call_counter.snapshot(),
+        }
+
     def predict(self, dataframe) -> str:
         """
         This is the method of VehicleDataClassifier
@@ -98,13 +263,123 @@ class VehicleDataClassifier:
         """
         try:
             logging.info("Entered predict method of VehicleDataClassifier class")
-            model = Proj1Estimator(
-                bucket_name=self.prediction_pipeline_config.model_bucket_name,
-                model_path=self.prediction_pipeline_config.model_file_path,
-            )
+            model = self.load_model()
             result =  model.predict(dataframe)
             
             return result
         
         except Exception as e:
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+    def predict_batch(self, vehicle_data_list: list, model: MyModel = None) -> list:
+        """
+        Scores many VehicleData objects with a single model call
+        :param model: Model version to score with (see ModelRegistry); the resident production model when None
+        Returns: One prediction per VehicleData object, in input order
+        """
+        try:
+            # Request values are written straight into a float64 buffer; no dict of lists or DataFrame
+            model = model if model is not None else self.load_model()
+            layout = model.get_feature_layout()
+            with prediction_stage_seconds.labels("feature_buffer").time():
+                buffer = layout.new_buffer(len(vehicle_data_list))
+                for row, vehicle_data in enumerate(vehicle_data_list):
+                    layout.fill_row(buffer, row, vars(vehicle_data))
+            with prediction_stage_seconds.labels("transform").time():
+                transformed_feature = layout.transform(buffer)
+            with prediction_stage_seconds.labels("forest_predict").time():
+                return list(model.get_inference_engine().predict(transformed_feature))
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def predict_records(self, records, model: MyModel = None):
+        """
+        Builds one DataFrame from row-oriented or columnar records and scores it in one call
+        :param model: Model version to score with (see ModelRegistry); the resident production model when None
+        Returns: Predicted labels and the probability of the positive class, in input order
+        """
+        try:
+            dataframe = VehicleBatchData(records).get_vehicle_input_data_frame()
+            return self.predict_with_proba(dataframe, model)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def predict_columns(self, columns, model: MyModel = None):
+        """
+        Scores columnar inputs (feature name -> 1-d NumPy array, e.g. decoded by src.pipline.binary_protocol)
+        in one call; the columns go straight into the feature matrix, without a DataFrame
+        :param model: Model version to score with (see ModelRegistry); the resident production model when None
+        Returns: Predicted labels and the probability of the positive class, in input order
+        """
+        try:
+            model = model if model is not None else self.load_model()
+            layout = model.get_feature_layout()
+            with prediction_stage_seconds.labels("transform").time():
+                transformed_feature = layout.transform_columns(columns)
+            with prediction_stage_seconds.labels("forest_predict").time():
+                engine = model.get_inference_engine()
+                probabilities = engine.predict_proba(transformed_feature)
+                predictions = engine.classes_.take(np.argmax(probabilities, axis=1), axis=0)
+            positive_class = list(engine.classes_).index(1)
+            return predictions, probabilities[:, positive_class]
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def read_csv_chunks(self, file_obj, chunk_size: int = PREDICTION_CSV_CHUNK_SIZE) -> Iterator[DataFrame]:
+        """
+        Reads a raw-schema CSV lazily in chunks of chunk_size rows, so memory use does not grow with the file size
+        """
+        try:
+            logging.info("Entered read_csv_chunks method of VehicleDataClassifier class")
+            return read_csv(file_obj, chunksize=chunk_size, na_values="na")
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def predict_csv_chunk(self, chunk: DataFrame, header: bool) -> str:
+        """
+        Scores one chunk of a raw-schema CSV and returns its predictions as CSV text
+        (with the id column when the upload has one)
+        :param header: Whether to start the text with the header line, i.e. for the first chunk
+        """
+        try:
+            if len(chunk) == 0:
+                # A header-only upload gets a header-only result; the scalers reject empty input
+                predictions, probabilities = np.empty(0, dtype=int), np.empty(0)
+            else:
+                features = VehicleRawData(chunk).get_vehicle_input_data_frame()
+                predictions, probabilities = self.predict_with_proba(features)
+
+            result = DataFrame({"prediction": predictions.astype(int), "probability": probabilities})
+            if "id" in chunk.columns:
+                result.insert(0, "id", chunk["id"].to_numpy())
+            return result.to_csv(index=False, header=header)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def predict_with_proba(self, dataframe: DataFrame, model: MyModel = None):
+        """
+        Scores every row of the dataframe in one vectorized call
+        :param model: Model version to score with (see ModelRegistry); the resident production model when None
+        Returns: Predicted labels and the probability of the positive class, in input order
+        """
+        try:
+            logging.info("Entered predict_with_proba method of VehicleDataClassifier class")
+            model = model if model is not None else self.load_model()
+            predictions, probabilities = model.predict_with_proba(dataframe)
+            positive_class = list(model.trained_model_object.classes_).index(1)
+            return predictions, probabilities[:, positive_class]
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+
+# Resident model metrics, read from the process-wide holder whenever /metrics is scraped
+metrics_registry.gauge("model_load_seconds", "Time taken to download and unpickle the resident model",
+                       value_fn=lambda: VehicleDataClassifier.model_load_seconds).labels()
+metrics_registry.gauge("model_loaded", "1 when a model is resident in this process, 0 otherwise",
+                       value_fn=lambda: float(VehicleDataClassifier.loaded_model is not None)).labels()
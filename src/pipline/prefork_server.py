@@ -0,0 +1,137 @@
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+import uvicorn
+
+from src.constants import APP_HOST, APP_PORT, APP_SOCKET_BACKLOG, APP_WORKERS
+from src.exception import MyException
+from src.logger import flush_logs, logging
+from src.pipline.prediction_pipeline import VehicleDataClassifier
+
+
+class PreforkServer:
+    """
+    Serves the FastAPI app from several worker processes that share one copy of the model.
+
+    The parent process downloads and unpickles MyModel once, binds the listening socket and then
+    forks the workers. Every worker inherits the resident model: the forest and feature layout
+    arrays are never written after loading, so their pages stay shared copy-on-write and each extra
+    worker only adds its own interpreter state, not another copy of the model. gc.freeze() moves the
+    loaded objects out of the collector's generations, so garbage collections in the workers do not
+    touch (and thereby copy) the pages holding them. The kernel spreads connections over the workers,
+    which all accept on the inherited socket. Workers that die are replaced.
+    """
+
+    def __init__(self, app, host: str = APP_HOST, port: int = APP_PORT, workers: int = APP_WORKERS):
+        """
+        :param app: ASGI application served by every worker
+        :param host: Interface to bind
+        :param port: Port to bind
+        :param workers: Number of worker processes to fork
+        """
+        try:
+            self.app = app
+            self.host = host
+            self.port = port
+            self.workers = max(1, int(workers))
+            self._socket: socket.socket = None
+            self._children: Dict[int, int] = {}  # pid -> worker number
+            self._stopping = False
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _preload(self) -> None:
+        """
+        Loads the model in the parent so the workers inherit it instead of downloading it again
+        """
+        try:
+            VehicleDataClassifier().load_model()
+        except Exception as e:
+            # Same behaviour as a single-process start: each worker retries the load on its first request
+            logging.error(f"Model could not be preloaded, workers will load it themselves: {e}")
+        gc.collect()
+        gc.freeze()
+
+    def _bind(self) -> None:
+        self._socket = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen(APP_SOCKET_BACKLOG)
+        self._socket.set_inheritable(True)
+
+    def _spawn(self, worker_number: int) -> None:
+        # Stop signals are held back during the fork: the parent's handler must never run in the child,
+        # and in the parent it must see the new worker in _children
+        stop_signals = {signal.SIGTERM, signal.SIGINT}
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        pid = os.fork()
+        if pid == 0:
+            # Worker process: restore default signal handling and serve until told to stop
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            exit_code = 0
+            try:
+                config = uvicorn.Config(self.app, host=self.host, port=self.port)
+                uvicorn.Server(config).run(sockets=[self._socket])
+            except BaseException as e:
+                logging.error(f"Worker {worker_number} stopped with an error: {e}")
+                exit_code = 1
+            finally:
+                # os._exit skips atexit, so write out the queued log records first
+                flush_logs()
+                os._exit(exit_code)
+
+        self._children[pid] = worker_number
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+        logging.info(f"Started worker {worker_number} in process {pid}")
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        """
+        Preloads the model, forks the workers and supervises them until SIGTERM or SIGINT
+        """
+        try:
+            if not hasattr(os, "fork"):
+                raise RuntimeError("Multi-worker serving needs os.fork; set APP_WORKERS=1 on this platform")
+
+            self._preload()
+            self._bind()
+            logging.info(f"Serving on {self.host}:{self.port} with {self.workers} forked workers")
+
+            signal.signal(signal.SIGTERM, self._handle_stop)
+            signal.signal(signal.SIGINT, self._handle_stop)
+            for worker_number in range(self.workers):
+                self._spawn(worker_number)
+
+            while self._children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                worker_number = self._children.pop(pid, None)
+                if worker_number is None or self._stopping:
+                    continue
+                logging.error(f"Worker {worker_number} (process {pid}) exited with status {status}, restarting it")
+                time.sleep(1.0)  # Avoid a tight restart loop when workers crash at startup
+                self._spawn(worker_number)
+
+            self._socket.close()
+            logging.info("All workers stopped")
+
+        except Exception as e:
+            raise MyException(e, sys) from e
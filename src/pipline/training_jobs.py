@@ -0,0 +1,300 @@
+import fcntl
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.constants import (ARTIFACT_DIR, TRAINING_JOB_DIR_NAME, TRAINING_JOB_HISTORY_SIZE, TRAINING_JOB_LOCK_WAIT_SECONDS,
+                           TRAINING_JOB_SHUTDOWN_TIMEOUT_SECONDS)
+from src.exception import MyException
+from src.logger import logging
+
+
+def _run_training_job(job_id: str, events) -> None:
+    """
+    Entry point of the training worker process.
+    Runs the complete training pipeline and reports every stage transition on the events queue.
+    """
+    # Imported here so that the training-only dependencies are loaded in the worker process only
+    from src.pipline.training_pipeline import TrainPipeline
+
+    def stage_callback(stage: str, event: str, message: str = None) -> None:
+        events.put((job_id, stage, event, time.time(), message))
+
+    events.put((job_id, None, "running", time.time(), None))
+    try:
+        TrainPipeline(stage_callback=stage_callback).run_pipeline()
+        events.put((job_id, None, "succeeded", time.time(), None))
+    except Exception as e:
+        events.put((job_id, None, "failed", time.time(), str(e)))
+
+
+class TrainingJobRunner:
+    """
+    Runs the training pipeline as a background job in a separate worker process.
+
+    Only one job runs at a time: a request that arrives while a job is queued or running is
+    coalesced onto that job instead of starting a second pipeline that would race on the
+    artifact directory. Worker processes are spawned, so each job imports the pipeline
+    configuration afresh and gets its own timestamped artifact directory. They are not daemonic,
+    so training steps may start processes of their own (multiprocessing, joblib with n_jobs > 1);
+    shutdown() ends a job that is still running.
+
+    Under the prefork server every app worker has its own runner, so the single-flight guard is an
+    exclusive flock on a lock file in job_dir, held by the worker whose job is active and holding that
+    job's id. The kernel drops the lock if the worker dies, so a crash never leaves it stale.
+    Job records are written to job_dir as JSON, so any worker can answer a status query.
+    """
+
+    def __init__(self, history_size: int = TRAINING_JOB_HISTORY_SIZE,
+                 job_dir: str = os.path.join(ARTIFACT_DIR, TRAINING_JOB_DIR_NAME)):
+        """
+        :param history_size: Number of finished jobs kept for status queries
+        :param job_dir: Folder for the lock and status files, shared by all app workers
+        """
+        try:
+            self.history_size = history_size
+            self.job_dir = job_dir
+            self._lock_path = os.path.join(job_dir, "active.lock")
+            self._lock_fd: Optional[int] = None  # Open lock file while this process holds the training lock
+            self._context = multiprocessing.get_context("spawn")
+            self._events = None
+            self._lock = threading.Lock()
+            self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+            self._active_job_id: Optional[str] = None
+            self._event_reader: Optional[threading.Thread] = None
+            self._process = None  # Worker process of the active job
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def submit(self) -> Tuple[dict, bool]:
+        """
+        Starts a training job, or returns the job that is already queued or running
+        :return: The job status and whether the request was coalesced onto an existing job
+        """
+        try:
+            with self._lock:
+                if self._active_job_id is not None:
+                    logging.info(f"Training job {self._active_job_id} already active, coalescing request")
+                    return self._snapshot(self._active_job_id), True
+
+                os.makedirs(self.job_dir, exist_ok=True)
+                deadline = time.monotonic() + TRAINING_JOB_LOCK_WAIT_SECONDS
+                while not self._acquire_job_lock():
+                    # Another worker holds the lock; its job id appears in the lock file right after
+                    job = self._read_job(self._read_active_job_id())
+                    if job is not None:
+                        logging.info(f"Training job {job['job_id']} active in another worker, coalescing request")
+                        return job, True
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("Timed out waiting for the training job of another worker to start")
+                    time.sleep(0.01)
+
+                try:
+                    return self._start_job(), False
+                except Exception:
+                    if self._active_job_id is not None:
+                        self._jobs.pop(self._active_job_id, None)
+                        self._active_job_id = None
+                    self._release_job_lock()
+                    raise
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _start_job(self) -> dict:
+        """
+        Starts the worker process of a new job; the caller holds the training lock
+        """
+        self._ensure_event_reader()
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_seconds": None,
+            "error": None,
+            "stages": OrderedDict(),
+        }
+        self._active_job_id = job_id
+        self._write_job(job_id)
+        self._trim_history()
+        os.ftruncate(self._lock_fd, 0)
+        os.pwrite(self._lock_fd, job_id.encode(), 0)
+
+        process = self._context.Process(target=_run_training_job, args=(job_id, self._events),
+                                        name=f"training-{job_id[:8]}")
+        process.start()
+        self._process = process
+        threading.Thread(target=self._watch_process, args=(job_id, process), daemon=True).start()
+        logging.info(f"Training job {job_id} started in process {process.pid}")
+        return self._snapshot(job_id)
+
+    def shutdown(self, timeout: float = TRAINING_JOB_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Terminates the training process that is still running, if any, and waits for it to end,
+        so that the server does not wait for a whole pipeline run when it exits
+        """
+        with self._lock:
+            process = self._process
+        if process is None or not process.is_alive():
+            return
+        logging.info(f"Terminating training process {process.pid}")
+        process.terminate()
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """
+        Returns the stage-by-stage status of a job, or None if the job is unknown
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                return self._snapshot(job_id)
+        # Jobs started by other workers are known from their status files only
+        return self._read_job(job_id)
+
+    def _snapshot(self, job_id: str) -> dict:
+        job = dict(self._jobs[job_id])
+        job["stages"] = [dict(stage, stage=name) for name, stage in self._jobs[job_id]["stages"].items()]
+        return job
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > self.history_size:
+            oldest_id = next(iter(self._jobs))
+            if oldest_id == self._active_job_id:
+                break
+            self._jobs.popitem(last=False)
+
+        # Only the lock holder trims, so status files of every worker's jobs are trimmed in one place
+        paths = [os.path.join(self.job_dir, name) for name in os.listdir(self.job_dir) if name.endswith(".json")]
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:max(0, len(paths) - self.history_size)]:
+            os.remove(path)
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def _write_job(self, job_id: str) -> None:
+        """
+        Publishes the job record for the other workers; replaced atomically so readers never see a partial file
+        """
+        path = self._job_path(job_id)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self._snapshot(job_id), file)
+        os.replace(temporary_path, path)
+
+    def _read_job(self, job_id: Optional[str]) -> Optional[dict]:
+        if not job_id or not job_id.isalnum():
+            return None
+        try:
+            with open(self._job_path(job_id)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def _acquire_job_lock(self) -> bool:
+        """
+        Takes the training lock shared by all workers without waiting; False if another worker holds it
+        """
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_job_lock(self) -> None:
+        if self._lock_fd is None:
+            return
+        os.ftruncate(self._lock_fd, 0)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+    def _read_active_job_id(self) -> Optional[str]:
+        try:
+            with open(self._lock_path) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _ensure_event_reader(self) -> None:
+        if self._event_reader is None:
+            self._events = self._context.Queue()
+            self._event_reader = threading.Thread(target=self._read_events, name="training-events", daemon=True)
+            self._event_reader.start()
+
+    def _read_events(self) -> None:
+        """
+        Applies the stage events sent by worker processes to the job records
+        """
+        while True:
+            job_id, stage, event, timestamp, message = self._events.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                if stage is None:
+                    self._apply_job_event(job, event, timestamp, message)
+                    continue
+
+                record = job["stages"].setdefault(stage, {"status": None, "started_at": None,
+                                                          "finished_at": None, "duration_seconds": None,
+                                                          "message": None})
+                record["status"] = event
+                record["message"] = message
+                if event == "started":
+                    record["started_at"] = timestamp
+                    logging.info(f"Training job {job_id}: {stage} started")
+                else:
+                    record["finished_at"] = timestamp
+                    record["duration_seconds"] = timestamp - record["started_at"]
+                    logging.info(f"Training job {job_id}: {stage} completed in {record['duration_seconds']:.1f}s")
+                self._write_job(job_id)
+
+    def _apply_job_event(self, job: dict, event: str, timestamp: float, message: Optional[str]) -> None:
+        if event == "running":
+            job["status"] = "running"
+            job["started_at"] = timestamp
+            self._write_job(job["job_id"])
+            return
+        if job["finished_at"] is not None:
+            return
+        job["status"] = event
+        job["error"] = message
+        job["finished_at"] = timestamp
+        job["duration_seconds"] = timestamp - (job["started_at"] or job["submitted_at"])
+        for record in job["stages"].values():
+            if record["status"] == "started":
+                record["status"] = event
+        self._write_job(job["job_id"])
+        if self._active_job_id == job["job_id"]:
+            self._active_job_id = None
+            self._release_job_lock()
+        logging.info(f"Training job {job['job_id']} {event}")
+
+    def _watch_process(self, job_id: str, process) -> None:
+        """
+        Marks the job as failed if its worker process dies without reporting a result
+        """
+        process.join()
+        if process.exitcode == 0:
+            # A clean exit means the final event was flushed to the queue before the process ended
+            return
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["finished_at"] is None:
+                self._apply_job_event(job, "failed", time.time(),
+                                      f"Training process exited with code {process.exitcode}")
@@ -2,6 +2,7 @@
 import sys
 from src.exception import MyException
 from src.logger import logging
+from src.cloud_storage.s3_metadata import s3_call_counter
 
 from src.components.data_ingestion import DataIngestion
 from src.components.data_validation import DataValidation
@@ -27,7 +28,12 @@ from src.entity.artifact_entity import (DataIngestionArtifact,
 
 
 class TrainPipeline:  #Defines a class named TrainPipeline for handling the training pipeline.
-    def __init__(self):   #Initializes an instance of the TrainPipeline class.
+    def __init__(self, stage_callback=None):   #Initializes an instance of the TrainPipeline class.
+        """
+        :param stage_callback: Optional function called as stage_callback(stage, event, message)
+                               when a pipeline stage is "started" or "completed"
+        """
+        self.stage_callback = stage_callback
         self.data_ingestion_config = DataIngestionConfig()  #	Creates an instance of DataIngestionConfig to store data ingestion configurations.
         self.data_validation_config = DataValidationConfig()
         self.data_transformation_config = DataTransformationConfig()
@@ -127,29 +133,51 @@ class TrainPipeline:  #Defines a class named TrainPipeline for handling the trai
 
 
 
+    def _notify(self, stage: str, event: str, message: str = None) -> None:
+        """
+        Reports the progress of a pipeline stage to the stage callback, if one was given
+        """
+        if self.stage_callback is not None:
+            self.stage_callback(stage, event, message)
+
         #This pipeline is for exceuting the code 
     def run_pipeline(self, ) -> None:  #Defines the run_pipeline method, which runs the entire training pipeline. It doesn't return anything (None).
             """
             This method of TrainPipeline class is responsible for running complete pipeline
             """
+            s3_requests_before = s3_call_counter.snapshot()
             try:
+                self._notify("data_ingestion", "started")
                 data_ingestion_artifact = self.start_data_ingestion()  #Calls start_data_ingestion() to fetch and prepare train/test datasets.
+                self._notify("data_ingestion", "completed")
 
+                self._notify("data_validation", "started")
                 data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)  #Calls start_data_validation() to check data quality and integrity.
+                self._notify("data_validation", "completed", data_validation_artifact.message)
 
+                self._notify("data_transformation", "started")
                 data_transformation_artifact = self.start_data_transformation(
                     data_ingestion_artifact=data_ingestion_artifact, data_validation_artifact=data_validation_artifact)  #Calls start_data_transformation() to preprocess and transform data.
+                self._notify("data_transformation", "completed")
 
+                self._notify("model_trainer", "started")
                 model_trainer_artifact = self.start_model_trainer(data_transformation_artifact=data_transformation_artifact) #Calls start_model_trainer() to train a machine learning model.
+                self._notify("model_trainer", "completed")
 
+                self._notify("model_evaluation", "started")
                 model_evaluation_artifact = self.start_model_evaluation(data_ingestion_artifact=data_ingestion_artifact,
                                                                         model_trainer_artifact=model_trainer_artifact)
                 if not model_evaluation_artifact.is_model_accepted:
                     logging.info(f"Model not accepted.")
+                    self._notify("model_evaluation", "completed", "Model not accepted")
                     return None
+                self._notify("model_evaluation", "completed", "Model accepted")
+
+                self._notify("model_pusher", "started")
                 model_pusher_artifact = self.start_model_pusher(model_evaluation_artifact=model_evaluation_artifact)
+                self._notify("model_pusher", "completed")
                 
             except Exception as e:
                 raise MyException(e, sys)
-            
-
+            finally:
+                logging.info(f"S3 requests sent by this pipeline run: {s3_call_counter.since(s3_requests_before)}")
@@ -87,3 +87,34 @@ def save_object(file_path: str, obj: object) -> None:
     except Exception as e:
         raise MyException(e, sys)  # Raises custom exception if an error occurs
 
+
+def save_model_object(file_path: str, obj: object) -> None:
+    """
+    Serializes and saves a model with joblib, which writes every NumPy array as raw aligned bytes
+    so that load_model_object can memory-map them instead of reading them into memory
+    """
+    import joblib  # Imported on first use, it is only needed when a model is saved or loaded
+
+    logging.info("Entered the save_model_object method of utils")
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Creates directory if not exist
+        joblib.dump(obj, file_path)  # Uncompressed, so the arrays can be memory-mapped
+        logging.info("Exited the save_model_object method of utils")
+    except Exception as e:
+        raise MyException(e, sys)  # Raises custom exception if an error occurs
+
+
+def load_model_object(file_path: str, mmap_mode: str = None) -> object:
+    """
+    Loads a model saved by save_model_object. With mmap_mode "r" its NumPy arrays (the compiled forest's
+    node arrays, the feature layout) stay in the file and are paged in on use, so loading does not need
+    a second copy of the model in memory and processes loading the same file share its pages.
+    Plain pickle and dill files (models saved before) load as well, without memory mapping.
+    """
+    import joblib
+
+    try:
+        return joblib.load(file_path, mmap_mode=mmap_mode)
+    except Exception as e:
+        raise MyException(e, sys)  # Raises custom exception if an error occurs
+
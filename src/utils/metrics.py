@@ -0,0 +1,253 @@
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class _ShardOwner:
+    """
+    Held in thread-local storage only; it is released when its thread ends, which retires the shard
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+class _ShardedValues:
+    """
+    A fixed-size vector of float slots with one private copy per thread.
+
+    Each thread only ever writes its own shard, so updates need no lock and never contend;
+    the lock is taken once per thread (to register its shard), when a thread ends and when the shards
+    are summed for a scrape. When a thread ends its shard is added to a base total and dropped, so
+    totals never go backwards and short-lived threads (pool workers, S3 transfer threads) do not
+    leave shards behind.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._base = [0.0] * size  # Totals of the threads that have ended
+        self._shards: List[List[float]] = []
+        self._lock = threading.RLock()  # Reentrant: a thread may end (and retire its shard) during a scrape
+
+    def shard(self) -> List[float]:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = [0.0] * self._size
+            owner = _ShardOwner()
+            with self._lock:
+                self._shards.append(values)
+            # Thread-local storage is cleared when the thread ends, which releases the owner
+            weakref.finalize(owner, self._retire, values)
+            self._local.owner = owner
+            self._local.values = values
+        return values
+
+    def _retire(self, values: List[float]) -> None:
+        with self._lock:
+            self._shards = [shard for shard in self._shards if shard is not values]
+            self._base = [total + value for total, value in zip(self._base, values)]
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards, base = self._shards, self._base
+        return [base[i] + sum(shard[i] for shard in shards) for i in range(self._size)]
+
+
+class Counter:
+    """
+    Monotonic counter (errors, requests)
+    """
+
+    def __init__(self):
+        self._values = _ShardedValues(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+
+class Gauge:
+    """
+    Value that goes up and down (in-flight requests), or is read from a callback at scrape time
+    """
+
+    def __init__(self, value_fn: Optional[Callable[[], Optional[float]]] = None):
+        """
+        :param value_fn: Returns the current value; when given, inc/dec are not used
+        """
+        self._values = _ShardedValues(1)
+        self._value_fn = value_fn
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] -= amount
+
+    def value(self) -> Optional[float]:
+        if self._value_fn is not None:
+            return self._value_fn()
+        return self._values.totals()[0]
+
+
+class Histogram:
+    """
+    Latency histogram with cumulative buckets, as exposed by Prometheus
+    """
+
+    # Upper bounds of the buckets in seconds, from 100 microseconds to 10 seconds
+    default_buckets = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                       0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Sequence[float] = default_buckets):
+        self.buckets = tuple(buckets)
+        # One slot per bucket, one for +Inf and one for the running sum
+        self._values = _ShardedValues(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._values.shard()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """
+        Observes the wall-clock duration of the with block
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """
+        Returns the cumulative bucket counts (including +Inf), the sum and the count of observations
+        """
+        totals = self._values.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+class MetricFamily:
+    """
+    A named metric with optional labels; every distinct label value combination gets its own child
+    """
+
+    def __init__(self, name: str, documentation: str, metric_type: str, labelnames: Sequence[str],
+                 child_factory: Callable[[], object]):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self._child_factory = child_factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *labelvalues: str):
+        """
+        Returns the child for the given label values, creating it on first use
+        """
+        child = self._children.get(labelvalues)
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+            with self._lock:
+                child = self._children.setdefault(labelvalues, self._child_factory())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class MetricsRegistry:
+    """
+    Holds every metric of the process and renders them in the Prometheus text exposition format
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, documentation: str, metric_type: str, labelnames: Sequence[str],
+                  child_factory: Callable[[], object]) -> MetricFamily:
+        with self._lock:
+            if name in self._families:
+                raise ValueError(f"Metric {name} is already registered")
+            family = MetricFamily(name, documentation, metric_type, labelnames, child_factory)
+            self._families[name] = family
+            return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(name, documentation, "counter", labelnames, Counter)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              value_fn: Optional[Callable[[], Optional[float]]] = None) -> MetricFamily:
+        return self._register(name, documentation, "gauge", labelnames, lambda: Gauge(value_fn))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = Histogram.default_buckets) -> MetricFamily:
+        return self._register(name, documentation, "histogram", labelnames, lambda: Histogram(buckets))
+
+    @staticmethod
+    def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            families = list(self._families.values())
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.metric_type}")
+            for labelvalues, child in family.children():
+                if isinstance(child, Histogram):
+                    cumulative, total, count = child.snapshot()
+                    for bound, bucket_count in zip(list(child.buckets) + ["+Inf"], cumulative):
+                        labels = self._format_labels(family.labelnames, labelvalues, f'le="{bound}"')
+                        lines.append(f"{family.name}_bucket{labels} {bucket_count:g}")
+                    labels = self._format_labels(family.labelnames, labelvalues)
+                    lines.append(f"{family.name}_sum{labels} {total:.9g}")
+                    lines.append(f"{family.name}_count{labels} {count:g}")
+                else:
+                    value = child.value()
+                    if value is None:
+                        continue
+                    labels = self._format_labels(family.labelnames, labelvalues)
+                    lines.append(f"{family.name}{labels} {value:.9g}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry scraped by the /metrics endpoint
+metrics_registry = MetricsRegistry()
+
+prediction_stage_seconds = metrics_registry.histogram(
+    "prediction_stage_seconds",
+    "Time spent in each stage of the form prediction path. Feature buffer, transform and "
+    "forest predict are observed once per micro-batch, the other stages once per request.",
+    labelnames=("stage",))
+
+http_requests_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight", "Requests currently being handled").labels()
+
+http_request_seconds = metrics_registry.histogram(
+    "http_request_seconds", "End-to-end request latency by route", labelnames=("route", "method"))
+
+http_request_errors_total = metrics_registry.counter(
+    "http_request_errors_total", "Requests that failed with an error, by route", labelnames=("route",))
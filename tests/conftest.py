@@ -0,0 +1,129 @@
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.load_harness import free_port
+from benchmarks.synthetic_model import build_model
+from src.cloud_storage.model_cache import model_disk_cache
+from src.cloud_storage.s3_metadata import s3_metadata_cache
+from src.configuration.aws_connection import S3Client
+from src.constants import (AWS_ACCESS_KEY_ID_ENV_KEY, AWS_S3_ENDPOINT_URL_ENV_KEY, AWS_SECRET_ACCESS_KEY_ENV_KEY,
+                           MODEL_BUCKET_NAME, MODEL_FILE_NAME, REGION_NAME)
+from src.pipline.prediction_pipeline import VehicleDataClassifier
+from src.utils.main_utils import save_model_object
+
+
+def raw_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns rows in the raw collection schema of config/schema.yaml
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(1, n_rows + 1),
+        "Gender": rng.choice(["Male", "Female"], n_rows),
+        "Age": rng.integers(20, 80, n_rows),
+        "Driving_License": 1,
+        "Region_Code": rng.integers(0, 50, n_rows).astype(np.float64),
+        "Previously_Insured": rng.integers(0, 2, n_rows),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], n_rows),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], n_rows),
+        "Annual_Premium": np.round(rng.uniform(2000, 60000, n_rows), 2),
+        "Policy_Sales_Channel": rng.integers(1, 160, n_rows).astype(np.float64),
+        "Vintage": rng.integers(10, 300, n_rows),
+    })
+
+
+@pytest.fixture
+def make_raw_frame():
+    return raw_frame
+
+
+@pytest.fixture(scope="session")
+def synthetic_model():
+    return build_model(n_rows=1000, n_estimators=10)
+
+
+@pytest.fixture
+def resident_model(synthetic_model):
+    """
+    Makes the synthetic model the process-wide production model for the duration of a test
+    """
+    previous = VehicleDataClassifier.loaded_model, VehicleDataClassifier.model_version
+    VehicleDataClassifier.loaded_model, VehicleDataClassifier.model_version = synthetic_model, '"test-etag"'
+    yield synthetic_model
+    VehicleDataClassifier.loaded_model, VehicleDataClassifier.model_version = previous
+
+
+@pytest.fixture
+def app_client(resident_model):
+    """
+    Client for the FastAPI app with the request-path state of the lifespan (no S3 warmup,
+    no training runner), so routes can be called against the synthetic model
+    """
+    from app import app
+    from src.pipline.admission_controller import AdmissionController
+    from src.pipline.inference_executor import InferenceExecutor
+    from src.pipline.model_registry import ModelRegistry
+    from src.pipline.prediction_cache import PredictionCache
+
+    app.state.inference_executor = InferenceExecutor()
+    app.state.inference_executor.start()
+    app.state.admission_controller = AdmissionController()
+    app.state.prediction_cache = PredictionCache()
+    app.state.model_registry = ModelRegistry()
+    yield TestClient(app)
+    app.state.inference_executor.shutdown()
+
+
+@pytest.fixture(scope="session")
+def moto_endpoint_url():
+    """
+    A moto S3 server on a local port; processes forked by a test reach it through the environment
+    """
+    from moto.server import ThreadedMotoServer
+
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    yield f"http://127.0.0.1:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def s3(moto_endpoint_url, monkeypatch, tmp_path):
+    """
+    Empty moto S3 with the model bucket, used by S3Client through AWS_S3_ENDPOINT_URL.
+    Returns a plain boto3 client for arranging and checking objects.
+    """
+    import boto3
+
+    urllib.request.urlopen(urllib.request.Request(f"{moto_endpoint_url}/moto-api/reset", method="POST"))
+    monkeypatch.setenv(AWS_S3_ENDPOINT_URL_ENV_KEY, moto_endpoint_url)
+    monkeypatch.setenv(AWS_ACCESS_KEY_ID_ENV_KEY, "testing")
+    monkeypatch.setenv(AWS_SECRET_ACCESS_KEY_ENV_KEY, "testing")
+    monkeypatch.setattr(model_disk_cache, "cache_dir", str(tmp_path / "model_cache"))
+    monkeypatch.setenv("MODEL_CACHE_DIR", str(tmp_path / "model_cache"))  # For processes started by the test
+    S3Client.reset()
+    with s3_metadata_cache._lock:
+        s3_metadata_cache._entries.clear()
+
+    client = boto3.client("s3", endpoint_url=moto_endpoint_url, region_name=REGION_NAME,
+                          aws_access_key_id="testing", aws_secret_access_key="testing")
+    client.create_bucket(Bucket=MODEL_BUCKET_NAME)
+    yield client
+    S3Client.reset()
+
+
+@pytest.fixture
+def model_in_s3(s3, synthetic_model, tmp_path):
+    """
+    Saves the synthetic model with the production save path and uploads it as the production model file.
+    Returns the saved file's path.
+    """
+    model_path = str(tmp_path / "saved" / MODEL_FILE_NAME)
+    save_model_object(model_path, synthetic_model)
+    s3.upload_file(model_path, MODEL_BUCKET_NAME, MODEL_FILE_NAME)
+    return model_path
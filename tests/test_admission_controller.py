@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from benchmarks.synthetic_model import random_records
+from src.constants import REQUEST_DEADLINE_HEADER
+from src.entity.config_entity import AdmissionControlConfig
+from src.pipline.admission_controller import BATCH, INTERACTIVE, AdmissionController, RequestShedError
+
+
+def controller(**overrides) -> AdmissionController:
+    config = dict(max_concurrent=1, batch_max_concurrent=1, interactive_max_queue=4, batch_max_queue=4,
+                  interactive_deadline_ms=1000.0, batch_deadline_ms=1000.0, initial_hold_seconds=0.01)
+    config.update(overrides)
+    return AdmissionController(AdmissionControlConfig(**config))
+
+
+def test_full_queue_is_shed_at_once():
+    async def scenario():
+        admission_controller = controller(batch_max_queue=1)
+        await admission_controller.acquire(BATCH)
+        waiter = asyncio.ensure_future(admission_controller.acquire(BATCH))
+        await asyncio.sleep(0)
+        with pytest.raises(RequestShedError) as shed:
+            await admission_controller.acquire(BATCH)
+        admission_controller.release(BATCH)
+        await waiter
+        return admission_controller, shed.value
+
+    admission_controller, shed = asyncio.run(scenario())
+    assert shed.reason == "queue_full"
+    assert shed.retry_after_seconds >= 1.0
+    assert admission_controller.shed[BATCH] == 1
+    assert admission_controller.in_flight[BATCH] == 1
+
+
+def test_request_is_shed_when_estimated_wait_exceeds_its_deadline():
+    async def scenario():
+        admission_controller = controller(initial_hold_seconds=0.5)
+        await admission_controller.acquire(INTERACTIVE)
+        with pytest.raises(RequestShedError) as shed:
+            await admission_controller.acquire(INTERACTIVE, deadline_seconds=0.1)
+        return admission_controller, shed.value
+
+    admission_controller, shed = asyncio.run(scenario())
+    assert shed.reason == "deadline_exceeded"
+    assert admission_controller.queued[INTERACTIVE] == 0
+
+
+def test_waiting_request_is_shed_when_its_deadline_passes():
+    async def scenario():
+        admission_controller = controller()
+        await admission_controller.acquire(INTERACTIVE)
+        with pytest.raises(RequestShedError) as shed:
+            await admission_controller.acquire(INTERACTIVE, deadline_seconds=0.05)
+        return admission_controller, shed.value
+
+    admission_controller, shed = asyncio.run(scenario())
+    assert shed.reason == "deadline_expired"
+    assert len(admission_controller._waiters[INTERACTIVE]) == 0
+    assert admission_controller.in_flight[INTERACTIVE] == 1
+
+
+def test_freed_slot_goes_to_interactive_before_batch():
+    async def scenario():
+        admission_controller = controller()
+        order = []
+
+        async def request(priority):
+            await admission_controller.acquire(priority)
+            order.append(priority)
+            admission_controller.release(priority)
+
+        await admission_controller.acquire(BATCH)
+        batch = asyncio.ensure_future(request(BATCH))
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(request(INTERACTIVE))
+        await asyncio.sleep(0)
+        admission_controller.release(BATCH)
+        await asyncio.gather(batch, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == [INTERACTIVE, BATCH]
+
+
+def test_batch_requests_hold_at_most_their_share_of_slots():
+    async def scenario():
+        admission_controller = controller(max_concurrent=3, batch_max_concurrent=1)
+        await admission_controller.acquire(BATCH)
+        batch = asyncio.ensure_future(admission_controller.acquire(BATCH))
+        await asyncio.sleep(0)
+        # Interactive requests still get the remaining slots while a batch request waits
+        await admission_controller.acquire(INTERACTIVE)
+        queued_batch = len(admission_controller._waiters[BATCH])
+        batch.cancel()
+        return queued_batch
+
+    assert asyncio.run(scenario()) == 1
+
+
+@pytest.mark.parametrize("overrides, headers, reason", [
+    ({"max_concurrent": 0, "batch_max_queue": 0}, {}, "queue_full"),
+    ({"max_concurrent": 0}, {REQUEST_DEADLINE_HEADER: "1"}, "deadline_exceeded"),
+])
+def test_shed_requests_are_answered_with_503_and_retry_after(app_client, overrides, headers, reason):
+    app_client.app.state.admission_controller = controller(**overrides)
+
+    response = app_client.post("/predict/batch", json={"records": random_records(2, seed=1)}, headers=headers)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["status"] is False
+    assert reason in response.json()["error"]
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+import pytest
+
+from src.cloud_storage.aws_storage import SimpleStorageService
+from src.configuration.aws_connection import S3Client
+from src.constants import AWS_ACCESS_KEY_ID_ENV_KEY, MODEL_BUCKET_NAME, S3_MAX_POOL_CONNECTIONS
+
+
+def run_in_thread(function):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_client_is_shared_and_resources_are_per_thread(s3):
+    first, second = S3Client(), S3Client()
+
+    assert first.s3_client is second.s3_client
+    assert run_in_thread(lambda: S3Client().s3_client) is first.s3_client
+    assert first.s3_resource is second.s3_resource
+    assert run_in_thread(lambda: S3Client().s3_resource) is not first.s3_resource
+    assert first.s3_client.meta.config.max_pool_connections == S3_MAX_POOL_CONNECTIONS
+
+
+def test_forked_child_creates_its_own_connections(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="parent.txt", Body=b"parent")
+    storage = SimpleStorageService()
+    assert storage.s3_key_path_available(MODEL_BUCKET_NAME, "parent.txt")
+    parent_client = S3Client._client
+    assert parent_client is not None
+
+    read_descriptor, write_descriptor = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            os.close(read_descriptor)
+            inherited = S3Client._client is not None or S3Client._session is not None
+            storage.s3_client.put_object(Bucket=MODEL_BUCKET_NAME, Key="child.txt", Body=b"child")
+            result = {"inherited": inherited, "new_client": S3Client._client is not parent_client}
+            with os.fdopen(write_descriptor, "w") as pipe:
+                json.dump(result, pipe)
+            exit_code = 0
+        finally:
+            os._exit(exit_code)
+
+    os.close(write_descriptor)
+    with os.fdopen(read_descriptor) as pipe:
+        output = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert json.loads(output) == {"inherited": False, "new_client": True}
+
+    # The parent's own client still works after the child used its connections
+    assert S3Client._client is parent_client
+    assert s3.get_object(Bucket=MODEL_BUCKET_NAME, Key="child.txt")["Body"].read() == b"child"
+    assert storage.s3_client.get_object(Bucket=MODEL_BUCKET_NAME, Key="parent.txt")["Body"].read() == b"parent"
+
+
+def test_missing_credentials_are_reported(s3, monkeypatch):
+    monkeypatch.delenv(AWS_ACCESS_KEY_ID_ENV_KEY)
+    S3Client.reset()
+
+    with pytest.raises(Exception, match=AWS_ACCESS_KEY_ID_ENV_KEY):
+        S3Client()
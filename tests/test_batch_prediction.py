@@ -0,0 +1,37 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+from src.entity.config_entity import BatchPredictionConfig
+from src.pipline.batch_prediction import BatchPrediction
+from src.pipline.prediction_pipeline import VehicleRawData
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet"])
+def test_file_is_scored_in_parts_across_workers(model_in_s3, synthetic_model, make_raw_frame, tmp_path, file_format):
+    frame = make_raw_frame(230, seed=4)
+    source = str(tmp_path / f"book.{file_format}")
+    if file_format == "csv":
+        frame.to_csv(source, index=False)
+    else:
+        frame.to_parquet(source, index=False)
+    output_dir = str(tmp_path / "scored")
+    config = BatchPredictionConfig(output_dir=output_dir, chunk_size=50, n_workers=2)
+
+    summary = BatchPrediction(batch_prediction_config=config).run(source)
+
+    assert summary["rows"] == 230 and summary["parts"] == 5
+    part_paths = sorted(glob.glob(os.path.join(output_dir, "part-*.parquet")))
+    assert [os.path.basename(path) for path in part_paths] == [f"part-{n:05d}.parquet" for n in range(5)]
+    scored = pd.concat([pd.read_parquet(path) for path in part_paths], ignore_index=True)
+    expected = synthetic_model.predict(VehicleRawData(frame).get_vehicle_input_data_frame())
+    assert scored["id"].tolist() == frame["id"].tolist()
+    assert scored["prediction"].tolist() == expected.astype(int).tolist()
+
+
+def test_unsupported_source_is_rejected(tmp_path):
+    config = BatchPredictionConfig(output_dir=str(tmp_path), n_workers=1)
+    with pytest.raises(ValueError, match="Unsupported source"):
+        next(BatchPrediction(batch_prediction_config=config).iter_chunks("book.xlsx"))
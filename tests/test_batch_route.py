@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_model import FEATURE_COLUMNS, random_records
+
+
+def expected_scores(model, records: list):
+    frame = pd.DataFrame(records)[FEATURE_COLUMNS]
+    probabilities = model.trained_model_object.predict_proba(model.preprocessing_object.transform(frame))
+    return model.predict(frame).astype(int).tolist(), probabilities[:, 1]
+
+
+def test_row_records_are_scored_in_input_order(app_client, resident_model):
+    records = random_records(50, seed=1)
+    response = app_client.post("/predict/batch", json={"records": records}).json()
+
+    predictions, probabilities = expected_scores(resident_model, records)
+    assert response["status"] is True
+    assert response["model_version"] == '"test-etag"'
+    assert response["predictions"] == predictions
+    assert np.allclose(response["probabilities"], probabilities)
+
+
+def test_columnar_records_match_row_records(app_client):
+    records = random_records(20, seed=2)
+    columns = {column: [record[column] for record in records] for column in FEATURE_COLUMNS}
+
+    by_rows = app_client.post("/predict/batch", json=records).json()
+    by_columns = app_client.post("/predict/batch", json={"records": columns}).json()
+    assert by_columns["predictions"] == by_rows["predictions"]
+    assert by_columns["probabilities"] == by_rows["probabilities"]
+
+
+@pytest.mark.parametrize("payload, error", [
+    ({"records": []}, "No records to score"),
+    ({"records": [{"Age": 30}]}, "Missing feature columns"),
+    ({"records": {"Age": [30]}}, "Missing feature columns"),
+    ({"records": "rows"}, "Records must be a list of rows or a dict of columns"),
+])
+def test_invalid_batches_are_rejected(app_client, payload, error):
+    response = app_client.post("/predict/batch", json=payload).json()
+    assert response["status"] is False
+    assert error in response["error"]
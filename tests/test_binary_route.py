@@ -0,0 +1,87 @@
+import msgpack
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from benchmarks.synthetic_model import FEATURE_COLUMNS, random_records
+from src.constants import ARROW_STREAM_MEDIA_TYPE, MODEL_VERSION_HEADER, MSGPACK_MEDIA_TYPE
+from src.pipline.binary_protocol import BinaryPredictionProtocol
+
+
+def feature_frame(n_rows: int, seed: int) -> pd.DataFrame:
+    return pd.DataFrame(random_records(n_rows, seed=seed))[FEATURE_COLUMNS]
+
+
+def arrow_body(frame: pd.DataFrame, batch_rows: int = None) -> bytes:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=batch_rows)
+    return sink.getvalue().to_pybytes()
+
+
+def expected_scores(model, frame: pd.DataFrame):
+    probabilities = model.trained_model_object.predict_proba(model.preprocessing_object.transform(frame))
+    return model.predict(frame).astype(int), probabilities[:, 1]
+
+
+@pytest.mark.parametrize("batch_rows", [None, 7])
+def test_arrow_stream_is_scored(app_client, resident_model, batch_rows):
+    frame = feature_frame(30, seed=4)
+    response = app_client.post("/predict/binary", content=arrow_body(frame, batch_rows),
+                               headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE})
+
+    assert response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+    assert response.headers[MODEL_VERSION_HEADER] == '"test-etag"'
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.metadata[b"model_version"] == b'"test-etag"'
+    predictions, probabilities = expected_scores(resident_model, frame)
+    assert table.column("prediction").to_numpy().tolist() == predictions.tolist()
+    assert np.allclose(table.column("probability").to_numpy(), probabilities)
+
+
+def test_msgpack_lists_and_raw_arrays_are_scored(app_client, resident_model):
+    frame = feature_frame(25, seed=5)
+    payload = {column: frame[column].astype(np.float64).tolist() for column in FEATURE_COLUMNS}
+    payload["Annual_Premium"] = frame["Annual_Premium"].to_numpy(dtype="<f8").tobytes()
+    response = app_client.post("/predict/binary", content=msgpack.packb(payload),
+                               headers={"Content-Type": MSGPACK_MEDIA_TYPE})
+
+    body = msgpack.unpackb(response.content, raw=False)
+    assert body["model_version"] == '"test-etag"'
+    predictions, probabilities = expected_scores(resident_model, frame)
+    assert np.frombuffer(body["predictions"], dtype="<i8").tolist() == predictions.tolist()
+    assert np.allclose(np.frombuffer(body["probabilities"], dtype="<f8"), probabilities)
+
+
+def test_arrow_columns_are_views_over_the_body():
+    frame = feature_frame(10, seed=6).astype(np.float64)
+    body = arrow_body(frame)
+
+    columns = BinaryPredictionProtocol(ARROW_STREAM_MEDIA_TYPE).decode(body)
+
+    assert list(columns) == FEATURE_COLUMNS
+    for column in FEATURE_COLUMNS:
+        assert not columns[column].flags.owndata
+        assert columns[column].tolist() == frame[column].tolist()
+
+
+@pytest.mark.parametrize("content_type, body, error", [
+    ("application/json", b"{}", "Unsupported content type"),
+    (MSGPACK_MEDIA_TYPE, msgpack.packb({"Age": [30]}), "Missing feature columns"),
+    (MSGPACK_MEDIA_TYPE, msgpack.packb([1, 2]), "must be a map"),
+])
+def test_invalid_bodies_are_rejected(app_client, content_type, body, error):
+    response = app_client.post("/predict/binary", content=body, headers={"Content-Type": content_type}).json()
+    assert response["status"] is False
+    assert error in response["error"]
+
+
+def test_arrow_nulls_are_rejected(app_client):
+    frame = feature_frame(5, seed=7).astype({"Age": "float64"})
+    frame.loc[2, "Age"] = None
+    response = app_client.post("/predict/binary", content=arrow_body(frame),
+                               headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE}).json()
+    assert response["status"] is False
+    assert "Age" in response["error"]
@@ -0,0 +1,90 @@
+import io
+import threading
+
+import pandas as pd
+import pytest
+
+from src.constants import PREDICTION_CSV_ERROR_MARKER
+from src.pipline.admission_controller import BATCH
+from src.pipline.prediction_pipeline import VehicleDataClassifier, VehicleRawData
+
+CHUNK_SIZE = 10
+
+
+@pytest.fixture
+def scored_chunks(monkeypatch, app_client):
+    """
+    Reads uploads in small chunks and records, for every scored chunk, the thread it ran on
+    and whether the admission slot of the request was still held
+    """
+    calls = []
+    read_csv_chunks = VehicleDataClassifier.read_csv_chunks
+    predict_csv_chunk = VehicleDataClassifier.predict_csv_chunk
+    admission_controller = app_client.app.state.admission_controller
+
+    def scoring(self, chunk, header):
+        calls.append((threading.current_thread().name, admission_controller.in_flight[BATCH]))
+        return predict_csv_chunk(self, chunk, header)
+
+    monkeypatch.setattr(VehicleDataClassifier, "read_csv_chunks",
+                        lambda self, file_obj: read_csv_chunks(self, file_obj, chunk_size=CHUNK_SIZE))
+    monkeypatch.setattr(VehicleDataClassifier, "predict_csv_chunk", scoring)
+    return calls
+
+
+def post_csv(app_client, frame: pd.DataFrame):
+    content = frame.to_csv(index=False).encode()
+    return app_client.post("/predict/csv", files={"file": ("upload.csv", io.BytesIO(content), "text/csv")})
+
+
+def test_every_chunk_is_scored_on_the_executor_while_the_slot_is_held(app_client, scored_chunks, make_raw_frame, resident_model):
+    frame = make_raw_frame(3 * CHUNK_SIZE + 5)
+    response = post_csv(app_client, frame)
+
+    assert response.status_code == 200
+    result = pd.read_csv(io.StringIO(response.text))
+    assert result["id"].tolist() == frame["id"].tolist()
+    features = VehicleRawData(frame).get_vehicle_input_data_frame()
+    assert result["prediction"].tolist() == resident_model.predict(features).astype(int).tolist()
+
+    assert len(scored_chunks) == 4
+    assert all(thread.startswith("inference") and in_flight == 1 for thread, in_flight in scored_chunks)
+    assert app_client.app.state.admission_controller.in_flight[BATCH] == 0
+
+
+def test_failure_after_the_first_chunk_ends_the_stream_with_a_marker(app_client, scored_chunks, make_raw_frame):
+    frame = make_raw_frame(2 * CHUNK_SIZE)
+    frame.loc[CHUNK_SIZE + 3, "Gender"] = "Unknown"
+    response = post_csv(app_client, frame)
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) == 1 + CHUNK_SIZE + 1
+    assert lines[-1].startswith(f"{PREDICTION_CSV_ERROR_MARKER}scoring stopped after {CHUNK_SIZE} rows")
+    assert app_client.app.state.admission_controller.in_flight[BATCH] == 0
+
+
+def test_failure_in_the_first_chunk_returns_an_error(app_client, scored_chunks, make_raw_frame):
+    frame = make_raw_frame(CHUNK_SIZE)
+    frame.loc[0, "Gender"] = "Unknown"
+    response = post_csv(app_client, frame)
+
+    assert response.json()["status"] is False
+    assert "Gender must be either" in response.json()["error"]
+    assert app_client.app.state.admission_controller.in_flight[BATCH] == 0
+
+
+def test_upload_without_ids_gets_predictions_only(app_client, scored_chunks, make_raw_frame):
+    response = post_csv(app_client, make_raw_frame(CHUNK_SIZE + 1).drop(columns="id"))
+
+    result = pd.read_csv(io.StringIO(response.text))
+    assert list(result.columns) == ["prediction", "probability"]
+    assert len(result) == CHUNK_SIZE + 1
+
+
+def test_header_only_upload_gets_a_header_only_response(app_client, scored_chunks, make_raw_frame):
+    response = post_csv(app_client, make_raw_frame(0))
+
+    assert response.status_code == 200
+    assert response.text.splitlines() == ["id,prediction,probability"]
+    assert app_client.app.state.admission_controller.in_flight[BATCH] == 0
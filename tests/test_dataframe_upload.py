@@ -0,0 +1,77 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.cloud_storage import aws_storage as aws_storage_module
+from src.cloud_storage.aws_storage import SimpleStorageService
+from src.cloud_storage.s3_transfer import RangedFile, s3_transfer
+from src.constants import MODEL_BUCKET_NAME
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """
+    Writes a row group per 100 rows and transfers 4 KB per range, so a small frame spans several of each
+    """
+    monkeypatch.setattr(aws_storage_module, "S3_DATAFRAME_CHUNK_ROWS", 100)
+    monkeypatch.setattr(s3_transfer, "chunk_size", 4096)
+
+
+@pytest.mark.parametrize("filename", ["frame.parquet", "frame.csv.zst", "frame.csv"])
+def test_dataframe_round_trips_in_every_format(s3, small_chunks, make_raw_frame, filename):
+    frame = make_raw_frame(1000, seed=1)
+    storage = SimpleStorageService()
+
+    size = storage.upload_df(frame, filename, MODEL_BUCKET_NAME)
+
+    assert size == s3.head_object(Bucket=MODEL_BUCKET_NAME, Key=filename)["ContentLength"]
+    pd.testing.assert_frame_equal(storage.read_df(filename, MODEL_BUCKET_NAME), frame, check_dtype=False)
+
+
+def test_parquet_is_zstd_compressed_with_a_row_group_per_chunk(s3, small_chunks, make_raw_frame):
+    storage = SimpleStorageService()
+    storage.upload_df(make_raw_frame(1000, seed=2), "frame.parquet", MODEL_BUCKET_NAME)
+
+    body = s3.get_object(Bucket=MODEL_BUCKET_NAME, Key="frame.parquet")["Body"].read()
+    metadata = pq.ParquetFile(io.BytesIO(body)).metadata
+
+    assert metadata.num_row_groups == 10
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+def test_projection_and_filters_fetch_only_part_of_the_parquet_file(s3, small_chunks, make_raw_frame, monkeypatch):
+    # Row groups large enough that pyarrow does not coalesce the skipped ones into its reads
+    monkeypatch.setattr(aws_storage_module, "S3_DATAFRAME_CHUNK_ROWS", 5000)
+    frame = make_raw_frame(50_000, seed=3)
+    storage = SimpleStorageService()
+    storage.upload_df(frame, "frame.parquet", MODEL_BUCKET_NAME)
+    opened = []
+
+    class RecordingRangedFile(RangedFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            opened.append(self)
+
+    monkeypatch.setattr(aws_storage_module, "RangedFile", RecordingRangedFile)
+
+    df = storage.read_df("frame.parquet", MODEL_BUCKET_NAME, columns=["id", "Age"], filters=[("id", "<=", 5000)])
+
+    expected = frame.loc[frame["id"] <= 5000, ["id", "Age"]]
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert len(opened) == 1
+    assert opened[0].bytes_read < opened[0].size / 4
+
+
+def test_filters_need_a_parquet_file(s3, make_raw_frame):
+    storage = SimpleStorageService()
+    storage.upload_df(make_raw_frame(10), "frame.csv", MODEL_BUCKET_NAME)
+
+    with pytest.raises(Exception, match="Row filters need a Parquet file"):
+        storage.read_df("frame.csv", MODEL_BUCKET_NAME, filters=[("id", "<", 5)])
+
+
+def test_unknown_extension_is_rejected(s3, make_raw_frame):
+    with pytest.raises(Exception, match="Unsupported DataFrame file"):
+        SimpleStorageService().upload_df(make_raw_frame(10), "frame.json", MODEL_BUCKET_NAME)
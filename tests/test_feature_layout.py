@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from src.entity.feature_layout import FeatureLayout
+
+# Input columns of the preprocessing object, as in VehicleData.feature_columns
+FEATURE_COLUMNS = ["Gender", "Age", "Driving_License", "Region_Code", "Previously_Insured",
+                   "Annual_Premium", "Policy_Sales_Channel", "Vintage", "Vehicle_Age_lt_1_Year",
+                   "Vehicle_Age_gt_2_Years", "Vehicle_Damage_Yes"]
+
+
+def sample_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Gender": rng.integers(0, 2, n_rows),
+        "Age": rng.integers(20, 80, n_rows),
+        "Driving_License": rng.integers(0, 2, n_rows),
+        "Region_Code": rng.integers(0, 50, n_rows).astype(np.float64),
+        "Previously_Insured": rng.integers(0, 2, n_rows),
+        "Annual_Premium": np.round(rng.uniform(2000, 60000, n_rows), 2),
+        "Policy_Sales_Channel": rng.integers(1, 160, n_rows).astype(np.float64),
+        "Vintage": rng.integers(10, 300, n_rows),
+        "Vehicle_Age_lt_1_Year": rng.integers(0, 2, n_rows),
+        "Vehicle_Age_gt_2_Years": rng.integers(0, 2, n_rows),
+        "Vehicle_Damage_Yes": rng.integers(0, 2, n_rows),
+    })[FEATURE_COLUMNS]
+
+
+def fitted_preprocessor(standard_scaler=None, min_max_scaler=None) -> Pipeline:
+    """
+    Fits the preprocessing pipeline built by DataTransformation.get_data_transformer_object
+    """
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("StandardScaler", standard_scaler or StandardScaler(), ["Age", "Vintage"]),
+            ("MinMaxScaler", min_max_scaler or MinMaxScaler(), ["Annual_Premium"]),
+        ],
+        remainder="passthrough",
+    )
+    return Pipeline(steps=[("Preprocessor", preprocessor)]).fit(sample_frame(500, seed=1))
+
+
+def form_records(frame: pd.DataFrame) -> list:
+    """
+    Returns the rows as form submissions deliver them: every value a string
+    """
+    return [{column: str(value) for column, value in record.items()} for record in frame.to_dict("records")]
+
+
+@pytest.mark.parametrize("standard_scaler, min_max_scaler", [
+    (None, None),
+    (StandardScaler(with_mean=False), None),
+    (StandardScaler(with_std=False), None),
+    (StandardScaler(with_mean=False, with_std=False), None),
+    (None, MinMaxScaler(feature_range=(-1, 1), clip=True)),
+])
+def test_records_match_column_transformer(standard_scaler, min_max_scaler):
+    preprocessor = fitted_preprocessor(standard_scaler, min_max_scaler)
+    layout = FeatureLayout.from_preprocessing_object(preprocessor)
+    frame = sample_frame(200, seed=2)
+    frame.loc[0, "Annual_Premium"] = 1e6  # Outside the fitted range, so clipping applies
+
+    expected = preprocessor.transform(frame)
+    for records in (frame.to_dict("records"), form_records(frame)):
+        actual = layout.transform(layout.records_to_buffer(records))
+        assert actual.shape == expected.shape
+        assert np.array_equal(actual, expected)
+    assert layout.verify(preprocessor, frame)
+
+
+def test_columns_match_column_transformer():
+    preprocessor = fitted_preprocessor()
+    layout = FeatureLayout.from_preprocessing_object(preprocessor)
+    frame = sample_frame(200, seed=3)
+
+    actual = layout.transform_columns({column: frame[column].to_numpy() for column in FEATURE_COLUMNS})
+    assert np.array_equal(actual, preprocessor.transform(frame))
+
+
+@pytest.mark.parametrize("value", [None, "", "  ", float("nan"), "nan"])
+def test_missing_value_is_rejected(value):
+    layout = FeatureLayout.from_preprocessing_object(fitted_preprocessor())
+    record = form_records(sample_frame(1))[0]
+    record["Age"] = value
+
+    with pytest.raises(ValueError, match="Missing value for feature Age"):
+        layout.records_to_buffer([record])
+
+
+def test_absent_field_is_rejected():
+    layout = FeatureLayout.from_preprocessing_object(fitted_preprocessor())
+    record = form_records(sample_frame(1))[0]
+    del record["Vintage"]
+
+    with pytest.raises(ValueError, match="Missing value for feature Vintage"):
+        layout.records_to_buffer([record])
+
+
+def test_non_numeric_value_is_rejected_like_column_transformer():
+    preprocessor = fitted_preprocessor()
+    layout = FeatureLayout.from_preprocessing_object(preprocessor)
+    frame = sample_frame(1).astype(object)
+    frame.loc[0, "Annual_Premium"] = "abc"
+
+    with pytest.raises(ValueError):
+        preprocessor.transform(frame)
+    with pytest.raises(ValueError, match="Feature Annual_Premium must be a number"):
+        layout.records_to_buffer(form_records(frame))
+
+
+def test_missing_column_value_is_rejected():
+    layout = FeatureLayout.from_preprocessing_object(fitted_preprocessor())
+    frame = sample_frame(3)
+    columns = {column: frame[column].to_numpy(dtype=np.float64) for column in FEATURE_COLUMNS}
+    columns["Age"][1] = np.nan
+
+    with pytest.raises(Exception, match="Age"):
+        layout.transform_columns(columns)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.entity.forest_engine import ROW_CHUNK_SIZE, CompiledForest
+
+
+def random_data(n_rows: int, n_features: int = 6, n_classes: int = 2, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    # Labels depend on a few features plus noise, so the trees have real splits of varying depth
+    score = X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n_rows)
+    y = np.digitize(score, np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    return X, y
+
+
+def assert_matches_sklearn(model: RandomForestClassifier, X: np.ndarray) -> None:
+    forest = CompiledForest.from_random_forest(model)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+    assert forest.verify(model, X)
+
+
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 25, "random_state": 0},
+    {"n_estimators": 10, "max_depth": 3, "random_state": 1},
+    {"n_estimators": 10, "min_samples_leaf": 5, "max_features": None, "random_state": 2},
+])
+def test_matches_sklearn_on_random_inputs(params):
+    X_train, y_train = random_data(400, seed=0)
+    model = RandomForestClassifier(**params).fit(X_train, y_train)
+
+    X, _ = random_data(1000, seed=1)
+    assert_matches_sklearn(model, X)
+    # Rows that land exactly on the split thresholds take the same branch as in sklearn
+    assert_matches_sklearn(model, X_train)
+
+
+def test_matches_sklearn_with_depth_zero_trees():
+    X_train, y_train = random_data(50, seed=2)
+    # No node can be split, so every tree is a single leaf
+    model = RandomForestClassifier(n_estimators=5, min_samples_split=1000, random_state=0).fit(X_train, y_train)
+    assert all(estimator.tree_.max_depth == 0 for estimator in model.estimators_)
+
+    X, _ = random_data(100, seed=3)
+    assert_matches_sklearn(model, X)
+
+
+def test_matches_sklearn_with_depth_one_trees():
+    X_train, y_train = random_data(200, seed=4)
+    model = RandomForestClassifier(n_estimators=8, max_depth=1, random_state=0).fit(X_train, y_train)
+    assert all(estimator.tree_.max_depth == 1 for estimator in model.estimators_)
+
+    X, _ = random_data(100, seed=5)
+    assert_matches_sklearn(model, X)
+
+
+def test_matches_sklearn_with_trees_of_mixed_depth():
+    X_train, y_train = random_data(40, seed=6)
+    y_train[:] = 0
+    y_train[0] = 1  # Many bootstrap samples hold a single class, so those trees stay a single leaf
+    model = RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, y_train)
+    depths = {estimator.tree_.max_depth for estimator in model.estimators_}
+    assert 0 in depths and max(depths) > 0
+
+    X, _ = random_data(200, seed=7)
+    assert_matches_sklearn(model, X)
+
+
+def test_matches_sklearn_with_string_labels_and_many_classes():
+    X_train, y_train = random_data(500, n_classes=4, seed=8)
+    labels = np.array(["a", "b", "c", "d"])[y_train]
+    model = RandomForestClassifier(n_estimators=15, random_state=0).fit(X_train, labels)
+
+    X, _ = random_data(300, seed=9)
+    assert_matches_sklearn(model, X)
+
+
+def test_matches_sklearn_across_row_chunks():
+    X_train, y_train = random_data(300, seed=10)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+
+    X, _ = random_data(2 * ROW_CHUNK_SIZE + 17, seed=11)
+    assert_matches_sklearn(model, X)
+
+
+def test_backend_switch_selects_sklearn(monkeypatch):
+    from src.entity import estimator
+    from src.entity.estimator import MyModel
+
+    X_train, y_train = random_data(200, seed=12)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+    my_model = MyModel(None, model, compiled_forest=CompiledForest.from_random_forest(model))
+
+    assert isinstance(my_model.get_inference_engine(), CompiledForest)
+    monkeypatch.setattr(estimator, "MODEL_INFERENCE_BACKEND", "sklearn")
+    assert my_model.get_inference_engine() is model
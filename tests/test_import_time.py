@@ -0,0 +1,35 @@
+from from_root import from_root
+
+from benchmarks.import_time import TRAINING_ONLY_MODULES, measure_once, slowest_imports
+
+# A trimmed -X importtime report: children are printed before their parent, two spaces per level
+IMPORTTIME_REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   json.decoder
+import time:       200 |        300 | json
+import time:       500 |        500 |     fastapi.routing
+import time:      1000 |       1500 |   fastapi
+import time:       400 |        400 |   src.logger
+import time:        50 |        100 |     pandas.core
+import time:       900 |       3000 |   pandas
+import time:       100 |       5000 | app
+"""
+
+
+def test_slowest_imports_lists_direct_children_of_app():
+    entries = slowest_imports(IMPORTTIME_REPORT, top=2)
+
+    assert entries == [
+        {"module": "pandas", "cumulative_ms": 3.0},
+        {"module": "fastapi", "cumulative_ms": 1.5},
+    ]
+
+
+def test_serving_app_does_not_import_training_modules():
+    probe = measure_once(str(from_root()))
+
+    loaded = set(probe["modules"])
+    assert "app" in loaded
+    assert [module for module in TRAINING_ONLY_MODULES if module in loaded] == []
+    # sklearn is only needed once a model is unpickled
+    assert "sklearn" not in loaded
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.entity.config_entity import InferenceExecutorConfig
+from src.pipline.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+
+def thread_executor(max_workers: int = 2, max_queue_size: int = 8) -> InferenceExecutor:
+    executor = InferenceExecutor(InferenceExecutorConfig(executor_kind="thread", max_workers=max_workers,
+                                                         max_queue_size=max_queue_size))
+    executor.start()
+    return executor
+
+
+def blocking_call(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+def test_blocking_call_leaves_the_event_loop_free():
+    executor = thread_executor()
+
+    async def scenario():
+        ticks = 0
+        call = asyncio.ensure_future(executor.run(blocking_call, 0.3))
+        while not call.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return await call, ticks
+
+    try:
+        thread_name, ticks = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert thread_name.startswith("inference")
+    assert ticks >= 10
+    assert executor.get_stats()["completed"] == 1
+
+
+def test_calls_beyond_the_queue_bound_are_rejected():
+    executor = thread_executor(max_workers=1, max_queue_size=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFullError):
+            await executor.run(release.wait)
+        stats = executor.get_stats()
+        release.set()
+        await asyncio.gather(running, queued)
+        return stats
+
+    try:
+        stats = asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert stats["in_flight"] == 2 and stats["queued"] == 1 and stats["rejected"] == 1
+    assert executor.get_stats()["completed"] == 2
+
+
+def test_errors_reach_the_caller_and_are_counted():
+    executor = thread_executor()
+
+    def fail():
+        raise ValueError("bad input")
+
+    try:
+        with pytest.raises(ValueError, match="bad input"):
+            asyncio.run(executor.run(fail))
+    finally:
+        executor.shutdown()
+    assert executor.get_stats()["failed"] == 1 and executor.get_stats()["in_flight"] == 0
+
+
+def test_run_requires_a_started_executor():
+    executor = InferenceExecutor()
+    with pytest.raises(RuntimeError, match="not running"):
+        asyncio.run(executor.run(time.time))
+
+
+def test_unknown_executor_kind_is_rejected():
+    executor = InferenceExecutor(InferenceExecutorConfig(executor_kind="fiber"))
+    with pytest.raises(ValueError, match="Unknown inference executor kind"):
+        executor.start()
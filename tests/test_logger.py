@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from from_root import from_root
+
+# Logs from the main thread and from an exit handler that runs after the listener is stopped
+CHILD_SCRIPT = textwrap.dedent("""
+    import atexit
+    import logging as std_logging
+
+    atexit.register(lambda: std_logging.getLogger().warning("record from a late exit handler"))
+
+    from src.logger import log_file_path, logging
+
+    for index in range(500):
+        logging.warning("queued record %d", index)
+    print(log_file_path)
+""")
+
+
+def test_queued_records_are_written_at_exit():
+    env = dict(os.environ, LOG_USE_QUEUE="true", LOG_FORMAT="text")
+    result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], cwd=from_root(), env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert "Exception ignored" not in result.stderr
+
+    log_file_path = result.stdout.strip().splitlines()[-1]
+    try:
+        with open(log_file_path) as log_file:
+            contents = log_file.read()
+    finally:
+        os.remove(log_file_path)
+    assert "queued record 0" in contents
+    assert "queued record 499" in contents
+    assert "record from a late exit handler" in contents
@@ -0,0 +1,67 @@
+import gc
+import threading
+
+import pytest
+
+from src.utils.metrics import Histogram, MetricsRegistry
+
+
+def test_counts_of_finished_threads_are_kept_and_their_shards_dropped():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs").labels()
+
+    def work():
+        for _ in range(100):
+            counter.inc()
+
+    for _ in range(5):
+        threads = [threading.Thread(target=work) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    gc.collect()
+
+    assert counter.value() == 100 * 20 * 5
+    assert len(counter._values._shards) <= 1  # At most the shard of a thread that has not ended
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    cumulative, total, count = histogram.snapshot()
+    assert cumulative == [2, 3, 4]
+    assert total == pytest.approx(5.65) and count == 4
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors by route", labelnames=("route",)).labels("/predict").inc(2)
+    registry.gauge("model_loaded", "Model resident", value_fn=lambda: None).labels()
+    registry.histogram("stage_seconds", "Stage time", labelnames=("stage",), buckets=(0.5,)).labels("load").observe(0.25)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE errors_total counter" in lines
+    assert 'errors_total{route="/predict"} 2' in lines
+    assert not any(line.startswith("model_loaded") for line in lines)  # No value to report
+    assert 'stage_seconds_bucket{stage="load",le="0.5"} 1' in lines
+    assert 'stage_seconds_bucket{stage="load",le="+Inf"} 1' in lines
+    assert 'stage_seconds_sum{stage="load"} 0.25' in lines
+    assert 'stage_seconds_count{stage="load"} 1' in lines
+
+
+def test_a_metric_name_is_registered_once():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("jobs_total", "Jobs")
+
+
+def test_metrics_route_reports_request_latency(app_client):
+    app_client.post("/predict/batch", json={"records": []})
+    body = app_client.get("/metrics").text
+
+    assert 'http_request_seconds_count{route="/predict/batch",method="POST"}' in body
+    assert 'http_request_errors_total{route="/predict/batch"}' in body
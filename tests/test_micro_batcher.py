@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.entity.config_entity import InferenceExecutorConfig, MicroBatcherConfig
+from src.pipline.inference_executor import InferenceExecutor
+from src.pipline.micro_batcher import MicroBatcher
+
+
+class RecordingPredictor:
+    """
+    Doubles every item, remembering each batch it was called with; fails a whole batch that holds "bad"
+    """
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        self.threads.add(threading.current_thread().name)
+        if "bad" in items:
+            raise ValueError("cannot score 'bad'")
+        return [2 * item for item in items]
+
+
+async def submit_all(batcher: MicroBatcher, items: list) -> list:
+    await batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_requests_are_scored_in_one_call():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, MicroBatcherConfig(max_wait_ms=20.0, max_batch_size=256))
+
+    results = asyncio.run(submit_all(batcher, list(range(10))))
+    assert results == [2 * item for item in range(10)]
+    assert predictor.batches == [list(range(10))]
+    assert batcher.get_stats()["max_batch_size_seen"] == 10
+
+
+def test_batches_never_exceed_the_maximum_size():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, MicroBatcherConfig(max_wait_ms=20.0, max_batch_size=4))
+
+    results = asyncio.run(submit_all(batcher, list(range(10))))
+    assert results == [2 * item for item in range(10)]
+    assert [len(batch) for batch in predictor.batches] == [4, 4, 2]
+
+
+def test_failed_batch_is_rescored_item_by_item():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, MicroBatcherConfig(max_wait_ms=20.0, max_batch_size=256))
+
+    results = asyncio.run(submit_all(batcher, [1, "bad", 3]))
+    assert results[0] == 2 and results[2] == 6
+    assert isinstance(results[1], ValueError)
+    assert predictor.batches == [[1, "bad", 3], [1], ["bad"], [3]]
+    assert batcher.get_stats()["errors"] == 1
+
+
+def test_batches_are_scored_on_the_executor():
+    predictor = RecordingPredictor()
+    executor = InferenceExecutor(InferenceExecutorConfig(executor_kind="thread", max_workers=2, max_queue_size=8))
+    executor.start()
+    try:
+        batcher = MicroBatcher(predictor, MicroBatcherConfig(max_wait_ms=5.0, max_batch_size=256), executor)
+        results = asyncio.run(submit_all(batcher, list(range(6))))
+    finally:
+        executor.shutdown()
+
+    assert results == [2 * item for item in range(6)]
+    assert all(name.startswith("inference") for name in predictor.threads)
+
+
+def test_submit_requires_a_running_batcher():
+    batcher = MicroBatcher(RecordingPredictor())
+    with pytest.raises(RuntimeError, match="not running"):
+        asyncio.run(batcher.submit(1))
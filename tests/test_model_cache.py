@@ -0,0 +1,119 @@
+import os
+import time
+
+import pytest
+
+from src.cloud_storage.aws_storage import SimpleStorageService
+from src.cloud_storage.model_cache import ModelDiskCache, model_disk_cache
+from src.constants import MODEL_BUCKET_NAME, MODEL_FILE_NAME
+from src.pipline.prediction_pipeline import VehicleRawData
+
+
+def cache_counts() -> dict:
+    stats = model_disk_cache.get_stats()
+    return {result: stats[result] for result in ("hits", "not_modified", "misses")}
+
+
+def counts_since(before: dict) -> dict:
+    return {result: count - before[result] for result, count in cache_counts().items()}
+
+
+def test_unchanged_model_is_revalidated_with_304(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME, Body=b"model bytes")
+    storage = SimpleStorageService()
+    before = cache_counts()
+
+    first_path, first_etag = storage.get_model_file(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+    second_path, second_etag = storage.get_model_file(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+
+    assert counts_since(before) == {"hits": 0, "not_modified": 1, "misses": 1}
+    assert second_path == first_path
+    assert second_etag == first_etag
+    with open(second_path, "rb") as file:
+        assert file.read() == b"model bytes"
+
+
+def test_changed_model_is_downloaded_again(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME, Body=b"first model")
+    storage = SimpleStorageService()
+    first_path, first_etag = storage.get_model_file(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME, Body=b"second model")
+    before = cache_counts()
+    second_path, second_etag = storage.get_model_file(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+
+    assert counts_since(before) == {"hits": 0, "not_modified": 0, "misses": 1}
+    assert second_etag != first_etag
+    assert second_path != first_path
+    assert model_disk_cache.latest_etag(MODEL_BUCKET_NAME, MODEL_FILE_NAME) == second_etag
+    with open(second_path, "rb") as file:
+        assert file.read() == b"second model"
+
+
+def test_cached_version_is_used_without_asking_s3(s3):
+    s3.put_bucket_versioning(Bucket=MODEL_BUCKET_NAME, VersioningConfiguration={"Status": "Enabled"})
+    version_id = s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME, Body=b"old model")["VersionId"]
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME, Body=b"new model")
+    storage = SimpleStorageService()
+    before = cache_counts()
+
+    first_path, first_etag = storage.get_model_file(MODEL_FILE_NAME, MODEL_BUCKET_NAME, version_id=version_id)
+    s3.delete_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME, VersionId=version_id)
+    second_path, second_etag = storage.get_model_file(MODEL_FILE_NAME, MODEL_BUCKET_NAME, version_id=version_id)
+
+    assert counts_since(before) == {"hits": 1, "not_modified": 0, "misses": 1}
+    assert first_etag is not None
+    assert second_etag is None
+    assert second_path == first_path
+    with open(second_path, "rb") as file:
+        assert file.read() == b"old model"
+
+
+def test_model_loaded_from_the_cache_predicts_like_the_original(model_in_s3, synthetic_model, make_raw_frame):
+    storage = SimpleStorageService()
+    storage.load_model_with_etag(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+    before = cache_counts()
+
+    model, _, nbytes = storage.load_model_with_etag(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+
+    assert counts_since(before)["not_modified"] == 1
+    assert nbytes == os.path.getsize(model_in_s3)
+    features = VehicleRawData(make_raw_frame(50, seed=2)).get_vehicle_input_data_frame()
+    assert model.predict(features).tolist() == synthetic_model.predict(features).tolist()
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = ModelDiskCache(cache_dir=str(tmp_path), max_bytes=25)
+    old_path = cache.put("bucket", "old.pkl", b"x" * 10, etag="old")
+    used_path = cache.put("bucket", "used.pkl", b"x" * 10, etag="used")
+    past = time.time() - 60
+    os.utime(old_path, (past, past))
+    os.utime(used_path, (past - 60, past - 60))
+    assert cache.get("bucket", "used.pkl", etag="used") == used_path  # Marks it as recently used
+
+    new_path = cache.put("bucket", "new.pkl", b"x" * 10, etag="new")
+
+    assert not os.path.exists(old_path)
+    assert os.path.exists(used_path)
+    assert os.path.exists(new_path)
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path):
+    class BrokenBody:
+        def __init__(self):
+            self.calls = 0
+
+        def read(self, size):
+            self.calls += 1
+            if self.calls > 1:
+                raise ConnectionError("connection reset")
+            return b"partial"
+
+    cache = ModelDiskCache(cache_dir=str(tmp_path))
+    with pytest.raises(Exception, match="connection reset"):
+        cache.put("bucket", "model.pkl", BrokenBody(), etag="etag")
+
+    assert cache.get("bucket", "model.pkl", etag="etag") is None
+    assert cache.latest_etag("bucket", "model.pkl") is None
+    assert [name for _, _, names in os.walk(tmp_path) for name in names] == []
@@ -0,0 +1,63 @@
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from src.cloud_storage.aws_storage import SimpleStorageService
+from src.cloud_storage.model_cache import model_disk_cache
+from src.constants import MODEL_BUCKET_NAME, MODEL_FILE_NAME
+from src.pipline.prediction_pipeline import VehicleRawData
+from src.utils.main_utils import load_model_object, save_model_object
+
+
+def test_model_arrays_are_memory_mapped_from_the_file(synthetic_model, make_raw_frame, tmp_path):
+    model_path = str(tmp_path / MODEL_FILE_NAME)
+    save_model_object(model_path, synthetic_model)
+
+    model = load_model_object(model_path, mmap_mode="r")
+
+    for array in (model.compiled_forest.threshold, model.compiled_forest.children, model.compiled_forest.value):
+        assert isinstance(array, np.memmap)
+        assert os.path.samefile(array.filename, model_path)
+        assert not array.flags.writeable
+    features = VehicleRawData(make_raw_frame(100, seed=3)).get_vehicle_input_data_frame()
+    assert model.predict(features).tolist() == synthetic_model.predict(features).tolist()
+
+
+def test_model_arrays_are_read_into_memory_without_mmap_mode(synthetic_model, tmp_path):
+    model_path = str(tmp_path / MODEL_FILE_NAME)
+    save_model_object(model_path, synthetic_model)
+
+    model = load_model_object(model_path)
+
+    assert not isinstance(model.compiled_forest.threshold, np.memmap)
+    assert np.array_equal(model.compiled_forest.threshold, synthetic_model.compiled_forest.threshold)
+
+
+def test_pickled_models_saved_before_still_load(synthetic_model, tmp_path):
+    model_path = str(tmp_path / MODEL_FILE_NAME)
+    with open(model_path, "wb") as file:
+        pickle.dump(synthetic_model, file)
+
+    model = load_model_object(model_path, mmap_mode="r")
+
+    assert np.array_equal(model.compiled_forest.threshold, synthetic_model.compiled_forest.threshold)
+
+
+def test_model_is_streamed_through_a_temporary_file_without_the_disk_cache(model_in_s3, monkeypatch, tmp_path,
+                                                                           make_raw_frame, synthetic_model):
+    monkeypatch.setattr(model_disk_cache, "enabled", False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "temp"))
+    os.makedirs(tempfile.tempdir)
+
+    model, etag, nbytes = SimpleStorageService().load_model_with_etag(MODEL_FILE_NAME, MODEL_BUCKET_NAME)
+
+    assert etag is not None
+    assert nbytes == os.path.getsize(model_in_s3)
+    assert os.listdir(tempfile.tempdir) == []
+    assert not os.path.exists(model_disk_cache.cache_dir)
+    # The mapped pages stay readable after the temporary file is removed
+    assert isinstance(model.compiled_forest.threshold, np.memmap)
+    features = VehicleRawData(make_raw_frame(100, seed=4)).get_vehicle_input_data_frame()
+    assert model.predict(features).tolist() == synthetic_model.predict(features).tolist()
@@ -0,0 +1,151 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.pipline import model_registry as model_registry_module
+from src.pipline.model_registry import ModelRegistry, ShadowScorer
+
+
+class FakeEstimator:
+    """
+    Stands in for Proj1Estimator: every S3 version id is a model whose download takes load_seconds
+    """
+    load_seconds = 0.2
+    downloads = []
+    failing_versions = set()
+
+    def __init__(self, bucket_name, model_path, version_id=None):
+        self.version_id = version_id
+        self.model_version = f'"etag-{version_id}"'
+        self.model_nbytes = 1000
+
+    def load_model(self):
+        FakeEstimator.downloads.append(self.version_id)
+        time.sleep(self.load_seconds)
+        if self.version_id in self.failing_versions:
+            raise FileNotFoundError(f"No such version {self.version_id}")
+        return object()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(FakeEstimator, "downloads", [])
+    monkeypatch.setattr(FakeEstimator, "failing_versions", set())
+    monkeypatch.setattr(FakeEstimator, "load_seconds", 0.2)
+    monkeypatch.setattr(model_registry_module, "Proj1Estimator", FakeEstimator)
+    return ModelRegistry()
+
+
+def test_concurrent_requests_download_a_version_once(registry):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(registry.get_model, ["v1"] * 8))
+
+    assert FakeEstimator.downloads == ["v1"]
+    assert len({id(model) for _, model in results}) == 1
+    assert {key for key, _ in results} == {'"etag-v1"'}
+    assert registry._load_locks == {}
+
+
+def test_finished_callers_do_not_drop_a_newer_load_lock(registry):
+    FakeEstimator.load_seconds = 0.5
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        creator = pool.submit(registry.get_model, "v1")
+        time.sleep(0.1)
+        waiter = pool.submit(registry.get_model, "v1")
+        time.sleep(0.1)
+        # Stands for a lock created by a later caller while the first two are still in flight
+        newer_lock = threading.Lock()
+        with registry._lock:
+            registry._load_locks["v1"] = newer_lock
+        creator.result()
+        waiter.result()
+
+    assert FakeEstimator.downloads == ["v1"]
+    assert registry._load_locks == {"v1": newer_lock}
+
+
+def test_failed_version_is_answered_from_the_negative_cache(registry, monkeypatch):
+    FakeEstimator.load_seconds = 0.0
+    FakeEstimator.failing_versions.add("missing")
+
+    for _ in range(3):
+        with pytest.raises(Exception, match="missing"):
+            registry.get_model("missing")
+    assert FakeEstimator.downloads == ["missing"]
+    assert registry.failed_lookups == 2
+
+    # Once the failure is older than the TTL the version is looked up in S3 again
+    monkeypatch.setattr(registry.model_registry_config, "failed_lookup_ttl_seconds", 0.0)
+    with pytest.raises(Exception, match="missing"):
+        registry.get_model("missing")
+    assert FakeEstimator.downloads == ["missing", "missing"]
+
+
+def test_least_recently_used_versions_are_evicted_by_count(registry, monkeypatch):
+    FakeEstimator.load_seconds = 0.0
+    monkeypatch.setattr(registry.model_registry_config, "max_models", 2)
+
+    registry.get_model("v1")
+    registry.get_model("v2")
+    registry.get_model("v1")
+    registry.get_model("v3")
+
+    assert list(registry._models) == ['"etag-v1"', '"etag-v3"']
+    assert registry._aliases == {"v1": '"etag-v1"', "v3": '"etag-v3"'}
+    assert registry.evictions == 1
+
+
+def test_versions_are_evicted_by_model_file_size(registry, monkeypatch):
+    FakeEstimator.load_seconds = 0.0
+    monkeypatch.setattr(registry.model_registry_config, "max_bytes", 2500)
+
+    for version in ["v1", "v2", "v3"]:
+        registry.get_model(version)
+
+    stats = registry.get_stats()
+    assert [version["version"] for version in stats["resident_versions"]] == ['"etag-v2"', '"etag-v3"']
+    assert stats["resident_bytes"] == 2000
+
+
+def test_requests_are_routed_by_header_or_weight(registry, monkeypatch):
+    assert registry.choose_route("v7") == "v7"
+    assert registry.choose_route() == ModelRegistry.champion
+
+    monkeypatch.setattr(registry.model_registry_config, "challenger_version_id", "v2")
+    monkeypatch.setattr(registry.model_registry_config, "challenger_weight", 1.0)
+    assert registry.choose_route() == ModelRegistry.challenger
+    monkeypatch.setattr(registry.model_registry_config, "challenger_weight", 0.0)
+    assert registry.choose_route() == ModelRegistry.champion
+
+    assert registry.routed == {"champion": 2, "challenger": 1, "pinned": 1}
+
+
+def test_challenger_is_loaded_from_its_configured_version(registry, monkeypatch):
+    FakeEstimator.load_seconds = 0.0
+    monkeypatch.setattr(registry.model_registry_config, "challenger_version_id", "v2")
+
+    key, _ = registry.get_model(ModelRegistry.challenger)
+
+    assert key == '"etag-v2"'
+    assert FakeEstimator.downloads == ["v2"]
+
+
+def test_shadow_scorer_measures_agreement_and_drops_when_backlogged():
+    scorer = ShadowScorer(max_pending=1)
+    release = threading.Event()
+    try:
+        assert scorer.submit(lambda: (release.wait(5), [1, 0, 1, 1])[1], [1, 0, 0, 1])
+        assert not scorer.submit(lambda: [1], [1])
+        release.set()
+        deadline = time.monotonic() + 5
+        while scorer.get_stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scorer.shutdown()
+
+    stats = scorer.get_stats()
+    assert stats["scored"] == 1
+    assert stats["dropped"] == 1
+    assert stats["agreement_rate"] == 0.75
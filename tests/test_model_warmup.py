@@ -0,0 +1,63 @@
+import time
+
+from src.constants import MODEL_BUCKET_NAME, MODEL_FILE_NAME
+from src.entity.config_entity import ModelWarmupConfig
+from src.pipline.model_warmup import ModelWarmup
+from src.pipline.prediction_pipeline import VehicleDataClassifier
+from src.utils.main_utils import save_model_object
+
+WARMUP_CONFIG = ModelWarmupConfig(batch_sizes=(1, 8), rounds=2, retry_seconds=0.1)
+
+
+def wait_for(condition, timeout: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_warmup_retries_the_model_load_until_it_succeeds(s3, synthetic_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(VehicleDataClassifier, "loaded_model", None)
+    monkeypatch.setattr(VehicleDataClassifier, "model_version", None)
+    model_warmup = ModelWarmup(WARMUP_CONFIG)
+    model_warmup.start()
+    try:
+        # The bucket is still empty, so the load fails and is retried
+        assert wait_for(lambda: model_warmup.load_attempts >= 2)
+        assert not model_warmup.ready
+        assert model_warmup.last_error is not None
+
+        model_path = str(tmp_path / MODEL_FILE_NAME)
+        save_model_object(model_path, synthetic_model)
+        s3.upload_file(model_path, MODEL_BUCKET_NAME, MODEL_FILE_NAME)
+        assert wait_for(lambda: model_warmup.ready)
+    finally:
+        model_warmup.stop()
+
+    status = model_warmup.get_status()
+    etag = s3.head_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME)["ETag"].strip('"')
+    assert status["last_error"] is None
+    assert status["model_version"] == etag
+    assert set(status["warmup_timings_ms"]) == {"predict_batch", "predict_records", "predict_columns"}
+    assert set(status["warmup_timings_ms"]["predict_columns"]) == {1, 8}
+    assert status["seconds_to_ready"] > 0
+
+
+def test_readyz_answers_503_until_warmup_has_finished(app_client):
+    model_warmup = ModelWarmup(WARMUP_CONFIG)
+    app_client.app.state.model_warmup = model_warmup
+
+    assert app_client.get("/healthz").status_code == 200
+    response = app_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    model_warmup.run()
+
+    assert app_client.get("/healthz").status_code == 200
+    response = app_client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["model_version"] == '"test-etag"'
+    assert response.json()["load_attempts"] == 1
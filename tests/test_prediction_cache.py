@@ -0,0 +1,64 @@
+from src.entity.config_entity import PredictionCacheConfig
+from src.pipline import prediction_cache as prediction_cache_module
+from src.pipline.prediction_cache import PredictionCache
+
+COLUMNS = ["Age", "Annual_Premium"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_equal_values_share_a_key():
+    assert PredictionCache.make_key({"Age": "30", "Annual_Premium": 100}, COLUMNS) == \
+        PredictionCache.make_key({"Age": 30.0, "Annual_Premium": "100.0"}, COLUMNS)
+    assert PredictionCache.make_key({"Age": "thirty", "Annual_Premium": 100}, COLUMNS) is None
+    assert PredictionCache.make_key({"Age": 30}, COLUMNS) is None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(prediction_cache_module.time, "monotonic", clock)
+    cache = PredictionCache(PredictionCacheConfig(max_entries=10, ttl_seconds=60.0))
+    cache.put("v1", (30.0, 100.0), 1)
+
+    clock.now += 59.0
+    assert cache.get("v1", (30.0, 100.0)) == 1
+    clock.now += 2.0
+    assert cache.get("v1", (30.0, 100.0)) is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_a_new_model_version_drops_every_entry():
+    cache = PredictionCache()
+    cache.put('"etag-1"', (30.0, 100.0), 1)
+    cache.put('"etag-1"', (40.0, 200.0), 0)
+
+    assert cache.get('"etag-2"', (30.0, 100.0)) is None
+    assert cache.get_stats()["entries"] == 0 and cache.get_stats()["invalidations"] == 1
+    # Nothing from the old version comes back when the new version fills the cache
+    cache.put('"etag-2"', (30.0, 100.0), 0)
+    assert cache.get('"etag-2"', (30.0, 100.0)) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(PredictionCacheConfig(max_entries=2, ttl_seconds=60.0))
+    cache.put("v1", (1.0,), "a")
+    cache.put("v1", (2.0,), "b")
+    assert cache.get("v1", (1.0,)) == "a"
+    cache.put("v1", (3.0,), "c")
+
+    assert cache.get("v1", (2.0,)) is None
+    assert cache.get("v1", (1.0,)) == "a" and cache.get("v1", (3.0,)) == "c"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_uncacheable_records_are_ignored():
+    cache = PredictionCache()
+    cache.put("v1", None, 1)
+    assert cache.get("v1", None) is None
+    assert cache.get_stats()["entries"] == 0 and cache.get_stats()["misses"] == 0
@@ -0,0 +1,93 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+import urllib.request
+
+from from_root import from_root
+
+from benchmarks.load_harness import free_port
+
+# A small app served by PreforkServer; every answer tells which process served it and when its model was loaded
+SERVER_SCRIPT = textwrap.dedent("""
+    import os
+    import sys
+
+    from fastapi import FastAPI
+
+    from src.pipline.prediction_pipeline import VehicleDataClassifier
+    from src.pipline.prefork_server import PreforkServer
+
+    app = FastAPI()
+
+    @app.get("/")
+    def whoami():
+        return {"pid": os.getpid(), "parent": os.getppid(), "model_loaded_at": VehicleDataClassifier.model_loaded_at}
+
+    PreforkServer(app, host="127.0.0.1", port=int(sys.argv[1]), workers=2).run()
+""")
+
+
+def get_json(url: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return json.load(response)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def child_pids(parent_pid: int) -> set:
+    """
+    Returns the live (not zombie) child processes of parent_pid, read from /proc
+    """
+    children = set()
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as stat_file:
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if fields[0] != "Z" and int(fields[1]) == parent_pid:
+            children.add(int(name))
+    return children
+
+
+def test_workers_share_the_model_loaded_by_the_parent_and_are_replaced(model_in_s3):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    server = subprocess.Popen([sys.executable, "-c", SERVER_SCRIPT, str(port)], cwd=from_root(),
+                              env=dict(os.environ, PYTHONPATH=str(from_root())),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        answers = [get_json(url, timeout=120) for _ in range(10)]
+        assert {answer["parent"] for answer in answers} == {server.pid}
+        assert server.pid not in {answer["pid"] for answer in answers}
+        # Loaded once in the parent before the fork, so every worker reports the same load time
+        loaded_at = {answer["model_loaded_at"] for answer in answers}
+        assert len(loaded_at) == 1 and None not in loaded_at
+
+        workers = child_pids(server.pid)
+        assert len(workers) == 2
+        crashed_pid = answers[0]["pid"]
+        os.kill(crashed_pid, signal.SIGKILL)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            replaced = child_pids(server.pid)
+            if len(replaced) == 2 and crashed_pid not in replaced:
+                break
+            time.sleep(0.2)
+        assert len(replaced) == 2 and crashed_pid not in replaced
+        assert get_json(url)["model_loaded_at"] in loaded_at
+    finally:
+        server.send_signal(signal.SIGTERM)
+        exit_code = server.wait(30)
+    assert exit_code == 0
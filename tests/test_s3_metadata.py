@@ -0,0 +1,71 @@
+from src.cloud_storage.aws_storage import SimpleStorageService
+from src.cloud_storage.s3_metadata import S3MetadataCache, s3_call_counter
+from src.constants import MODEL_BUCKET_NAME, MODEL_FILE_NAME
+
+
+def test_exact_key_is_checked_with_one_head_request(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME + ".bak", Body=b"old model")
+    storage = SimpleStorageService()
+    before = s3_call_counter.snapshot()
+
+    # A prefix listing would find model.pkl.bak and report model.pkl as present
+    assert storage.s3_key_path_available(MODEL_BUCKET_NAME, MODEL_FILE_NAME) is False
+    assert storage.s3_key_path_available(MODEL_BUCKET_NAME, MODEL_FILE_NAME) is False
+
+    assert s3_call_counter.since(before) == {"HeadObject": 1}
+
+
+def test_metadata_is_served_from_the_cache_until_a_write_invalidates_it(s3, tmp_path):
+    storage = SimpleStorageService()
+    assert storage.get_object_metadata(MODEL_BUCKET_NAME, MODEL_FILE_NAME) is None
+
+    local_file = tmp_path / MODEL_FILE_NAME
+    local_file.write_bytes(b"model bytes")
+    storage.upload_file(str(local_file), MODEL_FILE_NAME, MODEL_BUCKET_NAME, remove=False)
+    before = s3_call_counter.snapshot()
+
+    metadata = storage.get_object_metadata(MODEL_BUCKET_NAME, MODEL_FILE_NAME)
+    assert storage.get_object_etag(MODEL_BUCKET_NAME, MODEL_FILE_NAME) == metadata["etag"]
+
+    assert metadata["size"] == len(b"model bytes")
+    assert metadata["etag"] == s3.head_object(Bucket=MODEL_BUCKET_NAME, Key=MODEL_FILE_NAME)["ETag"].strip('"')
+    assert s3_call_counter.since(before) == {"HeadObject": 1}
+
+
+def test_many_keys_are_checked_at_once(s3):
+    for key in ["a.csv", "b.csv"]:
+        s3.put_object(Bucket=MODEL_BUCKET_NAME, Key=key, Body=b"x")
+    storage = SimpleStorageService()
+
+    available = storage.s3_keys_available(MODEL_BUCKET_NAME, ["a.csv", "missing.csv", "b.csv", "a.csv"])
+
+    assert available == {"a.csv": True, "missing.csv": False, "b.csv": True}
+
+
+def test_file_object_of_an_exact_key_skips_the_listing(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="models/model.pkl", Body=b"x")
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="models/model.pkl.bak", Body=b"y")
+    storage = SimpleStorageService()
+    before = s3_call_counter.snapshot()
+
+    file_object = storage.get_file_object("models/model.pkl", MODEL_BUCKET_NAME)
+    assert file_object.key == "models/model.pkl"
+    assert "ListObjects" not in s3_call_counter.since(before)
+
+    file_objects = storage.get_file_object("models/", MODEL_BUCKET_NAME)
+    assert sorted(file_object.key for file_object in file_objects) == ["models/model.pkl", "models/model.pkl.bak"]
+
+
+def test_entries_expire_and_least_recently_used_are_dropped():
+    cache = S3MetadataCache(ttl_seconds=60.0, max_entries=2)
+    cache.put("bucket", "a", {"etag": "a"})
+    cache.put("bucket", "b", None)
+    assert cache.get("bucket", "a") == (True, {"etag": "a"})
+    cache.put("bucket", "c", {"etag": "c"})
+
+    assert cache.get("bucket", "b") == (False, None)
+    assert cache.get("bucket", "a") == (True, {"etag": "a"})
+
+    expired = S3MetadataCache(ttl_seconds=0.0)
+    expired.put("bucket", "a", {"etag": "a"})
+    assert expired.get("bucket", "a") == (False, None)
@@ -0,0 +1,107 @@
+import io
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.cloud_storage.s3_transfer import ParallelTransfer, RangedFile
+from src.constants import MODEL_BUCKET_NAME
+
+MB = 1024 * 1024
+
+
+def object_bytes(size: int) -> bytes:
+    return bytes(index % 251 for index in range(size))
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_ranged_download_assembles_the_parts_in_order(s3, tmp_path, max_concurrency):
+    body = object_bytes(10_500)
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="data.bin", Body=body)
+    transfer = ParallelTransfer(chunk_size=1000, max_concurrency=max_concurrency)
+
+    assert bytes(transfer.open_download(s3, MODEL_BUCKET_NAME, "data.bin").read()) == body
+
+    download = transfer.open_download(s3, MODEL_BUCKET_NAME, "data.bin")
+    with open(tmp_path / "data.bin", "wb") as file:
+        file.write(b"header")
+        assert download.write_to(file) == len(body)
+    assert (tmp_path / "data.bin").read_bytes() == b"header" + body
+    assert download.size == len(body)
+    assert download.etag == s3.head_object(Bucket=MODEL_BUCKET_NAME, Key="data.bin")["ETag"].strip('"')
+
+
+def test_parts_of_an_overwritten_object_are_refused(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="data.bin", Body=object_bytes(5000))
+    transfer = ParallelTransfer(chunk_size=1000, max_concurrency=2)
+    download = transfer.open_download(s3, MODEL_BUCKET_NAME, "data.bin")
+
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="data.bin", Body=object_bytes(6000)[::-1])
+
+    # The later ranges are sent with If-Match on the ETag of the first response
+    with pytest.raises(Exception, match="PreconditionFailed"):
+        download.read()
+
+
+def test_unchanged_object_is_answered_with_304(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="data.bin", Body=b"model bytes")
+    transfer = ParallelTransfer(chunk_size=1000)
+    etag = transfer.open_download(s3, MODEL_BUCKET_NAME, "data.bin").etag
+
+    with pytest.raises(ClientError) as error:
+        transfer.open_download(s3, MODEL_BUCKET_NAME, "data.bin", if_none_match=etag)
+
+    assert error.value.response["Error"]["Code"] in ("304", "NotModified")
+
+
+def test_empty_object_is_downloaded(s3):
+    s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="empty.bin", Body=b"")
+
+    download = ParallelTransfer(chunk_size=1000).open_download(s3, MODEL_BUCKET_NAME, "empty.bin")
+
+    assert download.size == 0
+    assert bytes(download.read()) == b""
+
+
+def test_large_file_is_uploaded_in_parts(s3, tmp_path):
+    path = tmp_path / "large.bin"
+    path.write_bytes(os.urandom(11 * MB))
+    transfer = ParallelTransfer(chunk_size=5 * MB, multipart_threshold=5 * MB, max_concurrency=3)
+
+    transfer.upload_file(s3, str(path), MODEL_BUCKET_NAME, "large.bin")
+
+    response = s3.get_object(Bucket=MODEL_BUCKET_NAME, Key="large.bin")
+    assert response["ETag"].strip('"').endswith("-3")
+    assert response["Body"].read() == path.read_bytes()
+
+
+def test_streamed_upload_is_not_completed_when_the_writer_fails(s3):
+    transfer = ParallelTransfer(chunk_size=5 * MB, multipart_threshold=5 * MB)
+
+    def write(stream):
+        stream.write(b"x" * (6 * MB))
+        raise ValueError("writer failed")
+
+    with pytest.raises(ValueError, match="writer failed"):
+        transfer.upload_from_writer(s3, write, MODEL_BUCKET_NAME, "streamed.bin")
+    assert "Contents" not in s3.list_objects_v2(Bucket=MODEL_BUCKET_NAME, Prefix="streamed.bin")
+
+    size = transfer.upload_from_writer(s3, lambda stream: stream.write(b"complete"), MODEL_BUCKET_NAME,
+                                       "streamed.bin")
+    assert size == len(b"complete")
+    assert s3.get_object(Bucket=MODEL_BUCKET_NAME, Key="streamed.bin")["Body"].read() == b"complete"
+
+
+def test_ranged_file_reads_only_the_bytes_asked_for(s3):
+    body = object_bytes(10_000)
+    etag = s3.put_object(Bucket=MODEL_BUCKET_NAME, Key="data.bin", Body=body)["ETag"].strip('"')
+    ranged_file = RangedFile(s3, MODEL_BUCKET_NAME, "data.bin", size=len(body), etag=etag)
+
+    ranged_file.seek(-100, io.SEEK_END)
+    assert ranged_file.read(100) == body[-100:]
+    ranged_file.seek(2000)
+    assert ranged_file.read(10) == body[2000:2010]
+    assert ranged_file.read(0) == b""
+
+    assert ranged_file.requests == 2
+    assert ranged_file.bytes_read == 110
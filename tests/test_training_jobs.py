@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import time
+
+from src.pipline import training_jobs
+from src.pipline.training_jobs import TrainingJobRunner
+
+
+def quick_training_job(job_id: str, events) -> None:
+    """
+    Stands in for the training pipeline in the spawned worker process
+    """
+    events.put((job_id, None, "running", time.time(), None))
+    events.put((job_id, "data_ingestion", "started", time.time(), None))
+    time.sleep(1.0)
+    events.put((job_id, "data_ingestion", "completed", time.time(), None))
+    events.put((job_id, None, "succeeded", time.time(), None))
+
+
+def wait_for_job(runner: TrainingJobRunner, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = runner.get_job(job_id)
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def submit_from_worker(job_dir: str, barrier, results) -> None:
+    """
+    Plays one prefork app worker: its own runner, submitting at the same moment as the other worker
+    """
+    training_jobs._run_training_job = quick_training_job
+    runner = TrainingJobRunner(job_dir=job_dir)
+    barrier.wait()
+    job, coalesced = runner.submit()
+    results.put((job["job_id"], coalesced))
+    # The worker that started the job holds the lock until the job ends
+    wait_for_job(runner, job["job_id"])
+
+
+def test_concurrent_submits_from_two_workers_share_one_job(tmp_path):
+    context = multiprocessing.get_context("fork")
+    barrier, results = context.Barrier(2), context.Queue()
+    workers = [context.Process(target=submit_from_worker, args=(str(tmp_path), barrier, results)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    submitted = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(60)
+
+    assert [worker.exitcode for worker in workers] == [0, 0]
+    assert submitted[0][0] == submitted[1][0]
+    assert sorted(coalesced for _, coalesced in submitted) == [False, True]
+
+    # A third worker that did not take part still reports the job, stage by stage
+    job = TrainingJobRunner(job_dir=str(tmp_path)).get_job(submitted[0][0])
+    assert job["status"] == "succeeded"
+    assert [stage["stage"] for stage in job["stages"]] == ["data_ingestion"]
+
+
+def test_next_submit_starts_a_new_job_once_the_lock_is_released(tmp_path, monkeypatch):
+    monkeypatch.setattr(training_jobs, "_run_training_job", quick_training_job)
+    runner = TrainingJobRunner(job_dir=str(tmp_path))
+    first, coalesced = runner.submit()
+    assert not coalesced
+    assert runner.submit()[0]["job_id"] == first["job_id"]
+    assert wait_for_job(runner, first["job_id"])["status"] == "succeeded"
+
+    other_runner = TrainingJobRunner(job_dir=str(tmp_path))
+    second, coalesced = other_runner.submit()
+    assert not coalesced and second["job_id"] != first["job_id"]
+    assert wait_for_job(other_runner, second["job_id"])["status"] == "succeeded"
+    assert runner.get_job("../active") is None
+
+
+def crashing_training_job(job_id: str, events) -> None:
+    events.put((job_id, None, "running", time.time(), None))
+    os._exit(3)
+
+
+def test_job_whose_process_dies_is_marked_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(training_jobs, "_run_training_job", crashing_training_job)
+    runner = TrainingJobRunner(job_dir=str(tmp_path))
+    job, _ = runner.submit()
+
+    job = wait_for_job(runner, job["job_id"])
+    assert job["status"] == "failed"
+    assert "exited with code 3" in job["error"]
+    # The lock is released, so the next request starts a new job
+    monkeypatch.setattr(training_jobs, "_run_training_job", quick_training_job)
+    next_job, coalesced = runner.submit()
+    assert not coalesced
+    wait_for_job(runner, next_job["job_id"])
+
+
+def test_train_routes_report_the_job(app_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(training_jobs, "_run_training_job", quick_training_job)
+    runner = app_client.app.state.training_job_runner = TrainingJobRunner(job_dir=str(tmp_path))
+
+    started = app_client.get("/train").json()
+    joined = app_client.get("/train").json()
+    assert started["status"] is True and not started["coalesced"]
+    assert joined["job_id"] == started["job_id"] and joined["coalesced"]
+
+    wait_for_job(runner, started["job_id"])
+    assert app_client.get(f"/train/{started['job_id']}").json()["status"] == "succeeded"
+    assert app_client.get("/train/unknown").status_code == 404